@@ -0,0 +1,126 @@
+"""
+Response compression middleware (brotli when available, otherwise gzip)
+"""
+from typing import Optional
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.config import Settings
+from app.logger import logger
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class BrotliResponder(IdentityResponder):
+    """Compresses the response body with brotli (streamed bodies are flushed per chunk)"""
+
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int):
+        super().__init__(app, minimum_size)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        compressed = self._compressor.process(body)
+        return compressed + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware:
+    """
+    Compress responses for clients that accept it
+
+    Picks brotli when the `brotli` package is installed and the client's
+    Accept-Encoding allows "br", otherwise gzip. Bodies smaller than
+    `minimum_size`, already encoded responses and Server-Sent Events are
+    sent as-is (Starlette's GZip rules), so streamed summaries are never
+    held back by the compressor.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 4):
+        """
+        Initialize middleware
+
+        Args:
+            app: Wrapped ASGI app
+            minimum_size: Smallest body (bytes) worth compressing
+            gzip_level: zlib compression level (1-9)
+            brotli_quality: Brotli quality (0-11; 4-5 suits dynamic responses)
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("Accept-Encoding", ""))
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header
+
+    Args:
+        accept_encoding: Header value (e.g. "gzip, deflate, br;q=0.9")
+
+    Returns:
+        Optional[str]: "br" (only when brotli is installed), "gzip", or None
+    """
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def add_compression(app, settings: Settings) -> None:
+    """
+    Install the compression middleware if enabled in settings
+
+    Args:
+        app: FastAPI app
+        settings: Application settings
+    """
+    if not settings.response_compression_enabled:
+        return
+
+    logger.info(
+        f"[Compression] Enabled: {'br, gzip' if brotli is not None else 'gzip (pip install brotli for br)'}, "
+        f"min size {settings.response_compression_min_size} bytes"
+    )
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.response_compression_min_size,
+        gzip_level=settings.response_gzip_level,
+        brotli_quality=settings.response_brotli_quality
+    )
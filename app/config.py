@@ -2,6 +2,7 @@
 Configuration management using Pydantic Settings
 """
 from functools import lru_cache
+from typing import Dict
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,13 +13,129 @@ class Settings(BaseSettings):
     google_api_key: str
     gemini_model: str = "gemini-2.0-flash"
 
+    # Model Tiering Configuration (per-task models, empty: GEMINI_MODEL; escalation retries failed validation on
+    # GEMINI_MODEL; prices in USD per 1M tokens as JSON, e.g. {"gemini-2.5-flash": {"input": 0.3, "output": 2.5}})
+    gemini_grounding_model: str = ""
+    gemini_extraction_model: str = ""
+    gemini_judgement_model: str = ""
+    gemini_escalation_enabled: bool = True
+    gemini_model_prices: Dict[str, Dict[str, float]] = {}
+
     # Logging Configuration
     log_level: str = "DEBUG"
     log_file: str = "logs/app.log"
+    log_format: str = "text"  # text or json
+    log_async: bool = True
+    log_queue_size: int = 10000
+    log_debug_sample_rate: float = 1.0
 
-    # Server Configuration
+    # Server Configuration (workers > 1 is the production mode: reload is turned off; background and batch jobs
+    # keep their state in one process, so they must be disabled to run more than one worker)
     host: str = "0.0.0.0"
     port: int = 8000
+    server_workers: int = 1
+    server_reload: bool = True
+    background_jobs_enabled: bool = True
+
+    # Response Compression Configuration (gzip, or brotli when the 'brotli' package is installed; SSE is not compressed)
+    response_compression_enabled: bool = True
+    response_compression_min_size: int = 1000
+    response_gzip_level: int = 6
+    response_brotli_quality: int = 4
+
+    # Shared State Configuration (backend: none, sqlite, redis; shared by all worker processes)
+    shared_state_backend: str = "none"
+    shared_state_path: str = "cache/shared_state.sqlite3"
+    shared_state_url: str = "redis://localhost:6379/0"
+
+    # Initial Search Configuration (mode: two_pass, fused, local_first)
+    initial_search_mode: str = "local_first"
+    local_extraction_min_confidence: float = 0.6
+
+    # Detail Search Configuration (requests per second 0 disables the fixed token bucket)
+    detail_search_concurrency: int = 4
+    gemini_requests_per_second: float = 0.0
+    gemini_burst: int = 2
+    batch_judgement: bool = False
+    detail_search_deadline_seconds: float = 0.0
+    single_flight_enabled: bool = True
+
+    # Detail Prefetch Configuration (opt-in; detail searches for the top shops start right after the initial search;
+    # max in flight caps running prefetches per process)
+    detail_prefetch_enabled: bool = False
+    detail_prefetch_max_shops: int = 10
+    detail_prefetch_max_in_flight: int = 4
+    detail_prefetch_judgement: bool = False
+    detail_prefetch_ttl_seconds: float = 300.0
+    detail_prefetch_max_entries: int = 500
+
+    # Prompt Compaction Configuration (opt-in: truncation can cut shops from the extraction text;
+    # token budgets are local estimates; 0 disables truncation)
+    prompt_compaction_enabled: bool = False
+    extraction_prompt_max_tokens: int = 3000
+    judgement_prompt_max_tokens: int = 1500
+
+    # Background Detail Job Configuration (queue backend: memory)
+    detail_job_workers: int = 2
+    detail_job_queue_backend: str = "memory"
+    detail_job_queue_size: int = 100
+    detail_job_max_jobs: int = 200
+
+    # Batch Search Configuration
+    batch_concurrency: int = 4
+    batch_output_dir: str = "batch_results"
+    batch_max_jobs: int = 100
+
+    # Shop Fact Index Configuration (":memory:" path keeps it in-process)
+    # When enabled, detail searches use query-independent facts and the query is
+    # only seen by the judgement, so query-specific details the facts prompt does
+    # not cover (e.g. a particular menu item) are not searched for
+    shop_index_enabled: bool = False
+    shop_index_path: str = "cache/shop_index.sqlite3"
+    shop_index_refresh_after_seconds: float = 86400.0
+    shop_index_max_age_seconds: float = 604800.0
+
+    # Gemini Client Pool Configuration
+    gemini_client_pool_size: int = 2
+    gemini_max_connections: int = 20
+    gemini_keepalive_expiry: float = 30.0
+    gemini_http_timeout_seconds: float = 120.0
+    service_reload_grace_seconds: float = 60.0
+    # Token required in the X-Admin-Token header by /admin endpoints (empty: localhost only)
+    admin_token: str = ""
+
+    # Gemini Resilience Configuration (timeouts in seconds, 0 threshold disables the breaker)
+    gemini_max_retries: int = 3
+    gemini_retry_base_delay: float = 0.5
+    gemini_retry_max_delay: float = 8.0
+    gemini_call_timeout_seconds: float = 60.0
+    gemini_total_timeout_seconds: float = 150.0
+    gemini_hedge_enabled: bool = False
+    gemini_hedge_percentile: float = 95.0
+    gemini_hedge_min_samples: int = 20
+    gemini_circuit_failure_threshold: int = 5
+    gemini_circuit_reset_seconds: float = 30.0
+
+    # Gemini Adaptive Concurrency Configuration (AIMD; per-model max as JSON, e.g. {"gemini-2.5-pro": 4})
+    gemini_adaptive_concurrency: bool = True
+    gemini_concurrency_initial: int = 4
+    gemini_concurrency_min: int = 1
+    gemini_concurrency_max: int = 16
+    gemini_concurrency_max_by_model: Dict[str, int] = {}
+    gemini_concurrency_decrease_factor: float = 0.5
+    gemini_concurrency_latency_tolerance: float = 2.0
+
+    # Gemini Record/Replay Configuration (mode: off, record, replay; time scale 0 replays without delay)
+    gemini_record_mode: str = "off"
+    gemini_record_path: str = "recordings/gemini.jsonl"
+    gemini_replay_time_scale: float = 1.0
+
+    # Response Cache Configuration (backend: none, memory, sqlite, shared; warm path: recording loaded at startup)
+    response_cache_backend: str = "memory"
+    response_cache_ttl_seconds: float = 21600.0
+    response_cache_max_entries: int = 1000
+    response_cache_path: str = "cache/responses.sqlite3"
+    response_cache_warm_path: str = ""
 
     model_config = SettingsConfigDict(
         env_file=".env",
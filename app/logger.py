@@ -1,23 +1,97 @@
 """
 Logging configuration for console and file output
 """
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
+import threading
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Tuple
 from app.config import get_settings
+from app.metrics import LOG_RECORDS_DROPPED
+
+# Background listener writing queued records to the console and file handlers
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class DebugSampler(logging.Filter):
+    """
+    Keep one in every N DEBUG records per call site
+
+    Higher levels always pass. Sampling per call site (file and line) keeps
+    rare debug lines visible while thinning out the ones in hot loops.
+    """
+
+    def __init__(self, rate: float):
+        """
+        Initialize sampler
+
+        Args:
+            rate: Fraction of DEBUG records to keep (1.0 keeps all)
+        """
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counts: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        if self.every == 0:
+            return False
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(site, 0)
+            self._counts[site] = count + 1
+        return count % self.every == 0
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
 
 
 def setup_logger(name: str = "restaurant_search") -> logging.Logger:
     """
     Set up logger with console and file handlers
 
+    With LOG_ASYNC enabled (default) records are put on a bounded queue and
+    written by a QueueListener thread, so console output and file rotation
+    never block the request path.
+
     Args:
         name: Logger name
 
     Returns:
         logging.Logger: Configured logger instance
     """
+    global _listener
     settings = get_settings()
 
     # Create logger
@@ -31,11 +105,16 @@ def setup_logger(name: str = "restaurant_search") -> logging.Logger:
     # Create logs directory if it doesn't exist
     log_path = Path(settings.log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
+    if settings.server_workers > 1:
+        # Each worker process writes and rotates its own file (app.<pid>.log)
+        log_path = log_path.with_name(f"{log_path.stem}.{os.getpid()}{log_path.suffix}")
+
+    json_output = settings.log_format.lower() == "json"
 
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.DEBUG)
-    console_formatter = logging.Formatter(
+    console_formatter = JsonFormatter(datefmt="%Y-%m-%d %H:%M:%S") if json_output else logging.Formatter(
         fmt="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S"
     )
@@ -43,24 +122,44 @@ def setup_logger(name: str = "restaurant_search") -> logging.Logger:
 
     # File handler with rotation
     file_handler = RotatingFileHandler(
-        filename=settings.log_file,
+        filename=log_path,
         maxBytes=10 * 1024 * 1024,  # 10MB
         backupCount=5,
         encoding="utf-8"
     )
     file_handler.setLevel(logging.DEBUG)
-    file_formatter = logging.Formatter(
+    file_formatter = JsonFormatter(datefmt="%Y-%m-%d %H:%M:%S") if json_output else logging.Formatter(
         fmt="%(asctime)s [%(levelname)s] %(name)s - %(funcName)s:%(lineno)d - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S"
     )
     file_handler.setFormatter(file_formatter)
 
-    # Add handlers
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Sample on the logger itself so dropped debug lines are never formatted or queued
+    logger.addFilter(DebugSampler(settings.log_debug_sample_rate))
+
+    if not settings.log_async:
+        # Add handlers
+        logger.addHandler(console_handler)
+        logger.addHandler(file_handler)
+        return logger
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(queue_handler.queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
 
     return logger
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 # Create default logger instance
 logger = setup_logger()
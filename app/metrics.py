@@ -0,0 +1,394 @@
+"""
+In-process metrics with Prometheus text exposition
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Latency buckets in seconds, sized for LLM calls that take 0.1s-60s
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric(ABC):
+    """Base class for labelled metrics"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        """
+        Initialize metric
+
+        Args:
+            name: Metric name
+            description: Help text
+            labels: Label names
+        """
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Label values in declaration order"""
+        return tuple(str(labels.get(label, "")) for label in self.label_names)
+
+    def _format_labels(self, values: LabelValues, extra: Optional[Dict[str, str]] = None) -> str:
+        """Render {label="value",...}"""
+        pairs = list(zip(self.label_names, values)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        """Render exposition lines including HELP and TYPE"""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            lines.extend(self._render_samples())
+        return lines
+
+    @abstractmethod
+    def _render_samples(self) -> List[str]:
+        """Render sample lines (called with the lock held)"""
+
+
+class Counter(Metric):
+    """Monotonically increasing counter"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the counter"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current value for the given labels"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _render_samples(self) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {value}" for key, value in sorted(self._values.items())]
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge"""
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the gauge"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        """Decrease the gauge"""
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """Count the enclosed block as in flight"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _render_samples(self) -> List[str]:
+        return [f"{self.name}{self._format_labels(key)} {value}" for key, value in sorted(self._values.items())]
+
+
+class Histogram(Metric):
+    """Cumulative histogram of observed values"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation"""
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            counts[-1] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the enclosed block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        for key, counts in sorted(self._counts.items()):
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': str(bound)})} {count}")
+            lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': '+Inf'})} {counts[-1]}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {self._sums[key]}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {counts[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric and return it"""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Gemini API calls
+GEMINI_CALLS = REGISTRY.register(Counter(
+    "gemini_calls_total", "Gemini API calls by model, call kind and outcome", ["model", "kind", "outcome"]
+))
+GEMINI_CALL_DURATION = REGISTRY.register(Histogram(
+    "gemini_call_duration_seconds", "Gemini API call latency", ["model", "kind"]
+))
+GEMINI_ERRORS = REGISTRY.register(Counter(
+    "gemini_errors_total", "Gemini API errors by exception type", ["model", "kind", "error"]
+))
+GEMINI_RETRIES = REGISTRY.register(Counter(
+    "gemini_retries_total", "Gemini API call retries", ["model", "kind"]
+))
+GEMINI_HEDGES = REGISTRY.register(Counter(
+    "gemini_hedges_total", "Hedge requests sent for slow Gemini API calls", ["model", "kind"]
+))
+GEMINI_CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "gemini_circuit_state", "Circuit breaker state (0=closed, 1=half_open, 2=open)", ["breaker"]
+))
+GEMINI_CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "gemini_concurrency_limit", "Adaptive concurrency limit for Gemini API calls", ["model"]
+))
+GEMINI_CONCURRENCY_BACKOFFS = REGISTRY.register(Counter(
+    "gemini_concurrency_backoffs_total", "Adaptive concurrency limit decreases after 429/503 responses", ["model"]
+))
+GEMINI_IN_FLIGHT = REGISTRY.register(Gauge(
+    "gemini_in_flight", "Gemini API calls currently in flight", ["kind"]
+))
+GEMINI_PROMPT_CHARS = REGISTRY.register(Counter(
+    "gemini_prompt_chars_total", "Characters sent to Gemini", ["model", "kind"]
+))
+GEMINI_RESPONSE_CHARS = REGISTRY.register(Counter(
+    "gemini_response_chars_total", "Characters received from Gemini", ["model", "kind"]
+))
+GEMINI_TOKENS = REGISTRY.register(Counter(
+    "gemini_tokens_total", "Tokens reported in Gemini usage metadata", ["model", "kind", "direction"]
+))
+GEMINI_TASK_DURATION = REGISTRY.register(Histogram(
+    "gemini_task_duration_seconds",
+    "Gemini call latency including retries by task (grounding, extraction, judgement) and model",
+    ["task", "model"]
+))
+GEMINI_TASK_COST = REGISTRY.register(Counter(
+    "gemini_task_cost_usd_total", "Estimated Gemini cost by task and model (GEMINI_MODEL_PRICES)", ["task", "model"]
+))
+GEMINI_ESCALATIONS = REGISTRY.register(Counter(
+    "gemini_escalations_total", "Structured responses retried on GEMINI_MODEL after failing validation", ["task", "model"]
+))
+GEMINI_CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "gemini_cache_lookups_total", "Response cache lookups by result (hit or miss)", ["kind", "result"]
+))
+GEMINI_CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "gemini_cache_hit_ratio", "Response cache hit ratio since startup"
+))
+
+# Search pipeline
+SEARCH_STAGE_DURATION = REGISTRY.register(Histogram(
+    "search_stage_duration_seconds",
+    "Search pipeline stage latency (initial_search, detail_search, shop, grounding, extraction, judgement)",
+    ["stage"]
+))
+SEARCH_IN_FLIGHT = REGISTRY.register(Gauge(
+    "search_in_flight", "Search operations currently in flight", ["operation"]
+))
+SHOP_EXTRACTION_PATHS = REGISTRY.register(Counter(
+    "shop_extraction_path_total", "Shop name extraction path taken", ["path"]
+))
+PROMPT_COMPACTION_TOKENS = REGISTRY.register(Counter(
+    "prompt_compaction_tokens_total",
+    "Estimated tokens of text pasted into prompts, before (original) and after (sent) compaction",
+    ["stage", "state"]
+))
+PROMPT_COMPACTION_SAVED = REGISTRY.register(Counter(
+    "prompt_compaction_tokens_saved_total", "Estimated prompt tokens removed by compaction", ["stage"]
+))
+PROMPT_COMPACTION_TRUNCATIONS = REGISTRY.register(Counter(
+    "prompt_compaction_truncations_total", "Texts cut to fit the prompt token budget", ["stage"]
+))
+DETAIL_PREFETCH = REGISTRY.register(Counter(
+    "detail_prefetch_total",
+    "Speculative detail searches by result (started, hit, joined, miss, expired, evicted)",
+    ["result"]
+))
+SINGLE_FLIGHT_CALLS = REGISTRY.register(Counter(
+    "single_flight_calls_total", "Coalesced calls by result (executed or shared)", ["group", "result"]
+))
+
+
+# Process (every worker keeps its own registry, so a scrape shows one worker)
+WORKER_INFO = REGISTRY.register(Gauge(
+    "app_worker_info", "Worker process that served this scrape (metrics are per worker process)", ["pid"]
+))
+WORKER_INFO.set(1, pid=str(os.getpid()))
+
+# Logging pipeline
+LOG_RECORDS_DROPPED = REGISTRY.register(Counter(
+    "log_records_dropped_total", "Log records dropped because the async log queue was full"
+))
+
+
+def record_cache_lookup(kind: str, hit: bool) -> None:
+    """
+    Count a response cache lookup and refresh the hit ratio
+
+    Args:
+        kind: Call kind ("grounding" or "structured")
+        hit: Whether the lookup was a hit
+    """
+    GEMINI_CACHE_LOOKUPS.inc(kind=kind, result="hit" if hit else "miss")
+    hits = sum(GEMINI_CACHE_LOOKUPS.value(kind=k, result="hit") for k in ("grounding", "structured"))
+    misses = sum(GEMINI_CACHE_LOOKUPS.value(kind=k, result="miss") for k in ("grounding", "structured"))
+    GEMINI_CACHE_HIT_RATIO.set(hits / (hits + misses))
+
+
+@contextmanager
+def track_gemini_call(model: str, kind: str, prompt: str) -> Iterator[None]:
+    """
+    Record count, latency, in-flight gauge and errors for one API call
+
+    Args:
+        model: Gemini model name
+        kind: Call kind ("grounding" or "structured")
+        prompt: Prompt text sent to the API
+    """
+    GEMINI_PROMPT_CHARS.inc(len(prompt), model=model, kind=kind)
+    start = time.perf_counter()
+    with GEMINI_IN_FLIGHT.track(kind=kind):
+        try:
+            yield
+        except BaseException as e:
+            GEMINI_CALLS.inc(model=model, kind=kind, outcome="error")
+            GEMINI_ERRORS.inc(model=model, kind=kind, error=type(e).__name__)
+            raise
+        else:
+            GEMINI_CALLS.inc(model=model, kind=kind, outcome="success")
+        finally:
+            GEMINI_CALL_DURATION.observe(time.perf_counter() - start, model=model, kind=kind)
+
+
+def record_gemini_usage(model: str, kind: str, response) -> None:
+    """
+    Record response size and token usage from a GenerateContentResponse
+
+    Args:
+        model: Gemini model name
+        kind: Call kind ("grounding" or "structured")
+        response: Response object from the API
+    """
+    GEMINI_RESPONSE_CHARS.inc(len(response.text or ""), model=model, kind=kind)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for direction, attribute in (("prompt", "prompt_token_count"), ("response", "candidates_token_count")):
+        count = getattr(usage, attribute, None)
+        if count:
+            GEMINI_TOKENS.inc(count, model=model, kind=kind, direction=direction)
+
+
+def observe_stage(stage: str, in_flight: bool = False) -> Callable:
+    """
+    Decorator recording a search pipeline stage's latency
+
+    Works for both sync and async functions.
+
+    Args:
+        stage: Stage label for search_stage_duration_seconds
+        in_flight: Also track the call in the search_in_flight gauge
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _stage_context(stage, in_flight):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _stage_context(stage, in_flight):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def _stage_context(stage: str, in_flight: bool) -> Iterator[None]:
+    """Time a stage and optionally count it as in flight"""
+    if in_flight:
+        SEARCH_IN_FLIGHT.inc(operation=stage)
+    try:
+        with SEARCH_STAGE_DURATION.time(stage=stage):
+            yield
+    finally:
+        if in_flight:
+            SEARCH_IN_FLIGHT.dec(operation=stage)
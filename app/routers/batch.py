@@ -0,0 +1,73 @@
+"""
+Batch search job endpoints
+"""
+from typing import AsyncIterator
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.schemas.batch import BatchJobStatus, BatchSearchRequest
+from app.services.batch_service import BatchJob, get_batch_manager
+from app.services.registry import get_registry
+from app.logger import logger
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+
+def _get_job(job_id: str) -> BatchJob:
+    """Look up a job or respond with 404"""
+    job = get_batch_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job not found: {job_id}")
+    return job
+
+
+@router.post("", response_model=BatchJobStatus, status_code=202)
+async def submit_batch(request: BatchSearchRequest):
+    """
+    Submit a batch job running Steps 1-5 for every query
+
+    Returns immediately with the job ID; poll GET /api/batch/{job_id} or
+    read GET /api/batch/{job_id}/results.
+    """
+    logger.info(f"[POST /api/batch] Received {len(request.queries)} queries")
+    registry = get_registry()
+    if not registry.settings.background_jobs_enabled:
+        raise HTTPException(status_code=503, detail="Batch jobs are disabled (BACKGROUND_JOBS_ENABLED=false)")
+    job = get_batch_manager().submit(request, registry.search_service)
+    return job.to_status()
+
+
+@router.get("/{job_id}", response_model=BatchJobStatus)
+async def get_batch_status(job_id: str):
+    """Get the progress of a batch job"""
+    return _get_job(job_id).to_status()
+
+
+@router.get("/{job_id}/results")
+async def get_batch_results(job_id: str, follow: bool = False):
+    """
+    Get batch results as JSONL (one BatchQueryResult per line)
+
+    Args:
+        follow: Keep the response open and stream new results until the job
+            finishes (otherwise only the results so far are returned)
+    """
+    job = _get_job(job_id)
+
+    async def lines() -> AsyncIterator[str]:
+        if follow:
+            async for result in job.follow():
+                yield result.model_dump_json() + "\n"
+        else:
+            for result in list(job.results):
+                yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.delete("/{job_id}", response_model=BatchJobStatus)
+async def cancel_batch(job_id: str):
+    """Cancel a running batch job (results so far are kept)"""
+    job = _get_job(job_id)
+    get_batch_manager().cancel(job_id)
+    logger.info(f"[DELETE /api/batch/{job_id}] Cancel requested")
+    return job.to_status()
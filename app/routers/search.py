@@ -1,14 +1,26 @@
 """
 Search API endpoints
 """
-from fastapi import APIRouter, HTTPException, Depends
+import json
+from typing import AsyncIterator, Optional, Type
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
 from app.schemas.search import (
+    DetailJobStatus,
     SearchRequest,
     InitialSearchResponse,
     ShopDetailRequest,
-    ShopDetailSearchResponse
+    ShopDetailSearchResponse,
+    SummaryEvent,
+    DetailStreamDoneEvent
 )
+from app.services.detail_jobs import DetailJob, get_detail_job_manager
+from app.services.job_queue import QueueFullError
+from app.services.resilience import CircuitOpenError
+from app.services.response_fields import COMPACT_EXCLUDE, parse_fields, shape_response
 from app.services.search_service import SearchService
+from app.services.registry import get_registry
 from app.logger import logger
 
 router = APIRouter(prefix="/api", tags=["search"])
@@ -17,28 +29,68 @@ router = APIRouter(prefix="/api", tags=["search"])
 def get_search_service() -> SearchService:
     """
     Dependency to get SearchService instance.
-    Creates a new instance each time to pick up latest settings.
+    Returns the application-scoped instance; settings changes are picked up
+    through reload_services(), which swaps the registry atomically.
     """
-    return SearchService()
+    return get_registry().search_service
+
+
+def get_request_deadline(
+    request: ShopDetailRequest,
+    x_request_deadline: Optional[float] = Header(None, gt=0, description="Time budget in seconds")
+) -> Optional[float]:
+    """
+    Dependency resolving the detail search time budget.
+    Taken from the `deadline_seconds` field or the `X-Request-Deadline`
+    header (seconds); the tighter one wins when both are given.
+    """
+    budgets = [budget for budget in (request.deadline_seconds, x_request_deadline) if budget is not None]
+    return min(budgets) if budgets else None
+
+
+def _parse_fields(model: Type[BaseModel], fields: Optional[str]) -> Optional[dict]:
+    """Parse a `fields=` selection or respond with 400"""
+    try:
+        return parse_fields(model, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _shaped(response: BaseModel, include: Optional[dict], compact: bool):
+    """Return the response as-is, or as JSON with field selection / compact mode applied"""
+    if include is None and not compact:
+        return response
+    return JSONResponse(content=shape_response(response, include, compact))
 
 
 @router.post("/search", response_model=InitialSearchResponse)
 async def initial_search(
     request: SearchRequest,
+    compact: bool = Query(False, description="Leave out prompt_used, raw_response and null fields"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. shop_list)"),
     search_service: SearchService = Depends(get_search_service)
 ):
     """
     Step 1-3: Initial Grounding Search and shop name extraction
 
-    Now uses real Google AI integration (Stage 3)
+    Now uses real Google AI integration (Stage 3). `compact=true` and
+    `fields=` trim the response for clients that only need the shop list.
     """
     logger.info(f"[POST /api/search] Received request: {request.input_text}")
+    include = _parse_fields(InitialSearchResponse, fields)
 
     try:
         # Use real search service with AI integration
-        response = search_service.initial_search(request.input_text)
+        response = await search_service.initial_search_async(request.input_text)
         logger.info(f"[POST /api/search] Returning {len(response.shop_list.shops)} shops")
-        return response
+        return _shaped(response, include, compact)
+
+    except CircuitOpenError as e:
+        logger.error(f"[POST /api/search] Gemini unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Search temporarily unavailable: {str(e)}"
+        )
 
     except Exception as e:
         logger.error(f"[POST /api/search] Error: {type(e).__name__}: {str(e)}")
@@ -48,23 +100,56 @@ async def initial_search(
         )
 
 
-@router.post("/search/detail", response_model=ShopDetailSearchResponse)
+@router.post(
+    "/search/detail",
+    response_model=ShopDetailSearchResponse,
+    responses={202: {"model": DetailJobStatus, "description": "Job queued (background=true)"}}
+)
 async def detail_search(
     request: ShopDetailRequest,
-    search_service: SearchService = Depends(get_search_service)
+    background: bool = False,
+    compact: bool = Query(False, description="Leave out judgement.search_result (same text as detail_search_result) and null fields"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. summaries.shop_name,summaries.judgement.score)"),
+    search_service: SearchService = Depends(get_search_service),
+    deadline: Optional[float] = Depends(get_request_deadline)
 ):
     """
     Step 4-5: Individual shop detail search and match judgement
 
-    Now uses real Google AI integration (Stage 5)
+    Now uses real Google AI integration (Stage 5). With a deadline, shops
+    not finished in time are returned with status "timed_out". With
+    `background=true` the search is queued and a job ID is returned at
+    once; poll GET /api/search/detail/jobs/{job_id} for the summaries.
+    `compact=true` drops the duplicated detail text and `fields=` selects
+    the fields to return.
     """
     logger.info(f"[POST /api/search/detail] Received request for {len(request.shop_names)} shops")
+    include = _parse_fields(ShopDetailSearchResponse, fields)
+
+    if background:
+        if not get_registry().settings.background_jobs_enabled:
+            raise HTTPException(status_code=503, detail="Background jobs are disabled (BACKGROUND_JOBS_ENABLED=false)")
+        try:
+            job = await get_detail_job_manager().submit(request, deadline)
+        except QueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(status_code=202, content=job.to_status().model_dump())
 
     try:
         # Use real search service with AI integration
-        response = search_service.detail_search(request.input_text, request.shop_names)
-        logger.info(f"[POST /api/search/detail] Returning {len(response.summaries)} summaries")
-        return response
+        response = await search_service.detail_search_async(request.input_text, request.shop_names, deadline)
+        logger.info(
+            f"[POST /api/search/detail] Returning {len(response.summaries)} summaries "
+            f"({len(response.timed_out)} timed out)"
+        )
+        return _shaped(response, include, compact)
+
+    except CircuitOpenError as e:
+        logger.error(f"[POST /api/search/detail] Gemini unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Detail search temporarily unavailable: {str(e)}"
+        )
 
     except Exception as e:
         logger.error(f"[POST /api/search/detail] Error: {type(e).__name__}: {str(e)}")
@@ -72,3 +157,101 @@ async def detail_search(
             status_code=500,
             detail=f"Detail search failed: {str(e)}"
         )
+
+
+@router.post("/search/detail/stream")
+async def detail_search_stream(
+    request: ShopDetailRequest,
+    compact: bool = Query(False, description="Leave out judgement.search_result and null fields in summaries"),
+    search_service: SearchService = Depends(get_search_service),
+    deadline: Optional[float] = Depends(get_request_deadline)
+):
+    """
+    Step 4-5 (streaming): emit each shop's summary as Server-Sent Events
+
+    Events:
+        summary: SummaryEvent, one per shop in completion order (shops still
+            running at the deadline are sent last with status "timed_out")
+        done: DetailStreamDoneEvent after the last shop
+        error: {"detail": str} if the stream fails
+
+    With `compact=true` summaries leave out judgement.search_result and
+    null fields as in /api/search/detail.
+    """
+    logger.info(f"[POST /api/search/detail/stream] Received request for {len(request.shop_names)} shops")
+
+    async def event_stream() -> AsyncIterator[str]:
+        total = len(request.shop_names)
+        completed = 0
+        timed_out = []
+        try:
+            async for index, summary in search_service.detail_search_stream(
+                request.input_text, request.shop_names, deadline
+            ):
+                completed += 1
+                if summary.status == "timed_out":
+                    timed_out.append(summary.shop_name)
+                yield _sse_event("summary", SummaryEvent(
+                    index=index,
+                    completed=completed,
+                    total=total,
+                    summary=summary
+                ), compact)
+
+            logger.info(f"[POST /api/search/detail/stream] Streamed {completed} summaries")
+            yield _sse_event("done", DetailStreamDoneEvent(
+                input_text=request.input_text,
+                shop_names=request.shop_names,
+                completed=completed,
+                timed_out=timed_out
+            ))
+
+        except Exception as e:
+            logger.error(f"[POST /api/search/detail/stream] Error: {type(e).__name__}: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'detail': f'Detail search failed: {str(e)}'}, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse_event(event: str, payload: BaseModel, compact: bool = False) -> str:
+    """Format a Server-Sent Event (compact: trimmed as in compact responses)"""
+    if compact:
+        data = payload.model_dump_json(exclude=COMPACT_EXCLUDE.get(type(payload)), exclude_none=True)
+    else:
+        data = payload.model_dump_json()
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def _get_detail_job(job_id: str) -> DetailJob:
+    """Look up a background detail job or respond with 404"""
+    job = get_detail_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Detail search job not found: {job_id}")
+    return job
+
+
+@router.get("/search/detail/jobs/{job_id}", response_model=DetailJobStatus)
+async def get_detail_job(
+    job_id: str,
+    compact: bool = Query(False, description="Leave out judgement.search_result in summaries")
+):
+    """
+    Get the status of a background detail search
+
+    `summaries` holds each finished shop's summary in request order (null
+    for shops still running), so partial results can be shown early.
+    """
+    return _shaped(_get_detail_job(job_id).to_status(), None, compact)
+
+
+@router.delete("/search/detail/jobs/{job_id}", response_model=DetailJobStatus)
+async def cancel_detail_job(job_id: str):
+    """Cancel a queued or running background detail search (finished summaries are kept)"""
+    job = _get_detail_job(job_id)
+    get_detail_job_manager().cancel(job_id)
+    logger.info(f"[DELETE /api/search/detail/jobs/{job_id}] Cancel requested")
+    return job.to_status()
@@ -0,0 +1,40 @@
+"""
+Pydantic schemas for batch search jobs
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from app.schemas.search import SummaryData
+
+
+# Request Schemas
+
+class BatchSearchRequest(BaseModel):
+    """Batch search job request"""
+    queries: List[str] = Field(..., min_items=1, description="Search queries to run")
+    max_shops: Optional[int] = Field(None, ge=1, le=10, description="Detail-search only the first N shops per query")
+    detail: bool = Field(True, description="Run the detail search (Steps 4-5) after the initial search")
+
+
+# Response Schemas
+
+class BatchQueryResult(BaseModel):
+    """Result of one query in a batch job (one JSONL line)"""
+    index: int = Field(..., description="0-based position of the query in the request")
+    input_text: str = Field(..., description="Search query")
+    shop_names: List[str] = Field(default_factory=list, description="Shops found by the initial search")
+    summaries: List[SummaryData] = Field(default_factory=list, description="Detail search summary for each shop")
+    error: Optional[str] = Field(None, description="Error message if the query failed")
+    elapsed_seconds: float = Field(..., description="Time spent on the query")
+
+
+class BatchJobStatus(BaseModel):
+    """Status of a batch job"""
+    job_id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="queued, running, completed, failed or cancelled")
+    total: int = Field(..., description="Number of queries")
+    completed: int = Field(..., description="Number of queries finished (including failed ones)")
+    failed: int = Field(..., description="Number of queries that failed")
+    created_at: float = Field(..., description="Submission time (UNIX seconds)")
+    finished_at: Optional[float] = Field(None, description="Completion time (UNIX seconds)")
+    output_path: Optional[str] = Field(None, description="JSONL file the results are written to")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
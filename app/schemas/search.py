@@ -25,6 +25,30 @@ class JudgementSchema(BaseModel):
     )
 
 
+class ShopJudgementItem(BaseModel):
+    """
+    Schema for one shop's judgement inside a batched judgement.
+    The score range is not enforced here so one bad entry does not reject
+    the whole batch; entries are re-validated against JudgementSchema.
+    """
+    shop_name: str = Field(
+        description="判定対象の店舗名(入力された店舗名をそのまま記載)"
+    )
+    score: int = Field(
+        description="合致度スコア(1:まったく合致しない ～ 5:完全に合致)"
+    )
+    reason: str = Field(
+        description="判定理由(100文字以内)"
+    )
+
+
+class BatchJudgementSchema(BaseModel):
+    """Schema for batched match judgement of multiple shops from Gemini"""
+    judgements: List[ShopJudgementItem] = Field(
+        description="店舗ごとの判定結果リスト"
+    )
+
+
 # Request Schemas
 
 class SearchRequest(BaseModel):
@@ -36,6 +60,9 @@ class ShopDetailRequest(BaseModel):
     """Shop detail search request"""
     input_text: str = Field(..., min_length=1, description="Original user's search query")
     shop_names: List[str] = Field(..., min_items=1, description="List of shop names to search")
+    deadline_seconds: Optional[float] = Field(
+        None, gt=0, description="Time budget for the whole request; unfinished shops are returned as timed out"
+    )
 
 
 # Response Data Models
@@ -65,6 +92,7 @@ class SummaryData(BaseModel):
     detail_search_result: str = Field(..., description="Detail search result text")
     judgement: JudgementData = Field(..., description="Match judgement")
     sources: List[SourceCitation] = Field(default_factory=list, description="Source citations from grounding search")
+    status: str = Field("completed", description="Processing status: completed, error or timed_out")
 
 
 # Response Schemas
@@ -84,3 +112,41 @@ class ShopDetailSearchResponse(BaseModel):
     input_text: str = Field(..., description="Original input text")
     shop_names: List[str] = Field(..., description="Shop names searched")
     summaries: List[SummaryData] = Field(..., description="Summary for each shop")
+    timed_out: List[str] = Field(default_factory=list, description="Shops not finished before the deadline")
+
+
+# Streaming Event Schemas
+
+class SummaryEvent(BaseModel):
+    """Streamed event carrying one shop's summary as soon as it completes"""
+    index: int = Field(..., description="0-based position of the shop in the request")
+    completed: int = Field(..., description="Number of shops completed so far")
+    total: int = Field(..., description="Number of shops in the request")
+    summary: SummaryData = Field(..., description="Summary for the shop")
+
+
+class DetailStreamDoneEvent(BaseModel):
+    """Final streamed event after every shop has been processed"""
+    input_text: str = Field(..., description="Original input text")
+    shop_names: List[str] = Field(..., description="Shop names searched")
+    completed: int = Field(..., description="Number of summaries emitted")
+    timed_out: List[str] = Field(default_factory=list, description="Shops not finished before the deadline")
+
+
+# Background Job Schemas
+
+class DetailJobStatus(BaseModel):
+    """Status and partial results of a background detail search job"""
+    job_id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="queued, running, completed, failed or cancelled")
+    input_text: str = Field(..., description="Original input text")
+    shop_names: List[str] = Field(..., description="Shop names searched")
+    total: int = Field(..., description="Number of shops in the job")
+    completed: int = Field(..., description="Number of shops finished so far")
+    summaries: List[Optional[SummaryData]] = Field(
+        ..., description="Summary for each shop in request order (null while not finished)"
+    )
+    created_at: float = Field(..., description="Submission time (UNIX seconds)")
+    started_at: Optional[float] = Field(None, description="Time a worker started the job (UNIX seconds)")
+    finished_at: Optional[float] = Field(None, description="Completion time (UNIX seconds)")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
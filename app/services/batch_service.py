@@ -0,0 +1,331 @@
+"""
+Batch search jobs over many queries with shared caching and deduplication
+"""
+import asyncio
+import math
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from app.config import Settings, get_settings
+from app.schemas.batch import BatchJobStatus, BatchQueryResult, BatchSearchRequest
+from app.schemas.search import SummaryData
+from app.services.search_service import SearchService, shop_fact_scope
+from app.services.shop_index import ShopFactIndex
+from app.logger import logger
+
+# Job states that will not change any more
+FINISHED_STATES = ("completed", "failed", "cancelled")
+
+
+class BatchRunner:
+    """
+    Run the full initial + detail pipeline for a list of queries
+
+    Up to `concurrency` queries run at once through the same search service
+    (and so the same prompts) as /api/search/detail, and every Gemini call
+    shares its response cache, single-flight groups and token bucket.
+    Identical queries are searched once. Query-independent shop facts are
+    fetched once per shop (keyed by the normalized shop name) across the
+    whole batch: the shared shop index is used when SHOP_INDEX_ENABLED is on,
+    otherwise a batch-scoped in-memory index. The relevance judgement still
+    runs per query with the API's judgement prompt.
+    """
+
+    def __init__(
+        self,
+        search_service: SearchService,
+        concurrency: int,
+        max_shops: Optional[int] = None,
+        detail: bool = True
+    ):
+        """
+        Initialize runner
+
+        Args:
+            search_service: Shared search service
+            concurrency: Maximum number of queries in flight
+            max_shops: Detail-search only the first N shops per query
+            detail: Run the detail search after the initial search
+        """
+        self.search_service = search_service
+        self.concurrency = max(1, concurrency)
+        self.max_shops = max_shops
+        self.detail = detail
+
+    async def run(self, queries: List[str]) -> AsyncIterator[BatchQueryResult]:
+        """
+        Search every query, yielding results as they complete
+
+        Args:
+            queries: Search queries
+
+        Yields:
+            BatchQueryResult: One result per query, in completion order
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        shop_index: Optional[ShopFactIndex] = None
+        if self.detail and self.search_service.shop_index is None:
+            shop_index = ShopFactIndex(":memory:", math.inf, math.inf)
+        searches: Dict[str, asyncio.Future] = {}
+        results = []
+        for index, query in enumerate(queries):
+            key = query.strip()
+            if key not in searches:
+                searches[key] = asyncio.ensure_future(self._search(key, semaphore, shop_index))
+            results.append(asyncio.ensure_future(self._result(index, query, searches[key])))
+
+        logger.info(f"[Batch] Running {len(queries)} queries ({len(searches)} unique, concurrency={self.concurrency})")
+        try:
+            for completed in asyncio.as_completed(results):
+                yield await completed
+        finally:
+            for task in [*results, *searches.values()]:
+                task.cancel()
+            if shop_index is not None:
+                await asyncio.gather(*searches.values(), return_exceptions=True)
+                shop_index.close()
+
+    async def _search(
+        self,
+        query: str,
+        semaphore: asyncio.Semaphore,
+        shop_index: Optional[ShopFactIndex]
+    ) -> Tuple[List[str], List[SummaryData], float]:
+        """Run the pipeline for one unique query"""
+        if shop_index is not None:
+            with shop_fact_scope(shop_index):
+                return await self._search(query, semaphore, None)
+        async with semaphore:
+            start = time.monotonic()
+            initial = await self.search_service.initial_search_async(query)
+            shop_names = initial.shop_list.shops
+            summaries: List[SummaryData] = []
+            targets = shop_names[:self.max_shops] if self.max_shops else shop_names
+            if self.detail and targets:
+                detail = await self.search_service.detail_search_async(query, targets)
+                summaries = detail.summaries
+            return shop_names, summaries, time.monotonic() - start
+
+    async def _result(self, index: int, query: str, search: asyncio.Future) -> BatchQueryResult:
+        """Wrap a (possibly shared) query search as a result line"""
+        start = time.monotonic()
+        try:
+            shop_names, summaries, elapsed = await search
+        except Exception as e:
+            logger.error(f"[Batch] Query {index} failed: {type(e).__name__}: {str(e)}")
+            return BatchQueryResult(
+                index=index,
+                input_text=query,
+                error=f"{type(e).__name__}: {str(e)}",
+                elapsed_seconds=round(time.monotonic() - start, 3)
+            )
+        return BatchQueryResult(
+            index=index,
+            input_text=query,
+            shop_names=shop_names,
+            summaries=summaries,
+            elapsed_seconds=round(elapsed, 3)
+        )
+
+
+class BatchJob:
+    """A submitted batch search and its results so far"""
+
+    def __init__(self, request: BatchSearchRequest, output_dir: Path):
+        """
+        Initialize job
+
+        Args:
+            request: Batch search request
+            output_dir: Directory for the job's `<job_id>.jsonl` result file
+        """
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.output_path = output_dir / f"{self.id}.jsonl"
+        self.status = "queued"
+        self.results: List[BatchQueryResult] = []
+        self.failed = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._updated = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has stopped"""
+        return self.status in FINISHED_STATES
+
+    def add_result(self, result: BatchQueryResult) -> None:
+        """Record a finished query and wake up followers"""
+        self.results.append(result)
+        if result.error:
+            self.failed += 1
+        self._notify()
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        """Mark the job as finished"""
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self._notify()
+
+    def _notify(self) -> None:
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[BatchQueryResult]:
+        """
+        Yield results recorded so far, then new ones until the job finishes
+
+        Yields:
+            BatchQueryResult: Results in completion order
+        """
+        index = 0
+        while True:
+            updated = self._updated
+            while index < len(self.results):
+                yield self.results[index]
+                index += 1
+            if self.finished:
+                return
+            await updated.wait()
+
+    def to_status(self) -> BatchJobStatus:
+        """Build the status response"""
+        return BatchJobStatus(
+            job_id=self.id,
+            status=self.status,
+            total=len(self.request.queries),
+            completed=len(self.results),
+            failed=self.failed,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            output_path=str(self.output_path),
+            error=self.error
+        )
+
+
+class BatchJobManager:
+    """In-process registry of batch jobs running as asyncio tasks"""
+
+    def __init__(self, settings: Settings):
+        """
+        Initialize manager
+
+        Args:
+            settings: Application settings
+        """
+        self.settings = settings
+        self.output_dir = Path(settings.batch_output_dir)
+        self.jobs: Dict[str, BatchJob] = {}
+
+    def submit(self, request: BatchSearchRequest, search_service: SearchService) -> BatchJob:
+        """
+        Start a batch job in the background
+
+        Args:
+            request: Batch search request
+            search_service: Shared search service
+
+        Returns:
+            BatchJob: The queued job
+        """
+        self._prune()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        job = BatchJob(request, self.output_dir)
+        runner = BatchRunner(
+            search_service,
+            self.settings.batch_concurrency,
+            max_shops=request.max_shops,
+            detail=request.detail
+        )
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, runner))
+        logger.info(f"[Batch] Job {job.id} submitted: {len(request.queries)} queries")
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        """Look up a job by ID"""
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[BatchJob]:
+        """
+        Cancel a running job
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Optional[BatchJob]: The job, or None if unknown
+        """
+        job = self.jobs.get(job_id)
+        if job is not None and job.task is not None and not job.finished:
+            job.task.cancel()
+        return job
+
+    async def _run(self, job: BatchJob, runner: BatchRunner) -> None:
+        """Run a job, appending each result to its JSONL file"""
+        job.status = "running"
+        start = time.monotonic()
+        try:
+            # File I/O runs off the event loop so other requests are not stalled
+            await asyncio.to_thread(job.output_path.write_text, "", encoding="utf-8")
+            async for result in runner.run(job.request.queries):
+                await asyncio.to_thread(_append_line, job.output_path, result.model_dump_json())
+                job.add_result(result)
+            job.finish("completed")
+        except asyncio.CancelledError:
+            job.finish("cancelled")
+            logger.warning(f"[Batch] Job {job.id} cancelled after {len(job.results)} queries")
+            return
+        except Exception as e:
+            job.finish("failed", f"{type(e).__name__}: {str(e)}")
+            logger.error(f"[Batch] Job {job.id} failed: {job.error}")
+            return
+        logger.info(
+            f"[Batch] Job {job.id} completed: {len(job.results)} queries "
+            f"({job.failed} failed) in {time.monotonic() - start:.1f}s"
+        )
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond BATCH_MAX_JOBS"""
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in finished[:max(0, len(self.jobs) - self.settings.batch_max_jobs + 1)]:
+            del self.jobs[job.id]
+
+    async def aclose(self) -> None:
+        """Cancel running jobs"""
+        tasks = [job.task for job in self.jobs.values() if job.task is not None and not job.finished]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _append_line(path: Path, line: str) -> None:
+    """Append one JSONL line to a file (runs in a worker thread)"""
+    with open(path, "a", encoding="utf-8") as output:
+        output.write(line + "\n")
+
+
+_manager: Optional[BatchJobManager] = None
+
+
+def get_batch_manager() -> BatchJobManager:
+    """
+    Get the application-wide batch job manager, creating it on first use
+
+    Returns:
+        BatchJobManager: The manager
+    """
+    global _manager
+    if _manager is None:
+        _manager = BatchJobManager(get_settings())
+    return _manager
+
+
+async def shutdown_batch_jobs() -> None:
+    """Cancel running batch jobs (called from the shutdown hook)"""
+    if _manager is not None:
+        await _manager.aclose()
@@ -0,0 +1,373 @@
+"""
+Response cache for Gemini calls with TTL and LRU eviction
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Type
+from pydantic import BaseModel
+from app.config import Settings
+from app.logger import logger
+
+if TYPE_CHECKING:
+    from app.services.shared_state import SharedState
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt so trivially different inputs share a cache entry
+
+    Args:
+        prompt: Prompt text
+
+    Returns:
+        str: NFKC-normalized prompt with collapsed whitespace
+    """
+    return " ".join(unicodedata.normalize("NFKC", prompt).split())
+
+
+@lru_cache(maxsize=None)
+def _schema_fingerprint(schema: Type[BaseModel]) -> str:
+    """Stable fingerprint of a schema's JSON definition"""
+    schema_json = json.dumps(schema.model_json_schema(), sort_keys=True, ensure_ascii=False)
+    return f"{schema.__name__}:{hashlib.sha256(schema_json.encode('utf-8')).hexdigest()[:16]}"
+
+
+def make_cache_key(
+    kind: str,
+    model: str,
+    prompt: str,
+    schema: Optional[Type[BaseModel]] = None
+) -> str:
+    """
+    Build a cache key from model, normalized prompt and schema
+
+    Args:
+        kind: Call type ("grounding" or "structured")
+        model: Gemini model name
+        prompt: Prompt text
+        schema: Response schema for structured calls
+
+    Returns:
+        str: Hex digest cache key
+    """
+    schema_part = _schema_fingerprint(schema) if schema else ""
+    raw = "\x1f".join([kind, model, schema_part, normalize_prompt(prompt)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """
+    Base class for response cache backends storing text values
+
+    Backends doing I/O set `blocking`; their `get_async` / `set_async` run
+    in a worker thread so lookups never stall the event loop. Backends
+    whose entries every worker process can read set `shared_across_workers`.
+    """
+
+    backend_name = "base"
+    blocking = False
+    shared_across_workers = False
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        """
+        Initialize cache
+
+        Args:
+            ttl_seconds: Time-to-live for each entry
+            max_entries: Maximum number of entries before LRU eviction
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Optional[str]: Cached value, or None on miss/expiry
+        """
+        with self._lock:
+            value = self._get(key, time.time())
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Text value to store
+        """
+        with self._lock:
+            self.evictions += self._set(key, value, time.time())
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """get() without blocking the event loop"""
+        if self.blocking:
+            return await asyncio.to_thread(self.get, key)
+        return self.get(key)
+
+    async def set_async(self, key: str, value: str) -> None:
+        """set() without blocking the event loop"""
+        if self.blocking:
+            await asyncio.to_thread(self.set, key, value)
+        else:
+            self.set(key, value)
+
+    def stats(self) -> dict:
+        """
+        Get cache counters
+
+        Returns:
+            dict: backend, size, hits, misses, evictions and hit_ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend_name,
+                "size": self._size(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    @abstractmethod
+    def _get(self, key: str, now: float) -> Optional[str]:
+        """Backend lookup (called with the lock held)"""
+
+    @abstractmethod
+    def _set(self, key: str, value: str, now: float) -> int:
+        """Backend store (called with the lock held); returns evicted count"""
+
+    @abstractmethod
+    def _size(self) -> int:
+        """Number of stored entries (called with the lock held)"""
+
+    def close(self) -> None:
+        """Release backend resources"""
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process LRU cache"""
+
+    backend_name = "memory"
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        super().__init__(ttl_seconds, max_entries)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def _get(self, key: str, now: float) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: str, now: float) -> int:
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def _size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk LRU cache that survives restarts
+
+    Reads do not write: access times for LRU eviction are collected in
+    memory and written with the next store (or every
+    TOUCH_FLUSH_THRESHOLD reads), and expired rows are deleted on store.
+    """
+
+    backend_name = "sqlite"
+    blocking = True
+    # Workers on one host open the same file
+    shared_across_workers = True
+
+    # Pending access times written in one commit after this many reads
+    TOUCH_FLUSH_THRESHOLD = 100
+
+    def __init__(self, ttl_seconds: float, max_entries: int, path: str):
+        """
+        Open (or create) the cache database
+
+        Args:
+            ttl_seconds: Time-to-live for each entry
+            max_entries: Maximum number of entries before LRU eviction
+            path: SQLite database file path
+        """
+        super().__init__(ttl_seconds, max_entries)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)"
+        )
+        self._conn.commit()
+        self._touched: Dict[str, float] = {}
+
+    def _get(self, key: str, now: float) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        self._touched[key] = now
+        if len(self._touched) >= self.TOUCH_FLUSH_THRESHOLD:
+            self._flush_touched()
+            self._conn.commit()
+        return row[0]
+
+    def _flush_touched(self) -> None:
+        """Write pending access times (the caller commits)"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _set(self, key: str, value: str, now: float) -> int:
+        self._touched.pop(key, None)
+        self._flush_touched()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, value, now + self.ttl_seconds, now)
+        )
+        # Drop expired entries first, then least recently used ones over the limit
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        overflow = self._size() - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+        self._conn.commit()
+        return max(0, overflow)
+
+    def _size(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+class SharedResponseCache(ResponseCache):
+    """
+    Cache in the cross-worker shared state backend
+
+    Entries expire by TTL; size limits are left to the backend (e.g. the
+    Redis maxmemory policy), so max_entries is not enforced.
+    """
+
+    backend_name = "shared"
+    blocking = True
+    shared_across_workers = True
+
+    KEY_PREFIX = "response:"
+
+    def __init__(self, ttl_seconds: float, max_entries: int, state: "SharedState"):
+        """
+        Initialize cache
+
+        Args:
+            ttl_seconds: Time-to-live for each entry
+            max_entries: Unused (kept for a uniform constructor)
+            state: Shared state backend
+        """
+        super().__init__(ttl_seconds, max_entries)
+        self.state = state
+
+    def _get(self, key: str, now: float) -> Optional[str]:
+        return self.state.get(f"{self.KEY_PREFIX}{key}")
+
+    def _set(self, key: str, value: str, now: float) -> int:
+        self.state.set(f"{self.KEY_PREFIX}{key}", value, self.ttl_seconds)
+        return 0
+
+    def _size(self) -> int:
+        # The store also holds other shared values; count only cached responses
+        return self.state.size(self.KEY_PREFIX)
+
+
+def create_response_cache(settings: Settings, state: Optional["SharedState"] = None) -> Optional[ResponseCache]:
+    """
+    Create the cache backend selected in settings
+
+    Args:
+        settings: Application settings
+        state: Shared state backend, required by the "shared" cache backend
+
+    Returns:
+        Optional[ResponseCache]: Cache instance, or None when disabled
+
+    Raises:
+        ValueError: If the backend is unknown, or "shared" without a shared state backend
+    """
+    backend = settings.response_cache_backend.lower()
+    if backend == "shared":
+        if state is None:
+            raise ValueError("RESPONSE_CACHE_BACKEND=shared requires SHARED_STATE_BACKEND (sqlite or redis)")
+        cache = SharedResponseCache(settings.response_cache_ttl_seconds, settings.response_cache_max_entries, state)
+    elif backend == "memory":
+        cache = MemoryResponseCache(settings.response_cache_ttl_seconds, settings.response_cache_max_entries)
+    elif backend == "sqlite":
+        cache = SQLiteResponseCache(
+            settings.response_cache_ttl_seconds,
+            settings.response_cache_max_entries,
+            settings.response_cache_path
+        )
+    elif backend == "none":
+        logger.info("[Response Cache] Disabled")
+        return None
+    else:
+        raise ValueError(f"Unknown response cache backend: {settings.response_cache_backend}")
+
+    logger.info(
+        f"[Response Cache] Backend: {backend} "
+        f"(ttl={settings.response_cache_ttl_seconds}s, max_entries={settings.response_cache_max_entries})"
+    )
+    return cache
@@ -0,0 +1,89 @@
+"""
+Pool of Gemini clients with keep-alive HTTP connections
+"""
+import threading
+from typing import List
+import httpx
+from google import genai
+from google.genai import types
+from app.config import Settings
+from app.logger import logger
+
+
+class GeminiClientPool:
+    """
+    Fixed-size pool of genai clients shared by the whole application
+
+    Each client owns a sync and an async httpx client whose connections are
+    kept alive between requests, so searches skip connection setup and TLS
+    handshakes. Clients are handed out round-robin.
+    """
+
+    def __init__(self, settings: Settings):
+        """
+        Create the pool from settings
+
+        Args:
+            settings: Application settings
+        """
+        self.size = max(1, settings.gemini_client_pool_size)
+        self._http_clients: List[httpx.Client] = []
+        self._async_http_clients: List[httpx.AsyncClient] = []
+        self._clients = [self._create_client(settings) for _ in range(self.size)]
+        self._next = 0
+        self._lock = threading.Lock()
+        logger.info(
+            f"[Client Pool] Created {self.size} clients "
+            f"(max_connections={settings.gemini_max_connections}, "
+            f"keepalive_expiry={settings.gemini_keepalive_expiry}s)"
+        )
+
+    def _create_client(self, settings: Settings) -> genai.Client:
+        """
+        Create a genai client backed by keep-alive httpx clients
+
+        Args:
+            settings: Application settings
+
+        Returns:
+            genai.Client: Configured client
+        """
+        limits = httpx.Limits(
+            max_connections=settings.gemini_max_connections,
+            max_keepalive_connections=settings.gemini_max_connections,
+            keepalive_expiry=settings.gemini_keepalive_expiry
+        )
+        timeout = httpx.Timeout(settings.gemini_http_timeout_seconds)
+
+        http_client = httpx.Client(limits=limits, timeout=timeout)
+        async_http_client = httpx.AsyncClient(limits=limits, timeout=timeout)
+        self._http_clients.append(http_client)
+        self._async_http_clients.append(async_http_client)
+
+        return genai.Client(
+            api_key=settings.google_api_key,
+            http_options=types.HttpOptions(
+                httpx_client=http_client,
+                httpx_async_client=async_http_client
+            )
+        )
+
+    def acquire(self) -> genai.Client:
+        """
+        Get the next client in round-robin order
+
+        Returns:
+            genai.Client: Pooled client (do not close it)
+        """
+        with self._lock:
+            client = self._clients[self._next]
+            self._next = (self._next + 1) % self.size
+        return client
+
+    async def aclose(self) -> None:
+        """Close all pooled HTTP connections"""
+        for http_client in self._http_clients:
+            http_client.close()
+        for async_http_client in self._async_http_clients:
+            await async_http_client.aclose()
+        logger.info(f"[Client Pool] Closed {self.size} clients")
@@ -0,0 +1,385 @@
+"""
+Adaptive (AIMD) concurrency limiter for Gemini API calls
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional
+from google.genai import errors as genai_errors
+from app.config import Settings
+from app.metrics import GEMINI_CONCURRENCY_BACKOFFS, GEMINI_CONCURRENCY_LIMIT
+from app.logger import logger
+
+# Status codes meaning "over quota / overloaded": shrink the limit
+BACKOFF_STATUS_CODES = {429, 503}
+
+# Weight of the newest sample in the latency moving average
+LATENCY_EWMA_ALPHA = 0.1
+
+# Priority of the calls made in the current context (set by background_calls(); None: request)
+_PRIORITY: ContextVar[Optional["CallPriority"]] = ContextVar("gemini_call_priority", default=None)
+
+
+class CallPriority:
+    """
+    Priority of the Gemini calls made under one background_calls() block
+
+    Calls start as background work. promote() turns them into request
+    calls for the rest of their life, including calls already queued for a
+    limiter slot, e.g. when a request starts waiting on a prefetch.
+    """
+
+    def __init__(self):
+        self.background = True
+        self._listeners: List[Callable[[], None]] = []
+
+    def promote(self) -> None:
+        """Run the remaining calls at request priority"""
+        if not self.background:
+            return
+        self.background = False
+        listeners, self._listeners = self._listeners, []
+        for listener in listeners:
+            listener()
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call `listener` on promotion (used by callers queued at background priority)"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        """Forget a listener added by add_listener()"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+
+def current_call_priority() -> Optional[CallPriority]:
+    """Priority of the enclosing background_calls() block, or None for request calls"""
+    return _PRIORITY.get()
+
+
+def is_background_call() -> bool:
+    """Whether calls made in this context currently run at background priority"""
+    priority = _PRIORITY.get()
+    return priority is not None and priority.background
+
+
+@contextmanager
+def background_calls(priority: Optional[CallPriority] = None) -> Iterator[CallPriority]:
+    """
+    Mark the Gemini calls made in this context as background work
+
+    Background calls only take a limiter slot while no other call is
+    waiting for one, so speculative work (prefetches) never delays a
+    request. Tasks created inside the block inherit the mark, and
+    promoting the yielded priority lifts it for all of them.
+
+    Args:
+        priority: Priority to share (a new one when omitted)
+    """
+    priority = priority or CallPriority()
+    token = _PRIORITY.set(priority)
+    try:
+        yield priority
+    finally:
+        _PRIORITY.reset(token)
+
+
+class _Waiter:
+    """A caller queued for a slot"""
+
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.granted = False
+
+    def wake(self) -> None:
+        if self.future is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+        else:
+            self.event.set()
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Thread- and asyncio-safe concurrency limit tuned by AIMD
+
+    Each call holds a slot while it runs. After every successful call whose
+    latency is within `latency_tolerance` x the moving average, and while
+    the limit is actually in use, the limit grows by 1/limit (about +1 per
+    limit's worth of calls). A 429 or 503 multiplies it by
+    `decrease_factor`, at most once per average call latency so a burst of
+    rejections from one window counts once. Other errors and slow calls
+    leave it unchanged.
+
+    Blocking callers (worker threads) and coroutines share the same slots
+    and are admitted in FIFO order. Calls made under background_calls()
+    queue separately and are only admitted when no other caller is waiting;
+    once their priority is promoted they queue behind the waiting requests.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0
+    ):
+        """
+        Initialize limiter
+
+        Args:
+            name: Limiter name (the model name) used in logs and metrics
+            initial: Starting limit
+            min_limit: Lowest limit after backoffs
+            max_limit: Highest limit
+            decrease_factor: Multiplier applied on a rate limit response
+            latency_tolerance: Calls slower than this multiple of the
+                average latency do not raise the limit
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+        self._background_waiters: Deque[_Waiter] = deque()
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self._last_backoff = 0.0
+        self._set_parameters(min_limit, max_limit, decrease_factor, latency_tolerance)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        GEMINI_CONCURRENCY_LIMIT.set(self.limit, model=name)
+
+    def configure(self, min_limit: int, max_limit: int, decrease_factor: float, latency_tolerance: float) -> None:
+        """Update the tuning parameters (e.g. after a settings reload)"""
+        with self._lock:
+            self._set_parameters(min_limit, max_limit, decrease_factor, latency_tolerance)
+            self.limit = min(max(self.limit, self.min_limit), self.max_limit)
+            GEMINI_CONCURRENCY_LIMIT.set(self.limit, model=self.name)
+            self._grant()
+
+    @property
+    def capacity(self) -> int:
+        """Slots currently available in total"""
+        return int(self.limit)
+
+    def acquire(self) -> None:
+        """Wait for a slot, blocking the calling thread"""
+        with self._lock:
+            if self._try_take():
+                return
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+        waiter.event.wait()
+
+    async def acquire_async(self) -> None:
+        """Wait for a slot without blocking the event loop (behind other callers under background_calls())"""
+        priority = _PRIORITY.get()
+        background = priority is not None and priority.background
+        with self._lock:
+            if self._try_take(background):
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            (self._background_waiters if background else self._waiters).append(waiter)
+        if background:
+            promote = partial(self._promote, waiter)
+            priority.add_listener(promote)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    # Slot was handed over just as we were cancelled: give it back
+                    self.in_flight -= 1
+                    self._grant()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                else:
+                    self._background_waiters.remove(waiter)
+            raise
+        finally:
+            if background:
+                priority.remove_listener(promote)
+
+    def _promote(self, waiter: _Waiter) -> None:
+        """Move a queued background caller behind the waiting requests"""
+        with self._lock:
+            if not waiter.granted and waiter in self._background_waiters:
+                self._background_waiters.remove(waiter)
+                self._waiters.append(waiter)
+
+    def release(self, latency: float, error: Optional[BaseException] = None) -> None:
+        """
+        Free a slot and adjust the limit from the call's outcome
+
+        Args:
+            latency: Call duration in seconds
+            error: Exception raised by the call, if any
+        """
+        with self._lock:
+            saturated = self.in_flight >= self.capacity or bool(self._waiters or self._background_waiters)
+            self.in_flight -= 1
+            if error is None:
+                self._on_success(latency, saturated)
+            elif isinstance(error, genai_errors.APIError) and error.code in BACKOFF_STATUS_CODES:
+                self._on_backoff(error.code)
+            self._grant()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for the enclosed blocking call"""
+        self.acquire()
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.release(time.perf_counter() - start, e)
+            raise
+        self.release(time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def slot_async(self) -> AsyncIterator[None]:
+        """Hold a slot for the enclosed async call"""
+        await self.acquire_async()
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.release(time.perf_counter() - start, e)
+            raise
+        self.release(time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        """
+        Get the current limit and load
+
+        Returns:
+            dict: limit, in-flight and waiting counts (background waiters
+                included) and average latency
+        """
+        with self._lock:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiters) + len(self._background_waiters),
+                "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None
+            }
+
+    # Internal helpers (called with the lock held)
+
+    def _set_parameters(self, min_limit: int, max_limit: int, decrease_factor: float, latency_tolerance: float) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = min(max(decrease_factor, 0.1), 1.0)
+        self.latency_tolerance = latency_tolerance
+
+    def _try_take(self, background: bool = False) -> bool:
+        if self._waiters or (background and self._background_waiters) or self.in_flight >= self.capacity:
+            return False
+        self.in_flight += 1
+        return True
+
+    def _grant(self) -> None:
+        while self.in_flight < self.capacity and (self._waiters or self._background_waiters):
+            waiter = (self._waiters or self._background_waiters).popleft()
+            waiter.granted = True
+            self.in_flight += 1
+            waiter.wake()
+
+    def _on_success(self, latency: float, saturated: bool) -> None:
+        healthy = self.latency_ewma is None or latency <= self.latency_ewma * self.latency_tolerance
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += LATENCY_EWMA_ALPHA * (latency - self.latency_ewma)
+        if healthy and saturated and self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            GEMINI_CONCURRENCY_LIMIT.set(self.limit, model=self.name)
+
+    def _on_backoff(self, code: int) -> None:
+        now = time.monotonic()
+        if now - self._last_backoff < (self.latency_ewma or 1.0):
+            return
+        self._last_backoff = now
+        previous = self.limit
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        GEMINI_CONCURRENCY_LIMIT.set(self.limit, model=self.name)
+        GEMINI_CONCURRENCY_BACKOFFS.inc(model=self.name)
+        logger.warning(f"[Concurrency] {self.name}: {code} received, limit {previous:.1f} -> {self.limit:.1f}")
+
+
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_concurrency_limiter(settings: Settings, model: str) -> Optional[AdaptiveConcurrencyLimiter]:
+    """
+    Get the process-wide limiter for a model, creating it on first use
+
+    Limiters outlive service reloads so the learned limit is kept; reloaded
+    bounds are applied to the existing limiter. Limiters are per process,
+    so with SERVER_WORKERS > 1 the initial and maximum limits are split
+    across the workers to keep the total within the configured bounds.
+
+    Args:
+        settings: Application settings
+        model: Gemini model name
+
+    Returns:
+        Optional[AdaptiveConcurrencyLimiter]: The limiter, or None when
+            GEMINI_ADAPTIVE_CONCURRENCY is disabled
+    """
+    if not settings.gemini_adaptive_concurrency:
+        return None
+    workers = max(1, settings.server_workers)
+    min_limit = settings.gemini_concurrency_min
+    max_limit = settings.gemini_concurrency_max_by_model.get(model, settings.gemini_concurrency_max)
+    max_limit = max(min_limit, math.ceil(max_limit / workers))
+    initial = max(min_limit, math.ceil(settings.gemini_concurrency_initial / workers))
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(
+                model,
+                initial,
+                min_limit,
+                max_limit,
+                settings.gemini_concurrency_decrease_factor,
+                settings.gemini_concurrency_latency_tolerance
+            )
+            _limiters[model] = limiter
+            logger.info(
+                f"[Concurrency] {model}: adaptive limit {limiter.limit:.0f} "
+                f"(min={limiter.min_limit}, max={limiter.max_limit})"
+            )
+        else:
+            limiter.configure(
+                min_limit,
+                max_limit,
+                settings.gemini_concurrency_decrease_factor,
+                settings.gemini_concurrency_latency_tolerance
+            )
+    return limiter
+
+
+def limiter_stats() -> Dict[str, dict]:
+    """
+    Get stats for every model's limiter
+
+    Returns:
+        Dict[str, dict]: Stats keyed by model name
+    """
+    with _limiters_lock:
+        return {model: limiter.stats() for model, limiter in _limiters.items()}
@@ -0,0 +1,251 @@
+"""
+Background detail search jobs processed by an in-process worker pool
+"""
+import asyncio
+import time
+import uuid
+from typing import Dict, List, Optional
+from app.config import Settings, get_settings
+from app.schemas.search import DetailJobStatus, ShopDetailRequest, SummaryData
+from app.services.job_queue import JobQueue, QueueFullError, create_job_queue
+from app.services.registry import get_registry
+from app.logger import logger
+
+# Job states that will not change any more
+FINISHED_STATES = ("completed", "failed", "cancelled")
+
+
+class DetailJob:
+    """A queued detail search and its summaries so far"""
+
+    def __init__(self, input_text: str, shop_names: List[str], deadline: Optional[float] = None):
+        """
+        Initialize job
+
+        Args:
+            input_text: Original user's search query
+            shop_names: Shop names to search
+            deadline: Time budget in seconds, counted from when a worker starts the job
+        """
+        self.id = uuid.uuid4().hex
+        self.input_text = input_text
+        self.shop_names = shop_names
+        self.deadline = deadline
+        self.status = "queued"
+        self.summaries: List[Optional[SummaryData]] = [None] * len(shop_names)
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has stopped"""
+        return self.status in FINISHED_STATES
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        """Mark the job as finished"""
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+
+    def to_message(self) -> dict:
+        """Queue message carrying everything a worker needs"""
+        return {
+            "job_id": self.id,
+            "input_text": self.input_text,
+            "shop_names": self.shop_names,
+            "deadline": self.deadline
+        }
+
+    def to_status(self) -> DetailJobStatus:
+        """Build the status response"""
+        return DetailJobStatus(
+            job_id=self.id,
+            status=self.status,
+            input_text=self.input_text,
+            shop_names=self.shop_names,
+            total=len(self.shop_names),
+            completed=sum(summary is not None for summary in self.summaries),
+            summaries=self.summaries,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            error=self.error
+        )
+
+
+class DetailJobManager:
+    """
+    Queue detail searches and run them on a fixed pool of worker tasks
+
+    DETAIL_JOB_WORKERS caps how many jobs run at once (each job still uses
+    up to DETAIL_SEARCH_CONCURRENCY Gemini calls), so the total load on the
+    Gemini quota stays bounded however many jobs are submitted.
+    """
+
+    def __init__(self, settings: Settings, queue: Optional[JobQueue] = None):
+        """
+        Initialize manager
+
+        Args:
+            settings: Application settings
+            queue: Queue backend (created from settings when omitted)
+        """
+        self.settings = settings
+        self.queue = queue or create_job_queue(settings)
+        self.jobs: Dict[str, DetailJob] = {}
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the worker tasks (idempotent; needs a running event loop)"""
+        if self._workers:
+            return
+        workers = max(1, self.settings.detail_job_workers)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(workers)]
+        logger.info(f"[Detail Jobs] Started {workers} workers")
+
+    async def submit(self, request: ShopDetailRequest, deadline: Optional[float] = None) -> DetailJob:
+        """
+        Enqueue a detail search
+
+        Args:
+            request: Detail search request
+            deadline: Time budget in seconds for the job once started
+
+        Returns:
+            DetailJob: The queued job
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        self.start()
+        self._prune()
+        job = DetailJob(request.input_text, request.shop_names, deadline)
+        self.jobs[job.id] = job
+        try:
+            await self.queue.put(job.to_message())
+        except QueueFullError:
+            del self.jobs[job.id]
+            raise
+        logger.info(f"[Detail Jobs] Job {job.id} queued: {len(job.shop_names)} shops ({self.queue.size()} waiting)")
+        return job
+
+    def get(self, job_id: str) -> Optional[DetailJob]:
+        """Look up a job by ID"""
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[DetailJob]:
+        """
+        Cancel a queued or running job
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            Optional[DetailJob]: The job, or None if unknown
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.task is not None:
+            job.task.cancel()
+        else:
+            # Still queued: the worker skips it when dequeued
+            job.finish("cancelled")
+        return job
+
+    async def _worker(self) -> None:
+        """Take jobs off the queue and run them one at a time"""
+        while True:
+            message = await self.queue.get()
+            job = self.jobs.get(message["job_id"])
+            if job is None or job.finished:
+                continue
+
+            job.task = asyncio.create_task(self._run(job, message))
+            try:
+                await asyncio.shield(job.task)
+            except asyncio.CancelledError:
+                if not job.task.done():
+                    # The worker itself is being stopped
+                    job.task.cancel()
+                    raise
+
+    async def _run(self, job: DetailJob, message: dict) -> None:
+        """Run one job, recording each summary as it completes"""
+        job.status = "running"
+        job.started_at = time.time()
+        logger.info(f"[Detail Jobs] Job {job.id} started")
+        try:
+            # Resolve the service per job so reloaded settings apply to new jobs
+            stream = get_registry().search_service.detail_search_stream(
+                message["input_text"], message["shop_names"], message["deadline"]
+            )
+            async for index, summary in stream:
+                job.summaries[index] = summary
+            job.finish("completed")
+        except asyncio.CancelledError:
+            job.finish("cancelled")
+            logger.warning(f"[Detail Jobs] Job {job.id} cancelled")
+            return
+        except Exception as e:
+            job.finish("failed", f"{type(e).__name__}: {str(e)}")
+            logger.error(f"[Detail Jobs] Job {job.id} failed: {job.error}")
+            return
+        logger.info(f"[Detail Jobs] Job {job.id} completed in {job.finished_at - job.started_at:.1f}s")
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond DETAIL_JOB_MAX_JOBS"""
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in finished[:max(0, len(self.jobs) - self.settings.detail_job_max_jobs + 1)]:
+            del self.jobs[job.id]
+
+    def stats(self) -> dict:
+        """
+        Get queue and job counters
+
+        Returns:
+            dict: backend, waiting, running and tracked job counts
+        """
+        return {
+            "backend": self.queue.backend_name,
+            "workers": len(self._workers),
+            "waiting": self.queue.size(),
+            "running": sum(job.status == "running" for job in self.jobs.values()),
+            "jobs": len(self.jobs)
+        }
+
+    async def aclose(self) -> None:
+        """Stop the workers and cancel running jobs"""
+        tasks = [*self._workers, *(job.task for job in self.jobs.values() if job.task and not job.task.done())]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        await self.queue.close()
+
+
+_manager: Optional[DetailJobManager] = None
+
+
+def get_detail_job_manager() -> DetailJobManager:
+    """
+    Get the application-wide detail job manager, creating it on first use
+
+    Returns:
+        DetailJobManager: The manager
+    """
+    global _manager
+    if _manager is None:
+        _manager = DetailJobManager(get_settings())
+    return _manager
+
+
+async def shutdown_detail_jobs() -> None:
+    """Stop workers and cancel running jobs (called from the shutdown hook)"""
+    global _manager
+    if _manager is not None:
+        await _manager.aclose()
+        _manager = None
@@ -1,33 +1,127 @@
 """
 Google Gemini API service for Grounding Search and structured responses
 """
-from typing import Type, TypeVar
+import asyncio
+import json
+import time
+from contextlib import nullcontext
+from functools import partial
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional, Type, TypeVar
 from google import genai
 from google.genai import types
 from pydantic import BaseModel, ValidationError
 from app.config import get_settings
+from app.metrics import record_cache_lookup, record_gemini_usage, track_gemini_call
+from app.services.cache import ResponseCache, make_cache_key
+from app.services.concurrency_limiter import AdaptiveConcurrencyLimiter, get_concurrency_limiter
+from app.services.model_router import ModelRouter
+from app.services.recording import GeminiRecorder, GeminiReplayer
+from app.services.request_configs import RequestConfigRegistry
+from app.services.resilience import ResilientCaller, attempt_timed_out
+from app.services.singleflight import SingleFlight
 from app.logger import logger
 
+if TYPE_CHECKING:
+    from app.services.client_pool import GeminiClientPool
+    from app.services.shared_state import SharedState
+
+# Seconds between checks while another worker makes the same call
+SHARED_CLAIM_POLL_SECONDS = 0.1
+
 # Type variable for Pydantic models
 T = TypeVar('T', bound=BaseModel)
+R = TypeVar('R')
 
 
 class GeminiService:
-    """Service for Google Gemini API interactions"""
+    """
+    Service for Google Gemini API interactions
+
+    Every call is available in a blocking form (`grounding_search`,
+    `structured_response`) and a native asyncio form
+    (`grounding_search_async`, `structured_response_async`) built on the
+    client's `aio` API. API calls go through a ResilientCaller that retries
+    transient errors and fails fast while the circuit breaker is open, and
+    every attempt holds a slot of the process-wide adaptive concurrency
+    limiter for the model.
+
+    Each call names its task ("grounding", "extraction", "judgement") and
+    runs on the model the ModelRouter picks for it; every model gets its
+    own resilience policy and concurrency limiter.
 
-    def __init__(self):
-        """Initialize Gemini client"""
+    With GEMINI_RECORD_MODE=record every API call attempt is appended to
+    GEMINI_RECORD_PATH; with GEMINI_RECORD_MODE=replay the recorded
+    responses are served instead of calling the API.
+    """
+
+    def __init__(
+        self,
+        client: Optional[genai.Client] = None,
+        pool: Optional["GeminiClientPool"] = None,
+        cache: Optional[ResponseCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        resilience: Optional[ResilientCaller] = None,
+        shared_state: Optional["SharedState"] = None
+    ):
+        """
+        Initialize Gemini client
+
+        Args:
+            client: Pre-built client (e.g. a fake for tests)
+            pool: Shared client pool; each call uses the next pooled client.
+                When neither is given a genai.Client is created from settings
+            cache: Response cache consulted before every API call
+            single_flight: Coalesces identical in-flight async calls
+            resilience: Retry/circuit breaker policy for GEMINI_MODEL (built
+                from settings if omitted)
+            shared_state: Cross-worker state; with a cache every worker can
+                read, identical async calls in other worker processes wait
+                for this one's cached result
+        """
         self.settings = get_settings()
-        self.client = genai.Client(api_key=self.settings.google_api_key)
+        self._pool = pool
+        self._client = None if pool else (client or genai.Client(api_key=self.settings.google_api_key))
         self.model_name = self.settings.gemini_model
+        self.cache = cache
+        self.single_flight = single_flight
+        self.shared_state = shared_state
+        self._claims_across_workers = (
+            shared_state is not None and cache is not None and cache.shared_across_workers
+        )
+        self.router = ModelRouter(self.settings)
+        self.resilience = resilience or ResilientCaller(self.settings, self.model_name)
+        self._resilience: Dict[str, ResilientCaller] = {self.model_name: self.resilience}
+        self.configs = RequestConfigRegistry(self.resilience.attempt_timeout)
+        self._limiters: Dict[str, Optional[AdaptiveConcurrencyLimiter]] = {}
+        for model in {self.model_name, *self.router.models.values()}:
+            if model not in self._resilience:
+                self._resilience[model] = ResilientCaller(self.settings, model, f"gemini:{model}")
+            self._limiters[model] = get_concurrency_limiter(self.settings, model)
+        self.recorder: Optional[GeminiRecorder] = None
+        self.replayer: Optional[GeminiReplayer] = None
+        record_mode = self.settings.gemini_record_mode.lower()
+        if record_mode == "record":
+            self.recorder = GeminiRecorder(self.settings.gemini_record_path)
+        elif record_mode == "replay":
+            self.replayer = GeminiReplayer(self.settings.gemini_record_path, self.settings.gemini_replay_time_scale)
+        elif record_mode != "off":
+            raise ValueError(f"Unknown Gemini record mode: {self.settings.gemini_record_mode}")
         logger.info(f"GeminiService initialized with model: {self.model_name}")
 
-    def grounding_search(self, prompt: str) -> dict:
+    @property
+    def client(self) -> genai.Client:
+        """Client for the next API call"""
+        if self._pool is not None:
+            return self._pool.acquire()
+        return self._client
+
+    def grounding_search(self, prompt: str, task: str = "grounding") -> dict:
         """
         Perform Grounding Search using Google Search
 
         Args:
             prompt: Search prompt
+            task: Task name selecting the model
 
         Returns:
             dict: {
@@ -38,68 +132,77 @@ class GeminiService:
         Raises:
             Exception: If API call fails
         """
-        logger.info(f"[Grounding Search] Prompt length: {len(prompt)} chars")
-        logger.debug(f"[Grounding Search] Prompt: {prompt[:200]}...")
+        self._log_grounding_request(prompt)
+
+        model = self.router.model_for(task)
+        request_key = self._request_key("grounding", model, prompt)
+        cached = self._cache_get(request_key, "grounding")
+        if cached is not None:
+            return json.loads(cached)
 
         try:
-            # Configure Grounding Tool
-            grounding_tool = types.Tool(
-                google_search=types.GoogleSearch()
-            )
+            # Call API
+            logger.info(f"[Grounding Search] Calling Gemini API: {model}")
+            response = self._call(task, "grounding", model, prompt, self.configs.grounding, request_key)
+            result_data = self._parse_grounding_response(response)
+            self._cache_set(request_key, json.dumps(result_data, ensure_ascii=False))
+            return result_data
 
-            # Configure request
-            config = types.GenerateContentConfig(
-                tools=[grounding_tool]
-            )
+        except Exception as e:
+            logger.error(f"[Grounding Search] Error: {type(e).__name__}: {str(e)}")
+            raise
 
-            # Call API
-            logger.info(f"[Grounding Search] Calling Gemini API: {self.model_name}")
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=config,
-            )
+    async def grounding_search_async(self, prompt: str, task: str = "grounding") -> dict:
+        """
+        Perform Grounding Search without blocking the event loop
 
-            # Extract response text
-            result_text = response.text
-            logger.info(f"[Grounding Search] Response length: {len(result_text)} chars")
-            logger.debug(f"[Grounding Search] Response: {result_text[:200]}...")
-
-            # Extract source citations from grounding metadata
-            sources = []
-            if hasattr(response, 'candidates') and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'grounding_metadata'):
-                    metadata = candidate.grounding_metadata
-                    if hasattr(metadata, 'grounding_chunks') and metadata.grounding_chunks:
-                        for chunk in metadata.grounding_chunks:
-                            if hasattr(chunk, 'web') and chunk.web:
-                                source = {
-                                    "url": chunk.web.uri,
-                                    "title": getattr(chunk.web, 'title', None)
-                                }
-                                sources.append(source)
-
-            logger.info(f"[Grounding Search] Extracted {len(sources)} source citations")
-
-            result_data = {
-                "text": result_text,
-                "sources": sources
-            }
+        Args:
+            prompt: Search prompt
+            task: Task name selecting the model
+
+        Returns:
+            dict: Same structure as grounding_search()
+
+        Raises:
+            Exception: If API call fails
+        """
+        self._log_grounding_request(prompt)
+
+        model = self.router.model_for(task)
+        request_key = self._request_key("grounding", model, prompt)
+        cached = await self._cache_get_async(request_key, "grounding")
+        if cached is not None:
+            return json.loads(cached)
 
+        return await self._coalesce(
+            request_key, "grounding", lambda: self._grounding_call_async(prompt, task, model, request_key), json.loads
+        )
+
+    async def _grounding_call_async(self, prompt: str, task: str, model: str, request_key: str) -> dict:
+        """Call the API for grounding_search_async() and cache the result"""
+        try:
+            # Call API
+            logger.info(f"[Grounding Search] Calling Gemini API (async): {model}")
+            response = await self._call_async(task, "grounding", model, prompt, self.configs.grounding, request_key)
+            result_data = self._parse_grounding_response(response)
+            await self._cache_set_async(request_key, json.dumps(result_data, ensure_ascii=False))
             return result_data
 
         except Exception as e:
             logger.error(f"[Grounding Search] Error: {type(e).__name__}: {str(e)}")
             raise
 
-    def structured_response(self, prompt: str, schema: Type[T]) -> T:
+    def structured_response(self, prompt: str, schema: Type[T], task: str = "structured") -> T:
         """
         Get structured JSON response using Pydantic schema
 
+        A response from a lighter tiered model that fails validation is
+        retried once on GEMINI_MODEL.
+
         Args:
             prompt: Prompt for Gemini
             schema: Pydantic model class for response validation
+            task: Task name selecting the model ("extraction", "judgement")
 
         Returns:
             Validated Pydantic model instance
@@ -108,45 +211,404 @@ class GeminiService:
             ValidationError: If response doesn't match schema
             Exception: If API call fails
         """
-        schema_name = schema.__name__
-        logger.info(f"[Structured Response] Schema: {schema_name}")
-        logger.debug(f"[Structured Response] Prompt: {prompt[:200]}...")
+        self._log_structured_request(prompt, schema)
+
+        model = self.router.model_for(task)
+        try:
+            return self._structured(prompt, schema, task, model)
+        except ValidationError:
+            escalation = self._escalate(task, model)
+            if escalation is None:
+                raise
+            return self._structured(prompt, schema, task, escalation)
+
+    def _structured(self, prompt: str, schema: Type[T], task: str, model: str) -> T:
+        """Get a structured response from one model for structured_response()"""
+        request_key = self._request_key("structured", model, prompt, schema)
+        cached = self._cache_get(request_key, "structured")
+        if cached is not None:
+            return self._parse_structured_response(cached, schema)
 
-        response = None
         response_text = None
 
         try:
-            # Configure JSON response
-            config = types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema=schema.model_json_schema(),
-            )
-
             # Call API
-            logger.info(f"[Structured Response] Calling Gemini API: {self.model_name}")
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=config,
-            )
+            logger.info(f"[Structured Response] Calling Gemini API: {model}")
+            response = self._call(task, "structured", model, prompt, self.configs.structured(schema), request_key)
 
-            # Parse and validate with Pydantic
             response_text = response.text
-            logger.debug(f"[Structured Response] Raw JSON: {response_text[:200]}...")
+            result = self._parse_structured_response(response_text, schema)
+            self._cache_set(request_key, response_text)
+            return result
+
+        except Exception as e:
+            self._log_structured_error(e, response_text)
+            raise
+
+    async def structured_response_async(self, prompt: str, schema: Type[T], task: str = "structured") -> T:
+        """
+        Get structured JSON response without blocking the event loop
+
+        A response from a lighter tiered model that fails validation is
+        retried once on GEMINI_MODEL.
+
+        Args:
+            prompt: Prompt for Gemini
+            schema: Pydantic model class for response validation
+            task: Task name selecting the model ("extraction", "judgement")
+
+        Returns:
+            Validated Pydantic model instance
+
+        Raises:
+            ValidationError: If response doesn't match schema
+            Exception: If API call fails
+        """
+        self._log_structured_request(prompt, schema)
+
+        model = self.router.model_for(task)
+        try:
+            return await self._structured_async(prompt, schema, task, model)
+        except ValidationError:
+            escalation = self._escalate(task, model)
+            if escalation is None:
+                raise
+            return await self._structured_async(prompt, schema, task, escalation)
 
-            result = schema.model_validate_json(response_text)
-            logger.info(f"[Structured Response] Successfully parsed as {schema_name}")
+    async def _structured_async(self, prompt: str, schema: Type[T], task: str, model: str) -> T:
+        """Get a structured response from one model for structured_response_async()"""
+        request_key = self._request_key("structured", model, prompt, schema)
+        cached = await self._cache_get_async(request_key, "structured")
+        if cached is not None:
+            return self._parse_structured_response(cached, schema)
 
+        return await self._coalesce(
+            request_key,
+            "structured",
+            lambda: self._structured_call_async(prompt, schema, task, model, request_key),
+            lambda cached: self._parse_structured_response(cached, schema)
+        )
+
+    async def _structured_call_async(self, prompt: str, schema: Type[T], task: str, model: str, request_key: str) -> T:
+        """Call the API for _structured_async() and cache the result"""
+        response_text = None
+
+        try:
+            # Call API
+            logger.info(f"[Structured Response] Calling Gemini API (async): {model}")
+            response = await self._call_async(task, "structured", model, prompt, self.configs.structured(schema), request_key)
+
+            response_text = response.text
+            result = self._parse_structured_response(response_text, schema)
+            await self._cache_set_async(request_key, response_text)
             return result
 
-        except ValidationError as e:
-            logger.error(f"[Structured Response] Validation error: {e}")
-            if response_text:
-                logger.error(f"[Structured Response] Raw response: {response_text}")
+        except Exception as e:
+            self._log_structured_error(e, response_text)
             raise
 
-        except Exception as e:
-            logger.error(f"[Structured Response] Error: {type(e).__name__}: {str(e)}")
-            if response_text:
-                logger.error(f"[Structured Response] Raw response: {response_text}")
+    def close(self) -> None:
+        """Close the recording file (record mode)"""
+        if self.recorder is not None:
+            self.recorder.close()
+
+    @property
+    def resilience_by_model(self) -> Dict[str, ResilientCaller]:
+        """Resilience policy (and circuit breaker) of each model in use"""
+        return dict(self._resilience)
+
+    # Request/response helpers shared by the sync and async paths
+
+    def _escalate(self, task: str, model: str) -> Optional[str]:
+        """Get the model to retry a failed validation on, counting the escalation"""
+        escalation = self.router.escalation_for(model)
+        if escalation is not None:
+            self.router.record_escalation(task, model)
+            logger.warning(f"[Model Tiering] {task}: {model} response failed validation, retrying on {escalation}")
+        return escalation
+
+    def _call(
+        self,
+        task: str,
+        kind: str,
+        model: str,
+        prompt: str,
+        config: types.GenerateContentConfig,
+        request_key: str
+    ):
+        """Call the API under the model's resilience policy and account for the call"""
+        start = time.perf_counter()
+        try:
+            response = self._resilience[model].call(
+                kind, lambda: self._generate(kind, model, prompt, config, request_key)
+            )
+        except Exception:
+            self.router.record(task, model, time.perf_counter() - start)
+            raise
+        self.router.record(task, model, time.perf_counter() - start, response)
+        record_gemini_usage(model, kind, response)
+        return response
+
+    async def _call_async(
+        self,
+        task: str,
+        kind: str,
+        model: str,
+        prompt: str,
+        config: types.GenerateContentConfig,
+        request_key: str
+    ):
+        """Call the API asynchronously under the model's resilience policy and account for the call"""
+        start = time.perf_counter()
+        try:
+            response = await self._resilience[model].call_async(
+                kind, lambda: self._generate_async(kind, model, prompt, config, request_key)
+            )
+        except Exception:
+            self.router.record(task, model, time.perf_counter() - start)
             raise
+        self.router.record(task, model, time.perf_counter() - start, response)
+        record_gemini_usage(model, kind, response)
+        return response
+
+    def _generate(self, kind: str, model: str, prompt: str, config: types.GenerateContentConfig, request_key: str):
+        """Make one API call (a single attempt under the resilience policy)"""
+        limiter = self._limiters[model]
+        with limiter.slot() if limiter else nullcontext():
+            with track_gemini_call(model, kind, prompt):
+                if self.replayer is not None:
+                    return self.replayer.respond(request_key)
+                start = time.perf_counter()
+                try:
+                    response = self.client.models.generate_content(
+                        model=model,
+                        contents=prompt,
+                        config=config,
+                    )
+                except Exception as e:
+                    self._record(request_key, kind, model, prompt, config, start, error=e)
+                    raise
+                self._record(request_key, kind, model, prompt, config, start, response=response)
+                return response
+
+    async def _generate_async(
+        self,
+        kind: str,
+        model: str,
+        prompt: str,
+        config: types.GenerateContentConfig,
+        request_key: str
+    ):
+        """Make one async API call (a single attempt under the resilience policy)"""
+        limiter = self._limiters[model]
+        async with limiter.slot_async() if limiter else nullcontext():
+            with track_gemini_call(model, kind, prompt):
+                if self.replayer is not None:
+                    return await self.replayer.respond_async(request_key)
+                start = time.perf_counter()
+                try:
+                    response = await self.client.aio.models.generate_content(
+                        model=model,
+                        contents=prompt,
+                        config=config,
+                    )
+                except asyncio.CancelledError:
+                    # Per-attempt timeouts end an async call by cancelling it: record those as
+                    # timeouts, and other cancellations (hedge loser, abandoned shop, cancelled
+                    # prefetch) as cancelled so replay does not turn them into failures
+                    if attempt_timed_out():
+                        error = TimeoutError(f"Attempt exceeded {self._resilience[model].attempt_timeout}s")
+                        self._record(request_key, kind, model, prompt, config, start, error=error)
+                    else:
+                        self._record(request_key, kind, model, prompt, config, start, cancelled=True)
+                    raise
+                except Exception as e:
+                    self._record(request_key, kind, model, prompt, config, start, error=e)
+                    raise
+                self._record(request_key, kind, model, prompt, config, start, response=response)
+                return response
+
+    def _record(
+        self,
+        request_key: str,
+        kind: str,
+        model: str,
+        prompt: str,
+        config: types.GenerateContentConfig,
+        start: float,
+        response=None,
+        error: Optional[BaseException] = None,
+        cancelled: bool = False
+    ) -> None:
+        """Append a call attempt to the recording (record mode only)"""
+        if self.recorder is not None:
+            self.recorder.record(
+                request_key, model, kind, prompt, config,
+                time.perf_counter() - start, response=response, error=error, cancelled=cancelled
+            )
+
+    def _request_key(self, kind: str, model: str, prompt: str, schema: Optional[Type[BaseModel]] = None) -> str:
+        """Build the key identifying a call for caching and coalescing"""
+        return make_cache_key(kind, model, prompt, schema)
+
+    def _cache_get(self, request_key: str, kind: str) -> Optional[str]:
+        """Look up a cached response"""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(request_key)
+        record_cache_lookup(kind, cached is not None)
+        if cached is not None:
+            logger.info(f"[Response Cache] {kind} hit: {request_key[:12]}")
+        return cached
+
+    def _cache_set(self, request_key: str, value: str) -> None:
+        """Store a successful response"""
+        if self.cache is not None:
+            self.cache.set(request_key, value)
+
+    async def _cache_get_async(self, request_key: str, kind: str) -> Optional[str]:
+        """Look up a cached response without blocking the event loop"""
+        if self.cache is None:
+            return None
+        cached = await self.cache.get_async(request_key)
+        record_cache_lookup(kind, cached is not None)
+        if cached is not None:
+            logger.info(f"[Response Cache] {kind} hit: {request_key[:12]}")
+        return cached
+
+    async def _cache_set_async(self, request_key: str, value: str) -> None:
+        """Store a successful response without blocking the event loop"""
+        if self.cache is not None:
+            await self.cache.set_async(request_key, value)
+
+    async def _coalesce(
+        self,
+        request_key: str,
+        kind: str,
+        factory: Callable[[], Awaitable[R]],
+        from_cache: Callable[[str], R]
+    ) -> R:
+        """
+        Share one in-flight API call among concurrent identical requests
+
+        Within the process callers share a single-flight task. With shared
+        state and a response cache every worker can read, the task also
+        claims the request across worker processes; otherwise a waiting
+        worker could never see the result and would only add latency.
+
+        Args:
+            request_key: Cache key identifying the request
+            kind: Call kind ("grounding" or "structured")
+            factory: Makes the API call (and caches the result)
+            from_cache: Decodes a cached value written by another worker
+        """
+        call = factory
+        if self._claims_across_workers:
+            call = partial(self._claim_across_workers, request_key, kind, factory, from_cache)
+        if self.single_flight is None:
+            return await call()
+        return await self.single_flight.do(request_key, call)
+
+    async def _claim_across_workers(
+        self,
+        request_key: str,
+        kind: str,
+        factory: Callable[[], Awaitable[R]],
+        from_cache: Callable[[str], R]
+    ) -> R:
+        """Make the call in one worker while the others wait for its cached result"""
+        claim_ttl = self.settings.gemini_total_timeout_seconds
+        if await self.shared_state.claim_async(request_key, claim_ttl):
+            try:
+                return await factory()
+            finally:
+                await self.shared_state.release_async(request_key)
+
+        logger.info(f"[Shared State] {kind} call in flight in another worker: {request_key[:12]}")
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + claim_ttl
+        while await self.shared_state.claimed_async(request_key) and loop.time() < give_up_at:
+            await asyncio.sleep(SHARED_CLAIM_POLL_SECONDS)
+
+        cached = await self._cache_get_async(request_key, kind)
+        if cached is not None:
+            return from_cache(cached)
+        # The other worker failed (or its result expired): call ourselves
+        return await factory()
+
+    def _log_grounding_request(self, prompt: str) -> None:
+        """Log an outgoing grounding search prompt"""
+        logger.info(f"[Grounding Search] Prompt length: {len(prompt)} chars")
+        logger.debug("[Grounding Search] Prompt: %.200s...", prompt)
+
+    def _log_structured_request(self, prompt: str, schema: Type[BaseModel]) -> None:
+        """Log an outgoing structured response prompt"""
+        logger.info(f"[Structured Response] Schema: {schema.__name__}")
+        logger.debug("[Structured Response] Prompt: %.200s...", prompt)
+
+    def _parse_grounding_response(self, response) -> dict:
+        """
+        Extract text and source citations from a grounding response
+
+        Args:
+            response: GenerateContentResponse from the API
+
+        Returns:
+            dict: {"text": str, "sources": List[dict]}
+        """
+        # Extract response text
+        result_text = response.text
+        logger.info(f"[Grounding Search] Response length: {len(result_text)} chars")
+        logger.debug("[Grounding Search] Response: %.200s...", result_text)
+
+        # Extract source citations from grounding metadata
+        sources = []
+        if hasattr(response, 'candidates') and response.candidates:
+            candidate = response.candidates[0]
+            if hasattr(candidate, 'grounding_metadata'):
+                metadata = candidate.grounding_metadata
+                if hasattr(metadata, 'grounding_chunks') and metadata.grounding_chunks:
+                    for chunk in metadata.grounding_chunks:
+                        if hasattr(chunk, 'web') and chunk.web:
+                            source = {
+                                "url": chunk.web.uri,
+                                "title": getattr(chunk.web, 'title', None)
+                            }
+                            sources.append(source)
+
+        logger.info(f"[Grounding Search] Extracted {len(sources)} source citations")
+
+        result_data = {
+            "text": result_text,
+            "sources": sources
+        }
+
+        return result_data
+
+    def _parse_structured_response(self, response_text: str, schema: Type[T]) -> T:
+        """
+        Validate a JSON response against the schema
+
+        Args:
+            response_text: Raw JSON text from the API
+            schema: Pydantic model class for response validation
+
+        Returns:
+            Validated Pydantic model instance
+        """
+        # Parse and validate with Pydantic
+        logger.debug("[Structured Response] Raw JSON: %.200s...", response_text)
+
+        result = self.configs.validate_json(schema, response_text)
+        logger.info(f"[Structured Response] Successfully parsed as {schema.__name__}")
+
+        return result
+
+    def _log_structured_error(self, error: Exception, response_text: Optional[str]) -> None:
+        """Log a failed structured response call"""
+        if isinstance(error, ValidationError):
+            logger.error(f"[Structured Response] Validation error: {error}")
+        else:
+            logger.error(f"[Structured Response] Error: {type(error).__name__}: {str(error)}")
+        if response_text:
+            logger.error(f"[Structured Response] Raw response: {response_text}")
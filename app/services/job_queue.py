@@ -0,0 +1,90 @@
+"""
+Pluggable message queue backends for background jobs
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from app.config import Settings
+from app.logger import logger
+
+
+class QueueFullError(Exception):
+    """Raised when a job cannot be enqueued because the queue is full"""
+
+
+class JobQueue(ABC):
+    """
+    Base class for job queue backends carrying JSON-serializable messages
+
+    Messages hold everything a worker needs to run the job, so a backend
+    backed by an external broker can be dropped in without changing the
+    producers or the workers.
+    """
+
+    backend_name = "base"
+
+    @abstractmethod
+    async def put(self, message: dict) -> None:
+        """
+        Enqueue a message
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+
+    @abstractmethod
+    async def get(self) -> dict:
+        """Wait for and remove the next message"""
+
+    @abstractmethod
+    def size(self) -> int:
+        """Number of messages waiting"""
+
+    async def close(self) -> None:
+        """Release backend resources"""
+
+
+class MemoryJobQueue(JobQueue):
+    """In-process FIFO queue (local stand-in for a real broker)"""
+
+    backend_name = "memory"
+
+    def __init__(self, max_size: int = 0):
+        """
+        Initialize queue
+
+        Args:
+            max_size: Maximum waiting messages (0 for unbounded)
+        """
+        self._queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=max(0, max_size))
+
+    async def put(self, message: dict) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self._queue.maxsize} waiting)")
+
+    async def get(self) -> dict:
+        return await self._queue.get()
+
+    def size(self) -> int:
+        return self._queue.qsize()
+
+
+def create_job_queue(settings: Settings) -> JobQueue:
+    """
+    Create the job queue backend selected in settings
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        JobQueue: Queue instance
+    """
+    backend = settings.detail_job_queue_backend.lower()
+    if backend == "memory":
+        queue = MemoryJobQueue(settings.detail_job_queue_size)
+    else:
+        raise ValueError(f"Unknown job queue backend: {settings.detail_job_queue_backend}")
+
+    logger.info(f"[Job Queue] Backend: {backend} (max_size={settings.detail_job_queue_size})")
+    return queue
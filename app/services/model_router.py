@@ -0,0 +1,165 @@
+"""
+Per-task Gemini model routing with escalation and usage accounting
+"""
+import threading
+from typing import Dict, Optional, Tuple
+from app.config import Settings
+from app.metrics import GEMINI_ESCALATIONS, GEMINI_TASK_COST, GEMINI_TASK_DURATION
+from app.logger import logger
+
+# Tasks with their own model setting (GEMINI_<TASK>_MODEL)
+TASKS = ("grounding", "extraction", "judgement")
+
+
+class ModelRouter:
+    """
+    Choose the Gemini model for each task and account for its usage
+
+    Each task runs on its GEMINI_<TASK>_MODEL, falling back to GEMINI_MODEL,
+    so cheap structured tasks can use a lighter model while grounding keeps
+    the full one. A structured response from a lighter model that fails
+    validation is retried once on GEMINI_MODEL (GEMINI_ESCALATION_ENABLED).
+
+    Latency (including retries), tokens and estimated cost of every API
+    call are accumulated per task and model. Cost uses GEMINI_MODEL_PRICES
+    (USD per 1M tokens) and is 0 for models without a price.
+    """
+
+    def __init__(self, settings: Settings):
+        """
+        Initialize from settings
+
+        Args:
+            settings: Application settings
+        """
+        self.default_model = settings.gemini_model
+        self.models = {
+            task: getattr(settings, f"gemini_{task}_model") or self.default_model
+            for task in TASKS
+        }
+        self.escalation_enabled = settings.gemini_escalation_enabled
+        self.prices = settings.gemini_model_prices
+        self._usage: Dict[Tuple[str, str], dict] = {}
+        self._lock = threading.Lock()
+        tiered = {task: model for task, model in self.models.items() if model != self.default_model}
+        if tiered:
+            logger.info(f"[Model Tiering] Default: {self.default_model}, per task: {tiered}")
+
+    def model_for(self, task: str) -> str:
+        """
+        Get the model for a task
+
+        Args:
+            task: Task name ("grounding", "extraction", "judgement"; others
+                use GEMINI_MODEL)
+
+        Returns:
+            str: Model name
+        """
+        return self.models.get(task, self.default_model)
+
+    def escalation_for(self, model: str) -> Optional[str]:
+        """
+        Get the model to retry on after a validation failure
+
+        Args:
+            model: Model whose response failed validation
+
+        Returns:
+            Optional[str]: GEMINI_MODEL, or None when escalation is disabled
+                or the model already is GEMINI_MODEL
+        """
+        if not self.escalation_enabled or model == self.default_model:
+            return None
+        return self.default_model
+
+    def cost(self, model: str, prompt_tokens: int, response_tokens: int) -> float:
+        """
+        Estimate the cost of a call
+
+        Args:
+            model: Model name
+            prompt_tokens: Input tokens
+            response_tokens: Output tokens
+
+        Returns:
+            float: Cost in USD (0 when the model has no price)
+        """
+        price = self.prices.get(model)
+        if not price:
+            return 0.0
+        return (prompt_tokens * price.get("input", 0.0) + response_tokens * price.get("output", 0.0)) / 1_000_000
+
+    def record(self, task: str, model: str, latency: float, response=None) -> None:
+        """
+        Account for one API call (after retries)
+
+        Args:
+            task: Task name
+            model: Model name
+            latency: Seconds spent including retries
+            response: GenerateContentResponse, or None if the call failed
+        """
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = (getattr(usage, "prompt_token_count", None) or 0) if usage else 0
+        response_tokens = (getattr(usage, "candidates_token_count", None) or 0) if usage else 0
+        cost = self.cost(model, prompt_tokens, response_tokens)
+
+        GEMINI_TASK_DURATION.observe(latency, task=task, model=model)
+        if cost:
+            GEMINI_TASK_COST.inc(cost, task=task, model=model)
+        with self._lock:
+            entry = self._entry(task, model)
+            entry["calls"] += 1
+            entry["errors"] += response is None
+            entry["latency_total"] += latency
+            entry["prompt_tokens"] += prompt_tokens
+            entry["response_tokens"] += response_tokens
+            entry["cost_usd"] += cost
+
+    def record_escalation(self, task: str, model: str) -> None:
+        """
+        Count a validation failure escalated to another model
+
+        Args:
+            task: Task name
+            model: Model whose response failed validation
+        """
+        GEMINI_ESCALATIONS.inc(task=task, model=model)
+        with self._lock:
+            self._entry(task, model)["escalations"] += 1
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Get per-task models and usage
+
+        Returns:
+            Dict[str, dict]: Per task, the configured model and, per model
+                used, calls, errors, escalations, mean latency, tokens and
+                estimated cost
+        """
+        with self._lock:
+            report = {task: {"model": model, "usage": {}} for task, model in self.models.items()}
+            for (task, model), entry in self._usage.items():
+                report.setdefault(task, {"model": self.model_for(task), "usage": {}})["usage"][model] = {
+                    "calls": entry["calls"],
+                    "errors": entry["errors"],
+                    "escalations": entry["escalations"],
+                    "latency_mean": round(entry["latency_total"] / entry["calls"], 3) if entry["calls"] else None,
+                    "prompt_tokens": entry["prompt_tokens"],
+                    "response_tokens": entry["response_tokens"],
+                    "cost_usd": round(entry["cost_usd"], 6)
+                }
+            return report
+
+    def _entry(self, task: str, model: str) -> dict:
+        """Usage counters for a task and model (called with the lock held)"""
+        return self._usage.setdefault((task, model), {
+            "calls": 0,
+            "errors": 0,
+            "escalations": 0,
+            "latency_total": 0.0,
+            "prompt_tokens": 0,
+            "response_tokens": 0,
+            "cost_usd": 0.0
+        })
@@ -0,0 +1,200 @@
+"""
+Short-lived store of speculative detail searches started after the initial search
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Set, Tuple
+from app.config import Settings
+from app.metrics import DETAIL_PREFETCH
+from app.services.concurrency_limiter import CallPriority
+from app.services.shop_index import normalize_shop_name
+from app.logger import logger
+
+
+class DetailPrefetchStore:
+    """
+    Per-query prefetch tasks keyed by (input text, shop name)
+
+    The initial search registers one task per top shop; the detail search
+    takes the task for each selected shop and awaits it instead of starting
+    its own calls. A task is handed out once. Entries older than
+    `ttl_seconds` are dropped (and cancelled if still running), as are the
+    oldest entries beyond `max_entries`. At most `max_in_flight` prefetches
+    run at once across all queries (see slot()); a task still waiting for a
+    slot when it is taken is cancelled instead of handed out, so the caller
+    searches right away rather than queueing behind other prefetches. A
+    running task handed out has its call priority promoted, so its remaining
+    calls no longer wait behind requests.
+
+    Tasks live on the event loop that created them, so the store is only
+    used from the async path.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int, max_in_flight: int):
+        """
+        Initialize store
+
+        Args:
+            ttl_seconds: How long an unclaimed prefetch is kept
+            max_entries: Maximum number of prefetches kept
+            max_in_flight: Maximum number of prefetches running at once
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.max_in_flight = max(1, max_in_flight)
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._running: Set[asyncio.Task] = set()
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        # (input text, shop key) -> (created at, task, priority of its Gemini calls)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, asyncio.Task, Optional[CallPriority]]]" = OrderedDict()
+
+    @staticmethod
+    def _key(input_text: str, shop_name: str) -> Tuple[str, str]:
+        return input_text, normalize_shop_name(shop_name)
+
+    def contains(self, input_text: str, shop_name: str) -> bool:
+        """Whether a live prefetch exists for the shop and query"""
+        self._purge()
+        return self._key(input_text, shop_name) in self._entries
+
+    def put(
+        self,
+        input_text: str,
+        shop_name: str,
+        task: "asyncio.Task",
+        priority: Optional[CallPriority] = None
+    ) -> None:
+        """
+        Register a prefetch task
+
+        Args:
+            input_text: User's search query
+            shop_name: Shop being prefetched
+            task: Task producing {"detail": dict, "judgement": Optional[JudgementSchema]}
+            priority: Priority the task's Gemini calls run under, promoted
+                when the task is taken
+        """
+        self._purge()
+        key = self._key(input_text, shop_name)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            previous[1].cancel()
+        while len(self._entries) >= self.max_entries:
+            _, (_, evicted, _) = self._entries.popitem(last=False)
+            evicted.cancel()
+            DETAIL_PREFETCH.inc(result="evicted")
+        task.add_done_callback(_retrieve_exception)
+        self._entries[key] = (time.monotonic(), task, priority)
+        self.started += 1
+        DETAIL_PREFETCH.inc(result="started")
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the `max_in_flight` prefetch slots while a prefetch runs"""
+        task = asyncio.current_task()
+        async with self._slots:
+            self._running.add(task)
+            try:
+                yield
+            finally:
+                self._running.discard(task)
+
+    def take(self, input_text: str, shop_name: str) -> Optional["asyncio.Task"]:
+        """
+        Remove and return the prefetch task for a shop
+
+        Args:
+            input_text: User's search query
+            shop_name: Selected shop
+
+        Returns:
+            Optional[asyncio.Task]: The task (possibly still running), or
+                None if there is none or it had not started yet
+        """
+        self._purge()
+        entry = self._entries.pop(self._key(input_text, shop_name), None)
+        task, priority = (entry[1], entry[2]) if entry is not None else (None, None)
+        if task is not None and not task.done() and task not in self._running:
+            task.cancel()
+            task = None
+        if task is None:
+            self.misses += 1
+            DETAIL_PREFETCH.inc(result="miss")
+            return None
+        if priority is not None:
+            # The caller now waits on this task like on its own calls
+            priority.promote()
+        self.hits += 1
+        DETAIL_PREFETCH.inc(result="hit" if task.done() else "joined")
+        return task
+
+    def stats(self) -> dict:
+        """
+        Get prefetch counters
+
+        Returns:
+            dict: size, in_flight, started, hits, misses and expired counts
+        """
+        self._purge()
+        return {
+            "size": len(self._entries),
+            "in_flight": len(self._running),
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired
+        }
+
+    def close(self) -> None:
+        """Cancel all unclaimed prefetches"""
+        for _, task, _ in self._entries.values():
+            task.cancel()
+        self._entries.clear()
+
+    def _purge(self) -> None:
+        """Drop entries older than the TTL (oldest first, so stop at the first live one)"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._entries:
+            key, (created_at, task, _) = next(iter(self._entries.items()))
+            if created_at > cutoff:
+                break
+            del self._entries[key]
+            task.cancel()
+            self.expired += 1
+            DETAIL_PREFETCH.inc(result="expired")
+
+
+def _retrieve_exception(task: "asyncio.Task") -> None:
+    """Mark a failed prefetch's exception as retrieved (it may never be taken)"""
+    if not task.cancelled():
+        task.exception()
+
+
+def create_detail_prefetch(settings: Settings) -> Optional[DetailPrefetchStore]:
+    """
+    Create the prefetch store if enabled in settings
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Optional[DetailPrefetchStore]: Store instance, or None when disabled
+    """
+    if not settings.detail_prefetch_enabled:
+        return None
+
+    logger.info(
+        f"[Prefetch] Enabled: top {settings.detail_prefetch_max_shops} shops, "
+        f"max {settings.detail_prefetch_max_in_flight} in flight, "
+        f"judgement={settings.detail_prefetch_judgement}, ttl={settings.detail_prefetch_ttl_seconds}s"
+    )
+    return DetailPrefetchStore(
+        settings.detail_prefetch_ttl_seconds,
+        settings.detail_prefetch_max_entries,
+        settings.detail_prefetch_max_in_flight
+    )
@@ -0,0 +1,222 @@
+"""
+Prompt-size reduction for text pasted into Gemini prompts
+"""
+import re
+import unicodedata
+from typing import List, NamedTuple
+
+# Markdown links: keep the label, drop the target
+_MARKDOWN_LINK = re.compile(r'\[([^\]]+)\]\(\s*https?://[^)]*\)')
+# "（参照: https://...）" style citations, including the brackets
+_BRACKETED_CITATION = re.compile(
+    r'[（(]\s*(?:参照|出典|引用|ソース|source)?\s*[:：]?\s*\[?https?://[^\s）)]*\]?\s*[）)]',
+    re.IGNORECASE
+)
+# "参照: https://..." style citations
+_INLINE_CITATION = re.compile(r'(?:参照|出典|引用|ソース|source)\s*[:：]\s*\[?https?://\S+?\]?(?=[\s、。）)]|$)', re.IGNORECASE)
+_URL = re.compile(r'<?https?://[^\s<>）)\]」]+>?')
+# Numeric citation markers such as [1] or [2, 3]
+_CITATION_MARKER = re.compile(r'\[\d+(?:\s*[,、]\s*\d+)*\][ \t]?')
+_EMPTY_BRACKETS = re.compile(r'[（(]\s*[）)]')
+# Lines left with only a citation label after URLs are removed
+_ORPHAN_LABEL = re.compile(r'^\s*(?:[-*・]\s*)?(?:参照|出典|引用|ソース|source)\s*[:：]?\s*$', re.IGNORECASE)
+_INLINE_SPACE = re.compile(r'[ \t　]+')
+_LIST_MARKER = re.compile(r'^(?:[-*・>#]+|\d{1,2}[.)、])\s*')
+
+# First code point of the CJK blocks (counted as one token per character)
+_WIDE_CHAR_START = 0x2E80
+
+# Appended where text was cut to fit the token budget
+TRUNCATION_MARKER = "…(以下省略)"
+
+# Lines shorter than this (after normalization) are never deduplicated,
+# so table rules, headings and blank separators survive
+_MIN_DEDUP_CHARS = 8
+
+
+class CompactionResult(NamedTuple):
+    """Compacted text and its estimated size before and after"""
+    text: str
+    original_tokens: int
+    tokens: int
+    truncated: bool
+
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated tokens removed"""
+        return self.original_tokens - self.tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the Gemini token count of a text without calling the API
+
+    CJK characters count about one token each and other text about one
+    token per four characters, which is close enough for budgeting.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    wide = sum(1 for char in text if ord(char) >= _WIDE_CHAR_START)
+    return wide + (len(text) - wide + 3) // 4
+
+
+def strip_citations(text: str) -> str:
+    """
+    Remove URLs and citation boilerplate
+
+    Args:
+        text: Text from a grounding response
+
+    Returns:
+        str: Text without URLs, citation labels or numeric citation markers
+    """
+    text = _MARKDOWN_LINK.sub(r'\1', text)
+    text = _BRACKETED_CITATION.sub('', text)
+    text = _INLINE_CITATION.sub('', text)
+    text = _URL.sub('', text)
+    text = _CITATION_MARKER.sub('', text)
+    return _EMPTY_BRACKETS.sub('', text)
+
+
+def collapse_whitespace(lines: List[str]) -> List[str]:
+    """
+    Collapse runs of spaces and blank lines
+
+    Args:
+        lines: Text lines
+
+    Returns:
+        List[str]: Lines with single inner spaces, no trailing spaces and at
+            most one blank line in a row
+    """
+    collapsed: List[str] = []
+    for line in lines:
+        indent = len(line) - len(line.lstrip(" "))
+        line = " " * min(indent, 2) + _INLINE_SPACE.sub(" ", line.strip())
+        if not line.strip():
+            if collapsed and collapsed[-1]:
+                collapsed.append("")
+            continue
+        collapsed.append(line)
+    while collapsed and not collapsed[-1]:
+        collapsed.pop()
+    return collapsed
+
+
+def _dedup_key(line: str) -> str:
+    """Comparison key ignoring width variants, list markers and spacing"""
+    key = _LIST_MARKER.sub("", unicodedata.normalize("NFKC", line).strip())
+    return "".join(key.split())
+
+
+def dedupe_passages(lines: List[str]) -> List[str]:
+    """
+    Drop paragraphs and lines repeating an earlier passage
+
+    Paragraphs (blank-line separated) repeated in full are dropped, then
+    repeated lines within the rest. Lines are compared after NFKC
+    normalization with list markers and spacing removed, so the same
+    sentence repeated as a bullet and as prose counts once.
+
+    Args:
+        lines: Text lines
+
+    Returns:
+        List[str]: Lines in original order with repeats removed
+    """
+    paragraphs: List[List[str]] = [[]]
+    for line in lines:
+        if line.strip():
+            paragraphs[-1].append(line)
+        elif paragraphs[-1]:
+            paragraphs.append([])
+
+    seen_paragraphs = set()
+    seen_lines = set()
+    kept: List[str] = []
+    for paragraph in paragraphs:
+        keys = [_dedup_key(line) for line in paragraph]
+        paragraph_key = "\n".join(keys)
+        if not paragraph or paragraph_key in seen_paragraphs:
+            continue
+        seen_paragraphs.add(paragraph_key)
+
+        for line, key in zip(paragraph, keys):
+            if len(key) >= _MIN_DEDUP_CHARS:
+                if key in seen_lines:
+                    continue
+                seen_lines.add(key)
+            kept.append(line)
+        kept.append("")
+    return kept
+
+
+def truncate_lines(lines: List[str], max_tokens: int) -> List[str]:
+    """
+    Keep leading lines up to a token budget
+
+    The line that crosses the budget is cut mid-line and marked with
+    TRUNCATION_MARKER.
+
+    Args:
+        lines: Text lines
+        max_tokens: Token budget
+
+    Returns:
+        List[str]: Lines fitting the budget
+    """
+    kept: List[str] = []
+    budget = max_tokens - estimate_tokens(TRUNCATION_MARKER)
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost <= budget:
+            kept.append(line)
+            used += cost
+            continue
+        remaining = budget - used
+        end = 0
+        for end, char in enumerate(line):
+            remaining -= 1 if ord(char) >= _WIDE_CHAR_START else 0.25
+            if remaining < 0:
+                break
+        else:
+            end = len(line)
+        head = line[:end]
+        if head.strip():
+            kept.append(head)
+        kept.append(TRUNCATION_MARKER)
+        break
+    return kept
+
+
+def compact_text(text: str, max_tokens: int = 0) -> CompactionResult:
+    """
+    Shrink text before pasting it into a prompt
+
+    Strips URLs and citation boilerplate, collapses whitespace, drops
+    repeated passages and, when `max_tokens` is positive, truncates to the
+    estimated token budget.
+
+    Args:
+        text: Text to compact
+        max_tokens: Token budget (0 or less for no truncation)
+
+    Returns:
+        CompactionResult: Compacted text with token estimates
+    """
+    original_tokens = estimate_tokens(text)
+    lines = [line for line in strip_citations(text).splitlines() if not _ORPHAN_LABEL.match(line)]
+    lines = collapse_whitespace(dedupe_passages(lines))
+
+    truncated = False
+    if max_tokens > 0 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines = truncate_lines(lines, max_tokens)
+        truncated = True
+
+    compacted = "\n".join(lines)
+    return CompactionResult(compacted, original_tokens, estimate_tokens(compacted), truncated)
@@ -0,0 +1,169 @@
+"""
+Token bucket rate limiter for Gemini API calls
+"""
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+from app.config import Settings
+from app.services.concurrency_limiter import current_call_priority
+
+if TYPE_CHECKING:
+    from app.services.shared_state import SharedState
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Callers reserve a token and wait until it becomes available, so
+    concurrent workers are spaced out instead of sleeping a fixed interval.
+    Background callers never reserve ahead: they take a token only when
+    one is free and nobody is queued, and otherwise retry later.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize token bucket
+
+        Args:
+            rate: Tokens added per second (0 or less disables limiting)
+            capacity: Maximum number of tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether rate limiting is active"""
+        return self.rate > 0
+
+    def _reserve(self, queue: bool = True) -> float:
+        """
+        Reserve one token
+
+        Args:
+            queue: Reserve even when no token is free (False: only take a
+                free token)
+
+        Returns:
+            float: Seconds the caller must wait before using the token; with
+                queue=False, seconds until a token may be free (nothing is
+                reserved unless this is 0)
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+            # Tokens may go negative: each waiter is queued behind the previous one
+            if self._tokens < 1 and not queue:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if not self.enabled:
+            return 0.0
+
+        wait_time = self._reserve()
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+    async def acquire_async(self, background: bool = False) -> float:
+        """
+        Wait for a token without blocking the event loop
+
+        Args:
+            background: Speculative call; wait until a token is free
+                instead of queueing ahead of later requests (until the
+                background_calls() priority is promoted)
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if not self.enabled:
+            return 0.0
+
+        waited = 0.0
+        if background:
+            priority = current_call_priority()
+            while priority is None or priority.background:
+                retry_after = await self._reserve_async(queue=False)
+                if retry_after <= 0:
+                    return waited
+                await asyncio.sleep(retry_after)
+                waited += retry_after
+            # Promoted while waiting (a request is waiting on this call): queue like one
+
+        wait_time = await self._reserve_async()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        return waited + wait_time
+
+    async def _reserve_async(self, queue: bool = True) -> float:
+        """Reserve one token from the event loop (in-process: no I/O, so inline)"""
+        return self._reserve(queue)
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket whose budget is shared by every worker process
+
+    Reservations are made atomically in the shared state backend, so N
+    workers together stay within `rate` instead of N x `rate`.
+    """
+
+    def __init__(self, rate: float, capacity: int, state: "SharedState", name: str = "gemini"):
+        """
+        Initialize shared token bucket
+
+        Args:
+            rate: Tokens added per second (0 or less disables limiting)
+            capacity: Maximum number of tokens (burst size)
+            state: Shared state backend holding the bucket
+            name: Bucket name
+        """
+        super().__init__(rate, capacity)
+        self.state = state
+        self.name = name
+
+    def _reserve(self, queue: bool = True) -> float:
+        return self._wait_time(self.state.reserve_token(self.name, self.rate, self.capacity, queue))
+
+    async def _reserve_async(self, queue: bool = True) -> float:
+        return self._wait_time(await self.state.reserve_token_async(self.name, self.rate, self.capacity, queue))
+
+    def _wait_time(self, tokens: float) -> float:
+        """Seconds to wait given the tokens left after a reservation"""
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+
+def create_rate_limiter(settings: Settings, state: Optional["SharedState"] = None) -> TokenBucket:
+    """
+    Create the Gemini rate limiter, shared across workers when a backend is given
+
+    Args:
+        settings: Application settings
+        state: Shared state backend (None for a per-process bucket)
+
+    Returns:
+        TokenBucket: Rate limiter
+    """
+    if state is None:
+        return TokenBucket(settings.gemini_requests_per_second, settings.gemini_burst)
+    return SharedTokenBucket(settings.gemini_requests_per_second, settings.gemini_burst, state)
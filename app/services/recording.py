@@ -0,0 +1,360 @@
+"""
+Record and replay of Gemini API traffic
+"""
+import asyncio
+import hashlib
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from google.genai import errors as genai_errors
+from google.genai import types
+from app.services.cache import ResponseCache
+from app.services.resilience import is_retryable
+from app.logger import logger
+
+# Recording format version written to every call line
+RECORDING_VERSION = 1
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode when a request was never recorded"""
+
+
+class RecordedError(RuntimeError):
+    """Replayed non-retryable failure other than an API error (e.g. a response validation error)"""
+
+
+def iter_recording(path: str) -> Iterator[dict]:
+    """
+    Read call records from a recording file
+
+    Schema definition lines are skipped; unreadable lines (e.g. a partial
+    last line after a crash) are logged and skipped.
+
+    Args:
+        path: Recording file path
+
+    Yields:
+        dict: One record per API call attempt, in recording order
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"[Recording] Skipping unreadable line {line_number} in {path}")
+                continue
+            if "key" in record:
+                yield record
+
+
+class GeminiRecorder:
+    """
+    Append every Gemini API call attempt to a JSON Lines file
+
+    Each line holds the request (cache key, model, kind, prompt, config
+    without the per-attempt HTTP options, schema fingerprint), the outcome
+    (response text, grounding chunks and token usage, or the error) and
+    the call latency. A schema's full JSON definition is written once per
+    recorder, on a separate line, the first time it is used.
+
+    record() only queues the lines; a writer thread appends them to the
+    file, so callers on the event loop never wait for disk I/O. close()
+    writes whatever is still queued.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize recorder
+
+        Args:
+            path: Recording file path (appended to; parent directories are created)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._closed = False
+        self._schemas_written = set()
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name="gemini-recorder", daemon=True)
+        self._writer.start()
+        self.records = 0
+        logger.info(f"[Recording] Recording Gemini calls to {self.path}")
+
+    def record(
+        self,
+        request_key: str,
+        model: str,
+        kind: str,
+        prompt: str,
+        config: types.GenerateContentConfig,
+        latency: float,
+        response: Optional[types.GenerateContentResponse] = None,
+        error: Optional[BaseException] = None,
+        cancelled: bool = False
+    ) -> None:
+        """
+        Append one call attempt
+
+        Args:
+            request_key: Cache key identifying the request
+            model: Gemini model name
+            kind: Call kind ("grounding" or "structured")
+            prompt: Prompt text
+            config: Request config
+            latency: Call duration in seconds
+            response: Response, when the call succeeded
+            error: Exception, when the call failed
+            cancelled: The call was cancelled by its caller (hedge loser,
+                abandoned shop, cancelled prefetch); kept for analysis but
+                never replayed
+        """
+        lines = []
+        schema_id = None
+        if config.response_schema is not None:
+            schema_id = _schema_id(config.response_schema)
+            with self._lock:
+                new_schema = schema_id not in self._schemas_written
+                self._schemas_written.add(schema_id)
+            if new_schema:
+                lines.append({"schema_id": schema_id, "schema": config.response_schema})
+
+        record = {
+            "v": RECORDING_VERSION,
+            "ts": round(time.time(), 3),
+            "key": request_key,
+            "model": model,
+            "kind": kind,
+            "prompt": prompt,
+            "config": config.model_dump(mode="json", exclude_none=True, exclude={"http_options", "response_schema"}),
+            "schema_id": schema_id,
+            "latency": round(latency, 4),
+        }
+        if response is not None:
+            record.update(_response_fields(response))
+        elif cancelled:
+            record["cancelled"] = True
+        else:
+            record["error"] = _error_fields(error)
+        lines.append(record)
+
+        data = "".join(json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n" for line in lines)
+        with self._lock:
+            if self._closed:
+                return
+            self._queue.put(data)
+            self.records += 1
+
+    def close(self) -> None:
+        """Write the queued records and close the recording file"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._writer.join()
+        self._file.close()
+
+    def _write_loop(self) -> None:
+        """Append queued records until close() (writer thread)"""
+        while True:
+            batch = [self._queue.get()]
+            # Write everything queued meanwhile with a single flush
+            while not self._queue.empty():
+                batch.append(self._queue.get())
+            done = batch[-1] is None
+            try:
+                self._file.write("".join(data for data in batch if data is not None))
+                self._file.flush()
+            except OSError as e:
+                logger.error(f"[Recording] Failed to write {self.path}: {type(e).__name__}: {str(e)}")
+            if done:
+                return
+
+
+class GeminiReplayer:
+    """
+    Serve recorded Gemini responses instead of calling the API
+
+    Requests are matched by cache key. When a request was recorded several
+    times (e.g. failed attempts followed by a retry) the attempts are
+    replayed in order, including the failures; after that the last
+    successful response is repeated. Each response is delayed by its
+    recorded latency multiplied by `time_scale` (0 disables the delay).
+    Calls cancelled by their caller did not fail, so they are not replayed.
+    """
+
+    def __init__(self, path: str, time_scale: float = 1.0):
+        """
+        Initialize replayer
+
+        Args:
+            path: Recording file path
+            time_scale: Multiplier applied to recorded latencies
+        """
+        self.path = path
+        self.time_scale = max(0.0, time_scale)
+        self._records: Dict[str, List[dict]] = {}
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.served = 0
+        self.misses = 0
+        for record in iter_recording(path):
+            if not _is_cancelled(record):
+                self._records.setdefault(record["key"], []).append(record)
+        logger.info(
+            f"[Recording] Replaying {sum(map(len, self._records.values()))} recorded calls "
+            f"({len(self._records)} requests) from {path} at {self.time_scale}x latency"
+        )
+
+    def respond(self, request_key: str) -> types.GenerateContentResponse:
+        """
+        Replay a call, blocking for its recorded latency
+
+        Args:
+            request_key: Cache key identifying the request
+
+        Returns:
+            types.GenerateContentResponse: The recorded response
+
+        Raises:
+            ReplayMissError: If the request was not recorded
+            Exception: The recorded error, for recorded failures
+        """
+        record = self._next(request_key)
+        if record["latency"] and self.time_scale:
+            time.sleep(record["latency"] * self.time_scale)
+        return _replay(record)
+
+    async def respond_async(self, request_key: str) -> types.GenerateContentResponse:
+        """Replay a call without blocking the event loop (see respond())"""
+        record = self._next(request_key)
+        if record["latency"] and self.time_scale:
+            await asyncio.sleep(record["latency"] * self.time_scale)
+        return _replay(record)
+
+    def _next(self, request_key: str) -> dict:
+        """Pick the record to serve for a request"""
+        with self._lock:
+            records = self._records.get(request_key)
+            if not records:
+                self.misses += 1
+                raise ReplayMissError(f"No recorded response for request {request_key[:12]}")
+            position = self._positions.get(request_key, 0)
+            if position < len(records):
+                self._positions[request_key] = position + 1
+                record = records[position]
+            else:
+                successes = [record for record in records if "error" not in record]
+                record = successes[-1] if successes else records[-1]
+            self.served += 1
+            return record
+
+
+def warm_cache(cache: ResponseCache, path: str) -> int:
+    """
+    Load successful recorded responses into the response cache
+
+    Cached values have the same form GeminiService stores: grounding
+    results as {"text", "sources"} JSON and structured results as the raw
+    JSON text.
+
+    Args:
+        cache: Response cache to fill
+        path: Recording file path
+
+    Returns:
+        int: Number of entries written
+    """
+    count = 0
+    for record in iter_recording(path):
+        if "error" in record or _is_cancelled(record):
+            continue
+        if record["kind"] == "grounding":
+            sources = [{"url": url, "title": title} for url, title in record.get("chunks", [])]
+            value = json.dumps({"text": record["text"], "sources": sources}, ensure_ascii=False)
+        else:
+            value = record["text"]
+        cache.set(record["key"], value)
+        count += 1
+    logger.info(f"[Recording] Warmed response cache with {count} entries from {path}")
+    return count
+
+
+def _schema_id(schema: dict) -> str:
+    """Fingerprint of a JSON schema definition"""
+    schema_json = json.dumps(schema, sort_keys=True, ensure_ascii=False)
+    return f"{schema.get('title', 'schema')}:{hashlib.sha256(schema_json.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _response_fields(response: types.GenerateContentResponse) -> dict:
+    """Compact record fields for a successful response"""
+    chunks = []
+    if response.candidates and response.candidates[0].grounding_metadata:
+        for chunk in response.candidates[0].grounding_metadata.grounding_chunks or []:
+            if chunk.web:
+                chunks.append([chunk.web.uri, chunk.web.title])
+    usage = response.usage_metadata
+    fields = {"text": response.text or ""}
+    if chunks:
+        fields["chunks"] = chunks
+    if usage is not None:
+        fields["usage"] = [usage.prompt_token_count, usage.candidates_token_count]
+    return fields
+
+
+def _error_fields(error: Optional[BaseException]) -> dict:
+    """Compact record fields for a failed call"""
+    fields = {"type": type(error).__name__, "message": str(error), "retryable": is_retryable(error)}
+    if isinstance(error, genai_errors.APIError):
+        fields["code"] = error.code
+        fields["status"] = error.status
+    return fields
+
+
+def _is_cancelled(record: dict) -> bool:
+    """Whether a record is a call cancelled by its caller"""
+    return record.get("cancelled", False)
+
+
+def _replay(record: dict) -> types.GenerateContentResponse:
+    """Rebuild a response (or raise the error) from a record"""
+    error = record.get("error")
+    if error is not None:
+        if error.get("code"):
+            payload = {"error": {"code": error["code"], "message": error["message"], "status": error.get("status")}}
+            error_class = genai_errors.ServerError if error["code"] >= 500 else genai_errors.ClientError
+            raise error_class(error["code"], payload)
+        if "Timeout" in error["type"]:
+            raise TimeoutError(error["message"])
+        if error.get("retryable"):
+            raise ConnectionError(error["message"])
+        # Not retried in the recorded run, so it must not be retried on replay either
+        raise RecordedError(f"{error['type']}: {error['message']}")
+
+    chunks = record.get("chunks")
+    metadata = types.GroundingMetadata(
+        grounding_chunks=[
+            types.GroundingChunk(web=types.GroundingChunkWeb(uri=uri, title=title))
+            for uri, title in chunks
+        ]
+    ) if chunks else None
+    usage = record.get("usage")
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=record["text"])]),
+                grounding_metadata=metadata
+            )
+        ],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=usage[0],
+            candidates_token_count=usage[1]
+        ) if usage else None
+    )
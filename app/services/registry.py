@@ -0,0 +1,148 @@
+"""
+Application-scoped service registry with atomic hot reload
+"""
+import asyncio
+from typing import Optional, Set
+from google import genai
+from app.config import Settings, get_settings, clear_settings_cache
+from app.services.cache import create_response_cache
+from app.services.client_pool import GeminiClientPool
+from app.services.gemini_service import GeminiService
+from app.services.prefetch import create_detail_prefetch
+from app.services.rate_limiter import create_rate_limiter
+from app.services.recording import warm_cache
+from app.services.search_service import SearchService
+from app.services.shared_state import create_shared_state
+from app.services.shop_index import create_shop_index
+from app.services.singleflight import SingleFlight
+from app.logger import logger
+
+
+class ServiceRegistry:
+    """Shared services built once from a single settings snapshot"""
+
+    def __init__(self, settings: Settings, client: Optional[genai.Client] = None):
+        """
+        Build the client pool and the services on top of it
+
+        Args:
+            settings: Application settings
+            client: Pre-built client used instead of the pool (e.g. the
+                benchmark fake); no pool is created then
+        """
+        self.settings = settings
+        self.client_pool: Optional[GeminiClientPool] = None if client else GeminiClientPool(settings)
+        self.shared_state = create_shared_state(settings)
+        self.response_cache = create_response_cache(settings, self.shared_state)
+        if self.response_cache is not None and settings.response_cache_warm_path:
+            warm_cache(self.response_cache, settings.response_cache_warm_path)
+        self.gemini_flights = SingleFlight("gemini") if settings.single_flight_enabled else None
+        self.search_flights = SingleFlight("initial_search") if settings.single_flight_enabled else None
+        self.gemini_service = GeminiService(
+            client=client,
+            pool=self.client_pool,
+            cache=self.response_cache,
+            single_flight=self.gemini_flights,
+            shared_state=self.shared_state
+        )
+        self.shop_index = create_shop_index(settings)
+        self.detail_prefetch = create_detail_prefetch(settings)
+        self.search_service = SearchService(
+            self.gemini_service,
+            single_flight=self.search_flights,
+            shop_index=self.shop_index,
+            rate_limiter=create_rate_limiter(settings, self.shared_state),
+            prefetch=self.detail_prefetch
+        )
+
+    async def aclose(self) -> None:
+        """Release pooled connections and cache resources"""
+        if self.client_pool is not None:
+            await self.client_pool.aclose()
+        self.gemini_service.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        if self.shop_index is not None:
+            self.shop_index.close()
+        if self.detail_prefetch is not None:
+            self.detail_prefetch.close()
+        if self.shared_state is not None:
+            self.shared_state.close()
+
+
+_registry: Optional[ServiceRegistry] = None
+_reload_lock = asyncio.Lock()
+# Pending closes of retired registries (the event loop only keeps weak references to tasks)
+_closing: Set[asyncio.Task] = set()
+
+
+def init_services(client: Optional[genai.Client] = None) -> ServiceRegistry:
+    """
+    Create the application-wide registry (called from the startup hook)
+
+    Args:
+        client: Pre-built client used instead of the pool (e.g. the
+            benchmark fake); ignored if the registry already exists
+
+    Returns:
+        ServiceRegistry: The active registry
+    """
+    global _registry
+    if _registry is None:
+        _registry = ServiceRegistry(get_settings(), client)
+        logger.info("[Registry] Services initialized")
+    return _registry
+
+
+def get_registry() -> ServiceRegistry:
+    """
+    Get the active registry, creating it on first use
+
+    Returns:
+        ServiceRegistry: The active registry
+    """
+    return _registry or init_services()
+
+
+async def reload_services() -> ServiceRegistry:
+    """
+    Reload settings from .env and swap in a freshly built registry
+
+    The new registry is fully built before it replaces the old one, so
+    concurrent requests always see a complete set of services. Building it
+    opens cache and state connections and may read files, so it runs in a
+    worker thread while requests keep being served. The old pool is closed
+    after a grace period to let in-flight searches finish.
+
+    Returns:
+        ServiceRegistry: The new active registry
+    """
+    global _registry
+    async with _reload_lock:
+        clear_settings_cache()
+        settings = await asyncio.to_thread(get_settings)
+        new_registry = await asyncio.to_thread(ServiceRegistry, settings)
+        old_registry, _registry = _registry, new_registry
+        logger.info("[Registry] Services reloaded")
+
+    if old_registry is not None:
+        task = asyncio.create_task(_close_later(old_registry, new_registry.settings.service_reload_grace_seconds))
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+
+    return new_registry
+
+
+async def shutdown_services() -> None:
+    """Close the active registry (called from the shutdown hook)"""
+    global _registry
+    if _registry is not None:
+        await _registry.aclose()
+        _registry = None
+
+
+async def _close_later(registry: ServiceRegistry, delay: float) -> None:
+    """Close a retired registry once in-flight requests have drained"""
+    await asyncio.sleep(delay)
+    await registry.aclose()
+    logger.info("[Registry] Retired services closed")
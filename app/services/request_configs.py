@@ -0,0 +1,101 @@
+"""
+Prebuilt Gemini request configs and response validators
+"""
+import json
+import threading
+from typing import Dict, Tuple, Type, TypeVar
+from google.genai import types
+from pydantic import BaseModel, TypeAdapter
+from app.services.cache import make_cache_key
+
+T = TypeVar('T', bound=BaseModel)
+
+
+class RequestConfigRegistry:
+    """
+    Request configs and validators built once and reused for every call
+
+    Building a structured config runs `model_json_schema()` (about 1ms per
+    call for the judgement schemas) and the grounding config rebuilds the
+    search tool; both are the same for every call, so they are built at
+    startup (or on a schema's first use) and reused. The grounding config
+    is shared as-is. The SDK rewrites a dict response schema in place, so
+    each structured call gets a shallow copy of the prebuilt config with a
+    fresh schema dict parsed from the cached JSON (about 20us).
+
+    Structured responses are validated with a cached TypeAdapter per schema.
+    """
+
+    def __init__(self, attempt_timeout: float):
+        """
+        Build the shared configs
+
+        Args:
+            attempt_timeout: Per-attempt HTTP deadline in seconds
+        """
+        self.http_options = types.HttpOptions(timeout=int(attempt_timeout * 1000))
+        self.grounding = types.GenerateContentConfig(
+            tools=[types.Tool(google_search=types.GoogleSearch())],
+            http_options=self.http_options
+        )
+        self._structured: Dict[type, Tuple[types.GenerateContentConfig, str]] = {}
+        self._validators: Dict[type, TypeAdapter] = {}
+        self._lock = threading.Lock()
+
+    def register(self, *schemas: Type[BaseModel]) -> None:
+        """
+        Build the config and validator for schemas ahead of their first call
+
+        Args:
+            *schemas: Pydantic model classes used for structured responses
+        """
+        for schema in schemas:
+            self.structured(schema)
+            # Warm the cache key's schema fingerprint as well
+            make_cache_key("structured", "", "", schema)
+
+    def structured(self, schema: Type[BaseModel]) -> types.GenerateContentConfig:
+        """
+        Get the JSON output config for one call with a schema
+
+        Args:
+            schema: Pydantic model class for the response
+
+        Returns:
+            types.GenerateContentConfig: Config owning its response schema dict
+        """
+        entry = self._structured.get(schema)
+        if entry is None:
+            with self._lock:
+                entry = self._structured.get(schema)
+                if entry is None:
+                    schema_json = json.dumps(schema.model_json_schema(), ensure_ascii=False)
+                    config = types.GenerateContentConfig(
+                        response_mime_type="application/json",
+                        response_schema=json.loads(schema_json),
+                        http_options=self.http_options,
+                    )
+                    self._validators[schema] = TypeAdapter(schema)
+                    entry = self._structured[schema] = (config, schema_json)
+        config, schema_json = entry
+        return config.model_copy(update={"response_schema": json.loads(schema_json)})
+
+    def validate_json(self, schema: Type[T], text: str) -> T:
+        """
+        Validate a JSON response against a schema
+
+        Args:
+            schema: Pydantic model class
+            text: Raw JSON text
+
+        Returns:
+            Validated model instance
+
+        Raises:
+            ValidationError: If the text does not match the schema
+        """
+        validator = self._validators.get(schema)
+        if validator is None:
+            self.structured(schema)
+            validator = self._validators[schema]
+        return validator.validate_json(text)
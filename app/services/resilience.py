@@ -0,0 +1,420 @@
+"""
+Retry, backoff, hedging and circuit breaking for Gemini API calls
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+import httpx
+from google.genai import errors as genai_errors
+from app.config import Settings
+from app.metrics import GEMINI_CIRCUIT_STATE, GEMINI_HEDGES, GEMINI_RETRIES
+from app.logger import logger
+
+R = TypeVar('R')
+
+# HTTP status codes worth retrying (timeouts, rate limits, transient server errors)
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+# Event loop time at which the current async attempt times out (set per attempt)
+_ATTEMPT_DEADLINE: ContextVar[Optional[float]] = ContextVar("gemini_attempt_deadline", default=None)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the API while the circuit breaker is open"""
+
+
+def attempt_timed_out() -> bool:
+    """
+    Whether the current async attempt has reached its per-attempt deadline
+
+    A per-attempt timeout ends the call by cancelling it, so inside the call
+    it looks like any other cancellation (hedge loser, abandoned shop,
+    cancelled prefetch); this tells them apart.
+
+    Returns:
+        bool: True if called from an attempt whose deadline has passed
+    """
+    deadline = _ATTEMPT_DEADLINE.get()
+    return deadline is not None and asyncio.get_running_loop().time() >= deadline
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Classify an API call failure as transient
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        bool: True for rate limits, transient server errors, timeouts and
+            connection failures; False for bad requests, auth errors and
+            response validation errors
+    """
+    if isinstance(error, genai_errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError, TimeoutError, ConnectionError))
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Seconds requested by a Retry-After header, if the error carries one"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the API is degraded
+
+    After `failure_threshold` consecutive transient failures the circuit
+    opens and calls are rejected with CircuitOpenError. Once `reset_seconds`
+    have passed a single probe call is let through (half-open); its success
+    closes the circuit, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        """
+        Initialize circuit breaker
+
+        Args:
+            name: Name for logging and metrics
+            failure_threshold: Consecutive failures that open the circuit (0 disables)
+            reset_seconds: Time the circuit stays open before a probe
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state (closed, open or half_open)"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._set_state(self.HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            logger.warning(f"[Circuit Breaker] {self.name}: {self._state} -> {state}")
+        self._state = state
+        GEMINI_CIRCUIT_STATE.set(
+            {self.CLOSED: 0, self.HALF_OPEN: 1, self.OPEN: 2}[state], breaker=self.name
+        )
+
+    def allow(self) -> None:
+        """
+        Admit a call or reject it
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a
+                probe already in flight
+        """
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        raise CircuitOpenError(f"Circuit breaker '{self.name}' is open; Gemini API calls are suspended")
+
+    def record_success(self) -> None:
+        """Close the circuit after a call that reached the API"""
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        """Count a transient failure and open the circuit at the threshold"""
+        if self.failure_threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+    def release(self) -> None:
+        """Forget an abandoned (cancelled) or inconclusive call without judging the API"""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies"""
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize tracker
+
+        Args:
+            window: Number of recent samples kept
+        """
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record a latency sample"""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percentile: float, min_samples: int) -> Optional[float]:
+        """
+        Latency at the given percentile
+
+        Args:
+            percentile: Percentile (0-100)
+            min_samples: Samples required before an estimate is returned
+
+        Returns:
+            Optional[float]: Latency in seconds, or None with too few samples
+        """
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
+class ResilientCaller:
+    """
+    Run Gemini API calls with retries, deadlines, hedging and a circuit breaker
+
+    Each attempt is bounded by `gemini_call_timeout_seconds`; transient
+    failures are retried with exponential backoff and full jitter (honouring
+    Retry-After) until `gemini_max_retries` or the overall
+    `gemini_total_timeout_seconds` deadline is reached. With hedging enabled,
+    an async attempt that is slower than the recent latency percentile for
+    its call kind gets a duplicate request and the first success wins.
+    """
+
+    def __init__(self, settings: Settings, model_name: str, breaker_name: str = "gemini"):
+        """
+        Initialize from settings
+
+        Args:
+            settings: Application settings
+            model_name: Model name used as metrics label
+            breaker_name: Circuit breaker name for logs and metrics
+        """
+        self.model_name = model_name
+        self.max_retries = max(0, settings.gemini_max_retries)
+        self.base_delay = settings.gemini_retry_base_delay
+        self.max_delay = settings.gemini_retry_max_delay
+        self.attempt_timeout = settings.gemini_call_timeout_seconds
+        self.total_timeout = settings.gemini_total_timeout_seconds
+        self.hedge_enabled = settings.gemini_hedge_enabled
+        self.hedge_percentile = settings.gemini_hedge_percentile
+        self.hedge_min_samples = settings.gemini_hedge_min_samples
+        self.breaker = CircuitBreaker(
+            breaker_name,
+            settings.gemini_circuit_failure_threshold,
+            settings.gemini_circuit_reset_seconds
+        )
+        self._latency: Dict[str, LatencyTracker] = {}
+
+    def call(self, kind: str, func: Callable[[], R]) -> R:
+        """
+        Run a blocking call with retries
+
+        The per-attempt deadline is enforced by the HTTP timeout in the
+        request config, since a blocking call cannot be interrupted here.
+
+        Args:
+            kind: Call kind ("grounding" or "structured")
+            func: Performs one API call
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            CircuitOpenError: If the circuit breaker rejects the call
+            Exception: The last error once retries are exhausted
+        """
+        deadline = time.monotonic() + self.total_timeout
+        attempt = 0
+        while True:
+            self.breaker.allow()
+            start = time.monotonic()
+            try:
+                result = func()
+            except Exception as e:
+                self._settle(e)
+                delay = self._next_delay(kind, attempt, e, deadline)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._settle(None)
+            self._tracker(kind).observe(time.monotonic() - start)
+            return result
+
+    async def call_async(self, kind: str, factory: Callable[[], Awaitable[R]]) -> R:
+        """
+        Run an async call with retries, deadlines and optional hedging
+
+        Args:
+            kind: Call kind ("grounding" or "structured")
+            factory: Creates the coroutine for one API call
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            CircuitOpenError: If the circuit breaker rejects the call
+            Exception: The last error once retries are exhausted
+        """
+        deadline = time.monotonic() + self.total_timeout
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged_attempt_async(kind, factory, deadline)
+            except Exception as e:
+                delay = self._next_delay(kind, attempt, e, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _hedged_attempt_async(
+        self,
+        kind: str,
+        factory: Callable[[], Awaitable[R]],
+        deadline: float
+    ) -> R:
+        """Run one attempt, adding a hedge request if it is unusually slow"""
+        self.breaker.allow()
+        try:
+            result = await self._race_async(kind, factory, min(self.attempt_timeout, deadline - time.monotonic()))
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            self._settle(e)
+            raise
+        self._settle(None)
+        return result
+
+    async def _race_async(self, kind: str, factory: Callable[[], Awaitable[R]], timeout: float) -> R:
+        """Return the first successful result of the primary and hedge requests"""
+        hedge_delay = self._hedge_delay(kind)
+        primary = asyncio.ensure_future(self._timed_call_async(kind, factory, timeout))
+        if hedge_delay is None or hedge_delay >= timeout:
+            return await primary
+
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                logger.info(f"[Resilience] {kind} call slower than p{self.hedge_percentile:g} ({hedge_delay:.2f}s), hedging")
+                GEMINI_HEDGES.inc(model=self.model_name, kind=kind)
+                tasks.append(asyncio.ensure_future(self._timed_call_async(kind, factory, timeout - hedge_delay)))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _timed_call_async(self, kind: str, factory: Callable[[], Awaitable[R]], timeout: float) -> R:
+        """Run one API request under a deadline and record its latency"""
+        start = time.monotonic()
+        timeout = max(0.0, timeout)
+        # The request task created by wait_for copies this context
+        token = _ATTEMPT_DEADLINE.set(asyncio.get_running_loop().time() + timeout)
+        try:
+            result = await asyncio.wait_for(factory(), timeout=timeout)
+        finally:
+            _ATTEMPT_DEADLINE.reset(token)
+        self._tracker(kind).observe(time.monotonic() - start)
+        return result
+
+    def _settle(self, error: Optional[BaseException]) -> None:
+        """
+        Report an attempt outcome to the circuit breaker
+
+        Non-retryable errors (400, 401, 403, invalid responses) say nothing
+        about the API's health: they neither count as failures nor close the
+        breaker, and only free the half-open probe slot.
+        """
+        if error is None:
+            self.breaker.record_success()
+        elif is_retryable(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+    def _next_delay(self, kind: str, attempt: int, error: BaseException, deadline: float) -> Optional[float]:
+        """
+        Backoff before the next attempt
+
+        Returns:
+            Optional[float]: Seconds to sleep, or None if the error must be
+                raised (not retryable, retries exhausted or deadline reached)
+        """
+        if isinstance(error, CircuitOpenError) or not is_retryable(error) or attempt >= self.max_retries:
+            return None
+
+        # Exponential backoff with full jitter; never shorter than Retry-After
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+
+        if time.monotonic() + delay >= deadline:
+            logger.warning(f"[Resilience] {kind} call deadline reached after {attempt + 1} attempts")
+            return None
+
+        GEMINI_RETRIES.inc(model=self.model_name, kind=kind)
+        logger.warning(
+            f"[Resilience] {kind} call failed ({type(error).__name__}), "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+        )
+        return delay
+
+    def _hedge_delay(self, kind: str) -> Optional[float]:
+        """Latency after which a hedge request is sent, if hedging applies"""
+        if not self.hedge_enabled:
+            return None
+        return self._tracker(kind).percentile(self.hedge_percentile, self.hedge_min_samples)
+
+    def _tracker(self, kind: str) -> LatencyTracker:
+        tracker = self._latency.get(kind)
+        if tracker is None:
+            tracker = self._latency.setdefault(kind, LatencyTracker())
+        return tracker
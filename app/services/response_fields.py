@@ -0,0 +1,102 @@
+"""
+Field selection and compact mode for API responses
+"""
+import typing
+from typing import Any, Dict, Optional, Type
+from pydantic import BaseModel
+from app.schemas.search import (
+    DetailJobStatus,
+    InitialSearchResponse,
+    ShopDetailSearchResponse,
+    SummaryData,
+    SummaryEvent
+)
+
+# Fields left out in compact mode: the prompt and raw grounding answer of the
+# initial search (debug output), and the judgement's copy of the detail text
+# (the same string as the summary's detail_search_result)
+_JUDGEMENT_TEXT = {"judgement": {"search_result"}}
+COMPACT_EXCLUDE: Dict[type, dict] = {
+    InitialSearchResponse: {"prompt_used": True, "raw_response": True},
+    ShopDetailSearchResponse: {"summaries": {"__all__": _JUDGEMENT_TEXT}},
+    DetailJobStatus: {"summaries": {"__all__": _JUDGEMENT_TEXT}},
+    SummaryData: _JUDGEMENT_TEXT,
+    SummaryEvent: {"summary": _JUDGEMENT_TEXT},
+}
+
+
+def parse_fields(model: Type[BaseModel], fields: Optional[str]) -> Optional[dict]:
+    """
+    Parse a `fields=` selection into a model_dump include spec
+
+    Args:
+        model: Response model the fields belong to
+        fields: Comma-separated field paths with dots for nested fields
+            (e.g. "shop_names,summaries.shop_name,summaries.judgement.score");
+            list items are selected as a whole
+
+    Returns:
+        Optional[dict]: Include spec, or None when no selection is given
+
+    Raises:
+        ValueError: If a path does not name a field of the model
+    """
+    if not fields:
+        return None
+
+    include: dict = {}
+    for path in (part.strip() for part in fields.split(",")):
+        if path:
+            _add_path(include, model, path, path.split("."))
+    return include or None
+
+
+def _add_path(include: dict, model: Type[BaseModel], path: str, names: list) -> None:
+    """Add one dotted path to an include spec, descending into nested models and lists"""
+    name, rest = names[0], names[1:]
+    field = model.model_fields.get(name)
+    if field is None:
+        raise ValueError(f"Unknown field: {path}")
+
+    if not rest:
+        include[name] = True
+        return
+    if include.get(name) is True:
+        return
+
+    annotation = _strip_optional(field.annotation)
+    is_list = typing.get_origin(annotation) in (list, typing.List)
+    if is_list:
+        annotation = _strip_optional(typing.get_args(annotation)[0])
+    if not (isinstance(annotation, type) and issubclass(annotation, BaseModel)):
+        raise ValueError(f"Unknown field: {path}")
+
+    nested = include.setdefault(name, {})
+    if is_list:
+        nested = nested.setdefault("__all__", {})
+    _add_path(nested, annotation, path, rest)
+
+
+def _strip_optional(annotation: Any) -> Any:
+    """Unwrap Optional[X] to X"""
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def shape_response(response: BaseModel, include: Optional[dict] = None, compact: bool = False) -> dict:
+    """
+    Dump a response with field selection and compact mode applied
+
+    Args:
+        response: Response model instance
+        include: Include spec from parse_fields (None: all fields)
+        compact: Leave out the COMPACT_EXCLUDE fields and null values
+
+    Returns:
+        dict: JSON-ready response body
+    """
+    exclude = COMPACT_EXCLUDE.get(type(response)) if compact else None
+    return response.model_dump(mode="json", include=include, exclude=exclude, exclude_none=compact)
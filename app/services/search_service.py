@@ -1,10 +1,31 @@
 """
 Search service for restaurant search business logic
 """
+import asyncio
 import re
 import time
-from typing import List
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Coroutine, Dict, Iterator, List, Optional, Set, Tuple, Union
+from pydantic import ValidationError
+from app.metrics import (
+    PROMPT_COMPACTION_SAVED,
+    PROMPT_COMPACTION_TOKENS,
+    PROMPT_COMPACTION_TRUNCATIONS,
+    SEARCH_STAGE_DURATION,
+    SHOP_EXTRACTION_PATHS,
+    observe_stage,
+)
+from app.services.concurrency_limiter import CallPriority, background_calls
 from app.services.gemini_service import GeminiService
+from app.services.prefetch import DetailPrefetchStore
+from app.services.prompt_compaction import compact_text
+from app.services.rate_limiter import TokenBucket
+from app.services.shop_extractor import extract_shop_names
+from app.services.shop_index import ShopFactIndex, normalize_shop_name
+from app.services.singleflight import SingleFlight
 from app.schemas.search import (
     InitialSearchResponse,
     ShopListData,
@@ -13,21 +34,91 @@ from app.schemas.search import (
     SummaryData,
     JudgementData,
     JudgementSchema,
+    BatchJudgementSchema,
     SourceCitation,
 )
 from app.config import get_settings
 from app.logger import logger
 
+# Shop fact index for the detail searches in the current context (see shop_fact_scope())
+_SCOPED_SHOP_INDEX: ContextVar[Optional[ShopFactIndex]] = ContextVar("scoped_shop_index", default=None)
+
+
+@contextmanager
+def shop_fact_scope(index: ShopFactIndex) -> Iterator[None]:
+    """
+    Share query-independent shop facts among the detail searches in this context
+
+    Used when SHOP_INDEX_ENABLED is off to deduplicate shops within a unit
+    of work (e.g. a batch job): inside the block each shop's facts are
+    fetched once and stored in `index`, and every query judges them against
+    its own conditions. The configured shop index, when enabled, takes
+    precedence. Tasks created inside the block inherit the scope.
+
+    Args:
+        index: Index holding the facts for the scope (e.g. ":memory:")
+    """
+    token = _SCOPED_SHOP_INDEX.set(index)
+    try:
+        yield
+    finally:
+        _SCOPED_SHOP_INDEX.reset(token)
+
 
 class SearchService:
-    """Service for restaurant search operations"""
+    """
+    Service for restaurant search operations
+
+    The `*_async` methods are the native asyncio path awaited by the API
+    routers; the blocking methods remain for scripts and other sync callers.
+    The blocking path has no event loop for background work, so it skips
+    single-flight coalescing of initial searches, detail prefetch and
+    batched judgement (BATCH_JUDGEMENT): each shop is judged on its own.
+    The shop fact index, response cache, rate limiter and deadline apply
+    to both paths.
+    """
+
+    def __init__(
+        self,
+        gemini_service: Optional[GeminiService] = None,
+        single_flight: Optional[SingleFlight] = None,
+        shop_index: Optional[ShopFactIndex] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        prefetch: Optional[DetailPrefetchStore] = None
+    ):
+        """
+        Initialize search service
 
-    def __init__(self):
-        """Initialize search service"""
-        self.gemini_service = GeminiService()
+        Args:
+            gemini_service: Pre-built Gemini service (e.g. wrapping a fake
+                client); a new one is created when omitted
+            single_flight: Coalesces identical in-flight initial searches
+            shop_index: Cross-request index of query-independent shop facts
+                used by the detail search
+            rate_limiter: Shared token bucket (one is created from settings
+                when omitted)
+            prefetch: Store for detail searches started speculatively by
+                the async initial search
+        """
+        self.gemini_service = gemini_service or GeminiService()
         self.settings = get_settings()
+        self.single_flight = single_flight
+        self.shop_index = shop_index
+        self.prefetch = prefetch
+        # One facts fetch (or stale refresh) per shop at a time
+        self.fact_flights = SingleFlight("shop_facts")
+        self._background_tasks: Set[asyncio.Task] = set()
+        self.rate_limiter = rate_limiter or TokenBucket(
+            rate=self.settings.gemini_requests_per_second,
+            capacity=self.settings.gemini_burst
+        )
+        # Build request configs and validators for the structured schemas up front
+        self.gemini_service.configs.register(ShopListSchema, JudgementSchema, BatchJudgementSchema)
+        # How often each shop extraction path is taken (fused, local, llm, regex_fallback)
+        self.extraction_paths: Counter = Counter()
         logger.info("SearchService initialized")
 
+    @observe_stage("initial_search", in_flight=True)
     def initial_search(self, input_text: str) -> InitialSearchResponse:
         """
         Perform initial Grounding Search and extract shop names
@@ -51,24 +142,94 @@ class SearchService:
 
         # Step 2: Perform Grounding Search
         logger.info("[Step 2] Performing Grounding Search...")
-        search_result = self.gemini_service.grounding_search(prompt)
+        with SEARCH_STAGE_DURATION.time(stage="initial_grounding"):
+            search_result = self.gemini_service.grounding_search(prompt)
+        raw_response = search_result["text"]
+        logger.info(f"[Step 2] Grounding Search completed: {len(raw_response)} chars")
+
+        # Step 3: Extract shop names using structured output
+        logger.info("[Step 3] Extracting shop names...")
+        shop_list = self._extract_without_llm(raw_response) or self._extract_shop_names(raw_response)
+        logger.info(f"[Step 3] Extracted {len(shop_list.shops)} shops")
+
+        return self._build_initial_response(input_text, prompt, raw_response, shop_list)
+
+    async def initial_search_async(self, input_text: str) -> InitialSearchResponse:
+        """
+        Perform initial Grounding Search and extract shop names (asyncio)
+
+        Concurrent requests with the same input text share one search.
+
+        Args:
+            input_text: User's search query
+
+        Returns:
+            InitialSearchResponse: Response with shop list
+
+        Raises:
+            Exception: If search or extraction fails
+        """
+        if self.single_flight is None:
+            return await self._initial_search_async(input_text)
+        return await self.single_flight.do(
+            f"initial:{input_text}",
+            lambda: self._initial_search_async(input_text)
+        )
+
+    @observe_stage("initial_search", in_flight=True)
+    async def _initial_search_async(self, input_text: str) -> InitialSearchResponse:
+        """Run the initial search pipeline for initial_search_async()"""
+        logger.info("=" * 80)
+        logger.info(f"[Initial Search] Starting for input: {input_text}")
+        logger.info("=" * 80)
+
+        # Step 1: Build prompt for Grounding Search
+        prompt = self._build_initial_search_prompt(input_text)
+        logger.info(f"[Step 1] Prompt built: {len(prompt)} chars")
+
+        # Step 2: Perform Grounding Search
+        logger.info("[Step 2] Performing Grounding Search...")
+        with SEARCH_STAGE_DURATION.time(stage="initial_grounding"):
+            search_result = await self.gemini_service.grounding_search_async(prompt)
         raw_response = search_result["text"]
         logger.info(f"[Step 2] Grounding Search completed: {len(raw_response)} chars")
 
         # Step 3: Extract shop names using structured output
         logger.info("[Step 3] Extracting shop names...")
-        shop_list = self._extract_shop_names(raw_response)
+        shop_list = self._extract_without_llm(raw_response) or await self._extract_shop_names_async(raw_response)
         logger.info(f"[Step 3] Extracted {len(shop_list.shops)} shops")
 
-        # Build response
+        self._prefetch_details(input_text, shop_list.shops)
+
+        return self._build_initial_response(input_text, prompt, raw_response, shop_list)
+
+    def _build_initial_response(
+        self,
+        input_text: str,
+        prompt: str,
+        raw_response: str,
+        shop_list: ShopListData
+    ) -> InitialSearchResponse:
+        """
+        Build the initial search response
+
+        Args:
+            input_text: User's search query
+            prompt: Prompt sent to Gemini
+            raw_response: Raw Grounding Search response text
+            shop_list: Extracted shop names
+
+        Returns:
+            InitialSearchResponse: Response with shop list
+        """
         response = InitialSearchResponse(
             input_text=input_text,
             prompt_used=prompt,
-            model_name=self.settings.gemini_model,
+            model_name=self.gemini_service.router.model_for("grounding"),
             raw_response=raw_response,
             grounding_metadata={
                 "search_enabled": True,
-                "model": self.settings.gemini_model
+                "model": self.gemini_service.router.model_for("grounding")
             },
             shop_list=shop_list
         )
@@ -98,8 +259,92 @@ class SearchService:
 
 各店舗について、簡潔な説明を添えて回答してください。"""
 
+        if self.settings.initial_search_mode == "fused":
+            # Ask for the shop list in the same round-trip (grounding calls cannot use response_schema)
+            prompt += """
+
+回答の最後に、紹介した店舗名のみを以下のJSON形式で出力してください:
+```json
+{"shops": ["店舗名1", "店舗名2"]}
+```"""
+
         return prompt
 
+    def _record_extraction_path(self, path: str) -> None:
+        """Count which shop extraction path produced the result"""
+        self.extraction_paths[path] += 1
+        SHOP_EXTRACTION_PATHS.inc(path=path)
+
+    @observe_stage("local_extraction")
+    def _extract_without_llm(self, search_result: str) -> Optional[ShopListData]:
+        """
+        Try to obtain shop names without a separate extraction call
+
+        Depending on INITIAL_SEARCH_MODE this parses the JSON block requested
+        by the fused prompt, or runs the local extractor and accepts its
+        result when it is confident enough.
+
+        Args:
+            search_result: Raw search result text
+
+        Returns:
+            Optional[ShopListData]: Shop names, or None to escalate to the LLM
+        """
+        mode = self.settings.initial_search_mode
+        if mode == "two_pass":
+            return None
+
+        if mode == "fused":
+            shops = self._parse_fused_shop_list(search_result)
+            if shops:
+                self._record_extraction_path("fused")
+                logger.info(f"[Extract Shop Names] Fused path: {len(shops)} shops")
+                return self._clean_shop_names(shops)
+            logger.warning("[Extract Shop Names] Fused JSON block missing or invalid")
+
+        shop_list, confidence = self._local_extraction(search_result)
+        if confidence >= self.settings.local_extraction_min_confidence:
+            self._record_extraction_path("local")
+            logger.info(f"[Extract Shop Names] Local path: {len(shop_list.shops)} shops (confidence={confidence:.2f})")
+            return shop_list
+
+        logger.info(f"[Extract Shop Names] Local confidence {confidence:.2f} too low, escalating to LLM")
+        return None
+
+    def _parse_fused_shop_list(self, search_result: str) -> List[str]:
+        """
+        Parse the trailing JSON shop list requested by the fused prompt
+
+        Args:
+            search_result: Raw search result text
+
+        Returns:
+            List[str]: Shop names, empty if no valid block was found
+        """
+        blocks = re.findall(r'```(?:json)?\s*(\{.*?\})\s*```', search_result, re.DOTALL)
+        if not blocks:
+            return []
+        try:
+            return ShopListSchema.model_validate_json(blocks[-1]).shops
+        except ValidationError as e:
+            logger.warning(f"[Extract Shop Names] Fused JSON invalid: {e}")
+            return []
+
+    def _local_extraction(self, search_result: str) -> Tuple[ShopListData, float]:
+        """
+        Extract shop names locally and estimate how trustworthy the result is
+
+        Args:
+            search_result: Raw search result text
+
+        Returns:
+            Tuple[ShopListData, float]: Shop names and confidence (0.0-1.0)
+        """
+        result = extract_shop_names(search_result)
+        logger.info(f"[Local Extraction] Found {len(result.shops)} shops (pattern={result.pattern}, confidence={result.confidence})")
+        return ShopListData(shops=result.shops), result.confidence
+
+    @observe_stage("extraction")
     def _extract_shop_names(self, search_result: str) -> ShopListData:
         """
         Extract shop names from Grounding Search result using structured output
@@ -113,8 +358,92 @@ class SearchService:
         Raises:
             Exception: If extraction fails
         """
-        # Build extraction prompt
-        extraction_prompt = f"""以下のテキストから、飲食店の店舗名を抽出してください。
+        try:
+            # Use structured output with Pydantic schema
+            result = self.gemini_service.structured_response(
+                prompt=self._build_extraction_prompt(search_result),
+                schema=ShopListSchema,
+                task="extraction"
+            )
+            self._record_extraction_path("llm")
+            return self._clean_shop_names(result.shops)
+
+        except Exception as e:
+            logger.error(f"[Extract Shop Names] Structured extraction failed: {e}")
+            # Fallback: simple line-based extraction
+            logger.warning("[Extract Shop Names] Using fallback extraction")
+            self._record_extraction_path("regex_fallback")
+            return self._fallback_extraction(search_result)
+
+    @observe_stage("extraction")
+    async def _extract_shop_names_async(self, search_result: str) -> ShopListData:
+        """
+        Extract shop names from Grounding Search result (asyncio)
+
+        Args:
+            search_result: Raw search result text
+
+        Returns:
+            ShopListData: Extracted shop names
+        """
+        try:
+            # Use structured output with Pydantic schema
+            result = await self.gemini_service.structured_response_async(
+                prompt=self._build_extraction_prompt(search_result),
+                schema=ShopListSchema,
+                task="extraction"
+            )
+            self._record_extraction_path("llm")
+            return self._clean_shop_names(result.shops)
+
+        except Exception as e:
+            logger.error(f"[Extract Shop Names] Structured extraction failed: {e}")
+            # Fallback: simple line-based extraction
+            logger.warning("[Extract Shop Names] Using fallback extraction")
+            self._record_extraction_path("regex_fallback")
+            return self._fallback_extraction(search_result)
+
+    def _compact_for_prompt(self, text: str, stage: str, max_tokens: int) -> str:
+        """
+        Shrink response text before pasting it into a prompt
+
+        Args:
+            text: Text from an earlier Gemini response
+            stage: Prompt the text goes into ("extraction" or "judgement")
+            max_tokens: Estimated token budget for the text
+
+        Returns:
+            str: Compacted text (unchanged when PROMPT_COMPACTION_ENABLED is off)
+        """
+        if not self.settings.prompt_compaction_enabled:
+            return text
+        result = compact_text(text, max_tokens)
+        PROMPT_COMPACTION_TOKENS.inc(result.original_tokens, stage=stage, state="original")
+        PROMPT_COMPACTION_TOKENS.inc(result.tokens, stage=stage, state="sent")
+        PROMPT_COMPACTION_SAVED.inc(result.tokens_saved, stage=stage)
+        if result.truncated:
+            PROMPT_COMPACTION_TRUNCATIONS.inc(stage=stage)
+            # Text past the budget never reaches the model (e.g. the last shops of the list)
+            logger.warning(
+                f"[Prompt Compaction] {stage} text truncated to the {max_tokens}-token budget: "
+                f"~{result.original_tokens} -> ~{result.tokens} tokens"
+            )
+        return result.text
+
+    def _build_extraction_prompt(self, search_result: str) -> str:
+        """
+        Build prompt for shop name extraction
+
+        Args:
+            search_result: Raw search result text
+
+        Returns:
+            str: Formatted prompt
+        """
+        search_result = self._compact_for_prompt(
+            search_result, "extraction", self.settings.extraction_prompt_max_tokens
+        )
+        return f"""以下のテキストから、飲食店の店舗名を抽出してください。
 最大10件まで抽出してください。
 
 テキスト:
@@ -125,35 +454,32 @@ class SearchService:
 - 「〇〇店」のように店舗を特定できる形式で
 - 重複がある場合は除去"""
 
-        try:
-            # Use structured output with Pydantic schema
-            result = self.gemini_service.structured_response(
-                prompt=extraction_prompt,
-                schema=ShopListSchema
-            )
+    def _clean_shop_names(self, shops: List[str]) -> ShopListData:
+        """
+        Normalize extracted shop names
 
-            # Clean shop names
-            cleaned_shops = []
-            for shop in result.shops[:10]:
-                # Remove leading numbers/symbols
-                shop = re.sub(r'^[\d\.\)\-\s]+', '', shop)
-                shop = shop.strip()
-                if shop and shop not in cleaned_shops:
-                    cleaned_shops.append(shop)
+        Args:
+            shops: Shop names returned by structured extraction
 
-            logger.info(f"[Extract Shop Names] Cleaned: {len(cleaned_shops)} shops")
+        Returns:
+            ShopListData: Cleaned, de-duplicated shop names (max 10)
+        """
+        cleaned_shops = []
+        for shop in shops[:10]:
+            # Remove leading numbers/symbols
+            shop = re.sub(r'^[\d\.\)\-\s]+', '', shop)
+            shop = shop.strip()
+            if shop and shop not in cleaned_shops:
+                cleaned_shops.append(shop)
 
-            return ShopListData(shops=cleaned_shops[:10])
+        logger.info(f"[Extract Shop Names] Cleaned: {len(cleaned_shops)} shops")
 
-        except Exception as e:
-            logger.error(f"[Extract Shop Names] Structured extraction failed: {e}")
-            # Fallback: simple line-based extraction
-            logger.warning("[Extract Shop Names] Using fallback extraction")
-            return self._fallback_extraction(search_result)
+        return ShopListData(shops=cleaned_shops[:10])
 
+    @observe_stage("fallback")
     def _fallback_extraction(self, text: str) -> ShopListData:
         """
-        Fallback shop name extraction using regex
+        Fallback shop name extraction using the local extractor
 
         Args:
             text: Search result text
@@ -161,30 +487,28 @@ class SearchService:
         Returns:
             ShopListData: Extracted shop names
         """
-        shops = []
-        lines = text.split('\n')
-
-        for line in lines:
-            # Pattern: "1. Shop Name - description"
-            match = re.match(r'^\d+\.\s*([^-:：]+)', line)
-            if match:
-                shop = match.group(1).strip()
-                shops.append(shop)
-            # Pattern: "・Shop Name"
-            elif line.strip().startswith('・'):
-                shop = line.strip()[1:].split(':')[0].split('：')[0]
-                shops.append(shop.strip())
-
-        logger.info(f"[Fallback Extraction] Found {len(shops)} shops")
-        return ShopListData(shops=shops[:10])
-
-    def detail_search(self, input_text: str, shop_names: List[str]) -> ShopDetailSearchResponse:
+        result = extract_shop_names(text)
+        logger.info(f"[Fallback Extraction] Found {len(result.shops)} shops (pattern={result.pattern})")
+        return ShopListData(shops=result.shops)
+
+    @observe_stage("detail_search", in_flight=True)
+    def detail_search(
+        self,
+        input_text: str,
+        shop_names: List[str],
+        deadline: Optional[float] = None
+    ) -> ShopDetailSearchResponse:
         """
         Perform detail search for selected shops with match judgement
 
+        Unlike detail_search_async(), shops are always judged one by one
+        (BATCH_JUDGEMENT is ignored) and prefetched results are not used.
+
         Args:
             input_text: Original user's search query
             shop_names: List of shop names to search
+            deadline: Time budget in seconds (default: DETAIL_SEARCH_DEADLINE_SECONDS);
+                shops still running when it expires are abandoned and marked timed out
 
         Returns:
             ShopDetailSearchResponse: Response with summaries for each shop
@@ -197,65 +521,236 @@ class SearchService:
         logger.info(f"[Detail Search] Input text: {input_text}")
         logger.info("=" * 80)
 
-        summaries = []
+        total = len(shop_names)
+        max_workers = max(1, min(self.settings.detail_search_concurrency, total))
+        logger.info(f"[Detail Search] Concurrency: {max_workers} workers")
+        if self.settings.batch_judgement:
+            logger.info("[Detail Search] BATCH_JUDGEMENT applies to the async path only; judging each shop")
+
+        deadline_at = self._deadline_at(deadline)
+
+        # Fan out per-shop chains; results are collected in the input order of shops
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = [
+            executor.submit(self._process_shop, i, shop_name, total, input_text)
+            for i, shop_name in enumerate(shop_names, 1)
+        ]
+        done, not_done = wait_futures(futures, timeout=self._remaining(deadline_at))
+        # Running calls cannot be interrupted; they finish in the background and are discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+        if not_done:
+            logger.warning(f"[Detail Search] Deadline reached: {len(not_done)} of {total} shops timed out")
+
+        summaries = [
+            future.result() if future in done else self._build_timeout_summary(shop_name)
+            for future, shop_name in zip(futures, shop_names)
+        ]
+        return self._build_detail_response(input_text, shop_names, summaries)
+
+    @observe_stage("detail_search", in_flight=True)
+    async def detail_search_async(
+        self,
+        input_text: str,
+        shop_names: List[str],
+        deadline: Optional[float] = None
+    ) -> ShopDetailSearchResponse:
+        """
+        Perform detail search for selected shops with match judgement (asyncio)
 
-        for i, shop_name in enumerate(shop_names, 1):
-            logger.info(f"[Detail Search] Processing shop {i}/{len(shop_names)}: {shop_name}")
+        Args:
+            input_text: Original user's search query
+            shop_names: List of shop names to search
+            deadline: Time budget in seconds (default: DETAIL_SEARCH_DEADLINE_SECONDS);
+                shops still running when it expires are cancelled and marked timed out
 
-            try:
-                # Step 4: Individual shop Grounding Search
-                logger.info(f"[Step 4-{i}] Performing Grounding Search for: {shop_name}")
-                detail_data = self._shop_detail_search(shop_name, input_text)
-                detail_result = detail_data["text"]
-                detail_sources = detail_data["sources"]
-                logger.info(f"[Step 4-{i}] Grounding Search completed: {len(detail_result)} chars, {len(detail_sources)} sources")
+        Returns:
+            ShopDetailSearchResponse: Response with summaries for each shop
+        """
+        logger.info("=" * 80)
+        logger.info(f"[Detail Search] Starting for {len(shop_names)} shops")
+        logger.info(f"[Detail Search] Input text: {input_text}")
+        logger.info("=" * 80)
 
-                # Step 5: Match judgement
-                logger.info(f"[Step 5-{i}] Judging match for: {shop_name}")
-                judgement = self._judge_match(input_text, shop_name, detail_result)
-                logger.info(f"[Step 5-{i}] Judgement: score={judgement.score}")
-
-                # Build summary with sources
-                summary = SummaryData(
-                    shop_name=shop_name,
-                    detail_search_result=detail_result,
-                    judgement=JudgementData(
-                        shop_name=shop_name,
-                        score=judgement.score,
-                        reason=judgement.reason,
-                        search_result=detail_result
-                    ),
-                    sources=[
-                        SourceCitation(url=s["url"], title=s.get("title"))
-                        for s in detail_sources
-                    ]
-                )
-                summaries.append(summary)
+        total = len(shop_names)
+        concurrency = max(1, min(self.settings.detail_search_concurrency, total))
+        semaphore = asyncio.Semaphore(concurrency)
+        logger.info(f"[Detail Search] Concurrency: {concurrency} tasks")
+        deadline_at = self._deadline_at(deadline)
+
+        if self.settings.batch_judgement:
+            summaries = await self._detail_search_batched_async(input_text, shop_names, semaphore, deadline_at)
+            return self._build_detail_response(input_text, shop_names, summaries)
+
+        async def run(i: int, shop_name: str) -> SummaryData:
+            async with semaphore:
+                return await self._process_shop_async(i, shop_name, total, input_text)
+
+        tasks = [asyncio.create_task(run(i, shop_name)) for i, shop_name in enumerate(shop_names, 1)]
+        done = await self._wait_until(tasks, deadline_at)
+
+        # Collect in the input order of shops
+        summaries = [
+            task.result() if task in done else self._build_timeout_summary(shop_name)
+            for task, shop_name in zip(tasks, shop_names)
+        ]
+        return self._build_detail_response(input_text, shop_names, summaries)
+
+    async def detail_search_stream(
+        self,
+        input_text: str,
+        shop_names: List[str],
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[Tuple[int, SummaryData]]:
+        """
+        Perform detail search, yielding each shop's summary as soon as it completes
 
-                # Rate limiting: wait 500ms between API calls
-                if i < len(shop_names):
-                    logger.debug(f"[Rate Limit] Waiting 500ms before next shop...")
-                    time.sleep(0.5)
+        Shops are always judged individually here so that every result can
+        be emitted without waiting for the others.
 
-            except Exception as e:
-                logger.error(f"[Detail Search] Error for shop '{shop_name}': {e}")
-                # Add error summary
-                error_summary = SummaryData(
-                    shop_name=shop_name,
-                    detail_search_result=f"検索エラー: {str(e)}",
-                    judgement=JudgementData(
-                        shop_name=shop_name,
-                        score=1,
-                        reason=f"検索中にエラーが発生しました: {str(e)[:50]}",
-                        search_result=""
-                    )
+        Args:
+            input_text: Original user's search query
+            shop_names: List of shop names to search
+            deadline: Time budget in seconds (default: DETAIL_SEARCH_DEADLINE_SECONDS);
+                when it expires the remaining shops are yielded as timed out
+
+        Yields:
+            Tuple[int, SummaryData]: 0-based request index and summary, in
+                completion order
+        """
+        logger.info("=" * 80)
+        logger.info(f"[Detail Search Stream] Starting for {len(shop_names)} shops")
+        logger.info(f"[Detail Search Stream] Input text: {input_text}")
+        logger.info("=" * 80)
+
+        total = len(shop_names)
+        concurrency = max(1, min(self.settings.detail_search_concurrency, total))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(index: int, shop_name: str) -> Tuple[int, SummaryData]:
+            async with semaphore:
+                return index, await self._process_shop_async(index + 1, shop_name, total, input_text)
+
+        deadline_at = self._deadline_at(deadline)
+        tasks = [asyncio.create_task(run(index, shop_name)) for index, shop_name in enumerate(shop_names)]
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self._remaining(deadline_at),
+                    return_when=asyncio.FIRST_COMPLETED
                 )
-                summaries.append(error_summary)
+                if not done:
+                    break
+                for task in done:
+                    yield task.result()
+        finally:
+            # Deadline passed, client disconnected or consumer stopped early: drop outstanding work
+            for task in tasks:
+                task.cancel()
+
+        if pending:
+            logger.warning(f"[Detail Search Stream] Deadline reached: {len(pending)} shops timed out")
+        for index, task in enumerate(tasks):
+            if task in pending:
+                yield index, self._build_timeout_summary(shop_names[index])
 
+        logger.info("=" * 80)
+        logger.info(f"[Detail Search Stream] Completed: {total} summaries")
+        logger.info("=" * 80)
+
+    async def _detail_search_batched_async(
+        self,
+        input_text: str,
+        shop_names: List[str],
+        semaphore: asyncio.Semaphore,
+        deadline_at: Optional[float] = None
+    ) -> List[SummaryData]:
+        """
+        Run all Grounding Searches, then judge every shop in one structured call
+
+        Args:
+            input_text: Original user's search query
+            shop_names: List of shop names to search
+            semaphore: Concurrency cap for Gemini calls
+            deadline_at: time.monotonic() deadline; shops not judged by then
+                are marked timed out
+
+        Returns:
+            List[SummaryData]: Summary for each shop, in request order
+        """
+        async def search(i: int, shop_name: str) -> dict:
+            prefetched = await self._take_prefetched_async(input_text, shop_name)
+            if prefetched is not None:
+                logger.info(f"[Step 4-{i}] Using prefetched Grounding Search for: {shop_name}")
+                return prefetched["detail"]
+            async with semaphore:
+                logger.info(f"[Step 4-{i}] Performing Grounding Search for: {shop_name}")
+                await self._wait_for_rate_limit_async(f"Step 4-{i}")
+                return await self._shop_detail_search_async(shop_name, input_text)
+
+        # Step 4: Individual shop Grounding Searches (None: not finished by the deadline)
+        # The searches get two thirds of the budget so the single judgement call has time left
+        search_deadline_at = None if deadline_at is None else time.monotonic() + self._remaining(deadline_at) * 2 / 3
+        tasks = [asyncio.create_task(search(i, shop_name)) for i, shop_name in enumerate(shop_names, 1)]
+        done = await self._wait_until(tasks, search_deadline_at)
+        results = [
+            (task.exception() or task.result()) if task in done else None
+            for task in tasks
+        ]
+        details = {
+            shop_name: result["text"]
+            for shop_name, result in zip(shop_names, results)
+            if isinstance(result, dict)
+        }
+
+        # Step 5: Batched match judgement
+        try:
+            judgements = await asyncio.wait_for(
+                self._judge_match_batch_async(input_text, details, semaphore),
+                timeout=self._remaining(deadline_at)
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"[Detail Search] Deadline reached during batched judgement of {len(details)} shops")
+            judgements = {}
+
+        summaries = []
+        for shop_name, result in zip(shop_names, results):
+            judgement = judgements.get(shop_name)
+            if result is None or (isinstance(result, dict) and judgement is None):
+                summaries.append(self._build_timeout_summary(shop_name))
+                continue
+            error = result if isinstance(result, Exception) else judgement
+            if isinstance(error, Exception):
+                logger.error(f"[Detail Search] Error for shop '{shop_name}': {error}")
+                summaries.append(self._build_error_summary(shop_name, error))
+            else:
+                summaries.append(self._build_summary(shop_name, result, judgement))
+
+        return summaries
+
+    def _build_detail_response(
+        self,
+        input_text: str,
+        shop_names: List[str],
+        summaries: List[SummaryData]
+    ) -> ShopDetailSearchResponse:
+        """
+        Build the detail search response
+
+        Args:
+            input_text: Original user's search query
+            shop_names: Shop names searched
+            summaries: Summary for each shop, in request order
+
+        Returns:
+            ShopDetailSearchResponse: Response with summaries for each shop
+        """
         response = ShopDetailSearchResponse(
             input_text=input_text,
             shop_names=shop_names,
-            summaries=summaries
+            summaries=summaries,
+            timed_out=[summary.shop_name for summary in summaries if summary.status == "timed_out"]
         )
 
         logger.info("=" * 80)
@@ -264,10 +759,233 @@ class SearchService:
 
         return response
 
+    @observe_stage("shop")
+    def _process_shop(self, i: int, shop_name: str, total: int, input_text: str) -> SummaryData:
+        """
+        Run detail search and match judgement for a single shop
+
+        Args:
+            i: 1-based position of the shop in the request
+            shop_name: Shop name to search
+            total: Number of shops in the request
+            input_text: Original user's search query
+
+        Returns:
+            SummaryData: Summary for the shop (error summary if any step fails)
+        """
+        logger.info(f"[Detail Search] Processing shop {i}/{total}: {shop_name}")
+
+        try:
+            # Step 4: Individual shop Grounding Search
+            logger.info(f"[Step 4-{i}] Performing Grounding Search for: {shop_name}")
+            self._wait_for_rate_limit(f"Step 4-{i}")
+            detail_data = self._shop_detail_search(shop_name, input_text)
+            logger.info(f"[Step 4-{i}] Grounding Search completed: {len(detail_data['text'])} chars, {len(detail_data['sources'])} sources")
+
+            # Step 5: Match judgement
+            logger.info(f"[Step 5-{i}] Judging match for: {shop_name}")
+            self._wait_for_rate_limit(f"Step 5-{i}")
+            judgement = self._judge_match(input_text, shop_name, detail_data["text"])
+            logger.info(f"[Step 5-{i}] Judgement: score={judgement.score}")
+
+            return self._build_summary(shop_name, detail_data, judgement)
+
+        except Exception as e:
+            logger.error(f"[Detail Search] Error for shop '{shop_name}': {e}")
+            return self._build_error_summary(shop_name, e)
+
+    @observe_stage("shop")
+    async def _process_shop_async(self, i: int, shop_name: str, total: int, input_text: str) -> SummaryData:
+        """
+        Run detail search and match judgement for a single shop (asyncio)
+
+        Args:
+            i: 1-based position of the shop in the request
+            shop_name: Shop name to search
+            total: Number of shops in the request
+            input_text: Original user's search query
+
+        Returns:
+            SummaryData: Summary for the shop (error summary if any step fails)
+        """
+        logger.info(f"[Detail Search] Processing shop {i}/{total}: {shop_name}")
+
+        try:
+            prefetched = await self._take_prefetched_async(input_text, shop_name)
+            if prefetched is not None:
+                detail_data, judgement = prefetched["detail"], prefetched["judgement"]
+                logger.info(f"[Step 4-{i}] Using prefetched Grounding Search for: {shop_name}")
+            else:
+                # Step 4: Individual shop Grounding Search
+                logger.info(f"[Step 4-{i}] Performing Grounding Search for: {shop_name}")
+                await self._wait_for_rate_limit_async(f"Step 4-{i}")
+                detail_data = await self._shop_detail_search_async(shop_name, input_text)
+                judgement = None
+            logger.info(f"[Step 4-{i}] Grounding Search completed: {len(detail_data['text'])} chars, {len(detail_data['sources'])} sources")
+
+            # Step 5: Match judgement
+            if judgement is None:
+                logger.info(f"[Step 5-{i}] Judging match for: {shop_name}")
+                await self._wait_for_rate_limit_async(f"Step 5-{i}")
+                judgement = await self._judge_match_async(input_text, shop_name, detail_data["text"])
+            logger.info(f"[Step 5-{i}] Judgement: score={judgement.score}")
+
+            return self._build_summary(shop_name, detail_data, judgement)
+
+        except Exception as e:
+            logger.error(f"[Detail Search] Error for shop '{shop_name}': {e}")
+            return self._build_error_summary(shop_name, e)
+
+    def _build_summary(self, shop_name: str, detail_data: dict, judgement: JudgementSchema) -> SummaryData:
+        """
+        Build summary with sources for a successfully processed shop
+
+        Args:
+            shop_name: Shop name
+            detail_data: Grounding Search result {"text", "sources"}
+            judgement: Match judgement
+
+        Returns:
+            SummaryData: Summary for the shop
+        """
+        detail_result = detail_data["text"]
+        return SummaryData(
+            shop_name=shop_name,
+            detail_search_result=detail_result,
+            judgement=JudgementData(
+                shop_name=shop_name,
+                score=judgement.score,
+                reason=judgement.reason,
+                search_result=detail_result
+            ),
+            sources=[
+                SourceCitation(url=s["url"], title=s.get("title"))
+                for s in detail_data["sources"]
+            ]
+        )
+
+    def _build_error_summary(self, shop_name: str, error: Exception) -> SummaryData:
+        """
+        Build summary for a shop whose search or judgement failed
+
+        Args:
+            shop_name: Shop name
+            error: Exception raised while processing the shop
+
+        Returns:
+            SummaryData: Error summary with score 1
+        """
+        return SummaryData(
+            shop_name=shop_name,
+            detail_search_result=f"検索エラー: {str(error)}",
+            judgement=JudgementData(
+                shop_name=shop_name,
+                score=1,
+                reason=f"検索中にエラーが発生しました: {str(error)[:50]}",
+                search_result=""
+            ),
+            status="error"
+        )
+
+    def _build_timeout_summary(self, shop_name: str) -> SummaryData:
+        """
+        Build summary for a shop that did not finish before the deadline
+
+        Args:
+            shop_name: Shop name
+
+        Returns:
+            SummaryData: Timed-out summary with score 1
+        """
+        return SummaryData(
+            shop_name=shop_name,
+            detail_search_result="タイムアウト: 制限時間内に検索が完了しませんでした",
+            judgement=JudgementData(
+                shop_name=shop_name,
+                score=1,
+                reason="制限時間内に検索が完了しなかったため判定できませんでした",
+                search_result=""
+            ),
+            status="timed_out"
+        )
+
+    def _deadline_at(self, deadline: Optional[float]) -> Optional[float]:
+        """
+        Convert a detail search time budget into a time.monotonic() deadline
+
+        Args:
+            deadline: Budget in seconds, or None for DETAIL_SEARCH_DEADLINE_SECONDS
+
+        Returns:
+            Optional[float]: Absolute deadline, or None when unbounded
+        """
+        if deadline is None and self.settings.detail_search_deadline_seconds > 0:
+            deadline = self.settings.detail_search_deadline_seconds
+        if deadline is None:
+            return None
+        logger.info(f"[Detail Search] Deadline: {deadline:.1f}s")
+        return time.monotonic() + deadline
+
+    def _remaining(self, deadline_at: Optional[float]) -> Optional[float]:
+        """Seconds left until the deadline (None when unbounded)"""
+        if deadline_at is None:
+            return None
+        return max(0.0, deadline_at - time.monotonic())
+
+    async def _wait_until(self, tasks: List["asyncio.Task"], deadline_at: Optional[float]) -> Set["asyncio.Task"]:
+        """
+        Wait for tasks until the deadline, cancelling the ones still running
+
+        Args:
+            tasks: Per-shop tasks
+            deadline_at: time.monotonic() deadline, or None to wait for all
+
+        Returns:
+            Set[asyncio.Task]: Tasks that finished in time
+        """
+        if not tasks:
+            return set()
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=self._remaining(deadline_at))
+        finally:
+            for task in tasks:
+                task.cancel()
+        if pending:
+            logger.warning(f"[Detail Search] Deadline reached: {len(pending)} of {len(tasks)} shops timed out")
+        return done
+
+    def _wait_for_rate_limit(self, step: str) -> None:
+        """
+        Wait for a rate limiter token before calling Gemini
+
+        Args:
+            step: Step label for logging
+        """
+        waited = self.rate_limiter.acquire()
+        if waited > 0:
+            logger.debug("[Rate Limit] %s waited %.0fms", step, waited * 1000)
+
+    async def _wait_for_rate_limit_async(self, step: str, background: bool = False) -> None:
+        """
+        Wait for a rate limiter token without blocking the event loop
+
+        Args:
+            step: Step label for logging
+            background: Speculative call that must not queue ahead of requests
+        """
+        waited = await self.rate_limiter.acquire_async(background)
+        if waited > 0:
+            logger.debug("[Rate Limit] %s waited %.0fms", step, waited * 1000)
+
+    @observe_stage("detail_grounding")
     def _shop_detail_search(self, shop_name: str, input_text: str) -> dict:
         """
         Perform Grounding Search for a specific shop
 
+        When the shop fact index is enabled, query-independent facts are
+        served from the index. Without an event loop there is no background
+        refresh, so stale entries are refreshed before returning.
+
         Args:
             shop_name: Shop name to search
             input_text: Original user's search query
@@ -278,7 +996,243 @@ class SearchService:
                 "sources": List[dict]  # Source citations
             }
         """
-        prompt = f"""「{shop_name}」について、以下の情報を検索してください。
+        index = self._fact_index()
+        if index is not None:
+            return self._indexed_shop_facts(index, shop_name)
+
+        prompt = self._build_shop_detail_prompt(shop_name, input_text)
+        return self.gemini_service.grounding_search(prompt)
+
+    def _fact_index(self) -> Optional[ShopFactIndex]:
+        """Shop fact index for this detail search (the configured one, else the scoped one)"""
+        return self.shop_index if self.shop_index is not None else _SCOPED_SHOP_INDEX.get()
+
+    def _indexed_shop_facts(self, index: ShopFactIndex, shop_name: str) -> dict:
+        """
+        Get shop facts from the index, fetching missing or stale entries
+
+        Args:
+            index: Shop fact index to use
+            shop_name: Shop name to search
+
+        Returns:
+            dict: {"text": str, "sources": List[dict], ...}
+        """
+        facts = index.get(shop_name)
+        if facts is not None and not facts["stale"]:
+            logger.info(f"[Shop Index] Hit for '{shop_name}'")
+            return facts
+
+        logger.info(f"[Shop Index] {'Stale entry' if facts else 'Miss'} for '{shop_name}', fetching facts")
+        data = self.gemini_service.grounding_search(self._build_shop_facts_prompt(shop_name))
+        index.put(shop_name, data)
+        return data
+
+    @observe_stage("detail_grounding")
+    async def _shop_detail_search_async(self, shop_name: str, input_text: str) -> dict:
+        """
+        Perform Grounding Search for a specific shop (asyncio)
+
+        When the shop fact index is enabled (or a shop_fact_scope() is
+        active), query-independent facts are served from the index and the
+        query is only considered by judgement.
+
+        Args:
+            shop_name: Shop name to search
+            input_text: Original user's search query
+
+        Returns:
+            dict: Same structure as _shop_detail_search()
+        """
+        index = self._fact_index()
+        if index is not None:
+            return await self._indexed_shop_facts_async(index, shop_name)
+
+        prompt = self._build_shop_detail_prompt(shop_name, input_text)
+        return await self.gemini_service.grounding_search_async(prompt)
+
+    async def _indexed_shop_facts_async(self, index: ShopFactIndex, shop_name: str) -> dict:
+        """
+        Get shop facts from the index, fetching or refreshing as needed
+
+        Fresh entries are returned as-is; stale entries are returned
+        immediately and refreshed in the background; missing entries are
+        fetched before returning.
+
+        Args:
+            index: Shop fact index to use
+            shop_name: Shop name to search
+
+        Returns:
+            dict: {"text": str, "sources": List[dict], ...}
+        """
+        # SQLite reads and commits block, so they run off the event loop
+        facts = await asyncio.to_thread(index.get, shop_name)
+        if facts is None:
+            logger.info(f"[Shop Index] Miss for '{shop_name}', fetching facts")
+            return await self._refresh_shop_facts_async(index, shop_name)
+
+        if facts["stale"]:
+            logger.info(f"[Shop Index] Stale entry for '{shop_name}', refreshing in background")
+            self._run_in_background(self._refresh_shop_facts_async(index, shop_name))
+        else:
+            logger.info(f"[Shop Index] Hit for '{shop_name}'")
+        return facts
+
+    async def _refresh_shop_facts_async(self, index: ShopFactIndex, shop_name: str) -> dict:
+        """
+        Fetch query-independent facts for a shop and store them in the index
+
+        Concurrent fetches and refreshes of the same shop (by normalized
+        name) share one call.
+
+        Args:
+            index: Shop fact index to store the facts in
+            shop_name: Shop name to search
+
+        Returns:
+            dict: {"text": str, "sources": List[dict]}
+        """
+        return await self.fact_flights.do(
+            f"{id(index)}:{normalize_shop_name(shop_name)}",
+            lambda: self._fetch_shop_facts_async(index, shop_name)
+        )
+
+    async def _fetch_shop_facts_async(self, index: ShopFactIndex, shop_name: str) -> dict:
+        """Run the facts Grounding Search for _refresh_shop_facts_async()"""
+        data = await self.gemini_service.grounding_search_async(self._build_shop_facts_prompt(shop_name))
+        await asyncio.to_thread(index.put, shop_name, data)
+        return data
+
+    def _prefetch_details(self, input_text: str, shop_names: List[str]) -> None:
+        """
+        Start detail searches for the top shops before the user selects any
+
+        Runs in the background, at most DETAIL_PREFETCH_MAX_IN_FLIGHT at once
+        across all queries, and behind real requests for rate limiter tokens
+        and concurrency limiter slots; detail_search consumes the results
+        through _take_prefetched_async(). Does nothing when prefetch is disabled.
+
+        Args:
+            input_text: User's search query
+            shop_names: Extracted shop names, best first
+        """
+        if self.prefetch is None:
+            return
+        shops = [
+            shop_name for shop_name in shop_names[:self.settings.detail_prefetch_max_shops]
+            if not self.prefetch.contains(input_text, shop_name)
+        ]
+        if not shops:
+            return
+        logger.info(f"[Prefetch] Starting detail searches for {len(shops)} shops")
+        for shop_name in shops:
+            priority = CallPriority()
+            task = asyncio.create_task(self._prefetch_shop_async(input_text, shop_name, priority))
+            self.prefetch.put(input_text, shop_name, task, priority)
+
+    async def _prefetch_shop_async(self, input_text: str, shop_name: str, priority: CallPriority) -> dict:
+        """
+        Run the detail search (and optionally judgement) for one prefetched shop
+
+        Judgement is skipped with BATCH_JUDGEMENT, which judges all selected
+        shops in one call instead, and left to the detail search if it fails.
+
+        Args:
+            input_text: User's search query
+            shop_name: Shop to search
+            priority: Background priority of the calls (promoted when a
+                detail search takes the prefetch)
+
+        Returns:
+            dict: {"detail": dict, "judgement": Optional[JudgementSchema]}
+        """
+        async with self.prefetch.slot():
+            with background_calls(priority):
+                await self._wait_for_rate_limit_async(f"Prefetch {shop_name}", background=True)
+                detail_data = await self._shop_detail_search_async(shop_name, input_text)
+                judgement = None
+                if self.settings.detail_prefetch_judgement and not self.settings.batch_judgement:
+                    await self._wait_for_rate_limit_async(f"Prefetch {shop_name}", background=True)
+                    try:
+                        judgement = await self._judge_match_async(input_text, shop_name, detail_data["text"])
+                    except Exception as e:
+                        # Keep the detail; the detail search judges again
+                        logger.warning(f"[Prefetch] Judgement failed for '{shop_name}': {type(e).__name__}: {str(e)}")
+        logger.info(f"[Prefetch] Completed for: {shop_name}")
+        return {"detail": detail_data, "judgement": judgement}
+
+    async def _take_prefetched_async(self, input_text: str, shop_name: str) -> Optional[dict]:
+        """
+        Wait for a shop's prefetched result, if one was started
+
+        A failed prefetch is logged and treated as missing so the caller
+        searches again.
+
+        Args:
+            input_text: User's search query
+            shop_name: Selected shop
+
+        Returns:
+            Optional[dict]: Result of _prefetch_shop_async(), or None
+        """
+        task = self.prefetch.take(input_text, shop_name) if self.prefetch is not None else None
+        if task is None:
+            return None
+        try:
+            return await task
+        except Exception as e:
+            logger.warning(f"[Prefetch] Failed for '{shop_name}', searching again: {type(e).__name__}: {str(e)}")
+            return None
+
+    def _run_in_background(self, coroutine: Coroutine) -> None:
+        """Run a coroutine without awaiting it, logging any failure"""
+        async def runner():
+            try:
+                await coroutine
+            except Exception as e:
+                logger.error(f"[Background] Task failed: {type(e).__name__}: {str(e)}")
+
+        task = asyncio.create_task(runner())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _build_shop_facts_prompt(self, shop_name: str) -> str:
+        """
+        Build prompt for query-independent shop facts (shop fact index)
+
+        Args:
+            shop_name: Shop name to search
+
+        Returns:
+            str: Formatted prompt
+        """
+        return f"""「{shop_name}」について、以下の情報を検索してください。
+
+【検索項目】
+- 店舗の基本情報(住所、営業時間、定休日など) 出典URL
+- 料理のジャンルや特徴、主なメニューと価格帯
+- 店内の雰囲気や席数、利用シーン
+- アクセス方法
+- 評判や口コミ 出典URL
+
+【回答形式】
+- 検索項目の各情報の根拠となるURL（公式サイト、食べログ、Rettyなど）を必ず記載してください
+- 情報の出典元がわかるよう「参照: [URL]」の形式で明記してください
+- 丁寧かつ簡潔にまとめてください"""
+
+    def _build_shop_detail_prompt(self, shop_name: str, input_text: str) -> str:
+        """
+        Build prompt for individual shop Grounding Search
+
+        Args:
+            shop_name: Shop name to search
+            input_text: Original user's search query
+
+        Returns:
+            str: Formatted prompt
+        """
+        return f"""「{shop_name}」について、以下の情報を検索してください。
 
 【ユーザーの検索条件】
 {input_text}
@@ -295,8 +1249,7 @@ class SearchService:
 - 情報の出典元がわかるよう「参照: [URL]」の形式で明記してください
 - 丁寧かつ簡潔にまとめてください"""
 
-        return self.gemini_service.grounding_search(prompt)
-
+    @observe_stage("judgement")
     def _judge_match(self, input_text: str, shop_name: str, shop_detail: str) -> JudgementSchema:
         """
         Judge how well the shop matches the search criteria
@@ -309,7 +1262,166 @@ class SearchService:
         Returns:
             JudgementSchema: Match judgement with score and reason
         """
-        prompt = f"""以下の検索条件と店舗情報を比較して、合致度を5段階で判定してください。
+        return self.gemini_service.structured_response(
+            prompt=self._build_judgement_prompt(input_text, shop_name, shop_detail),
+            schema=JudgementSchema,
+            task="judgement"
+        )
+
+    @observe_stage("judgement")
+    async def _judge_match_async(self, input_text: str, shop_name: str, shop_detail: str) -> JudgementSchema:
+        """
+        Judge how well the shop matches the search criteria (asyncio)
+
+        Args:
+            input_text: Original search query
+            shop_name: Shop name
+            shop_detail: Shop detail search result
+
+        Returns:
+            JudgementSchema: Match judgement with score and reason
+        """
+        return await self.gemini_service.structured_response_async(
+            prompt=self._build_judgement_prompt(input_text, shop_name, shop_detail),
+            schema=JudgementSchema,
+            task="judgement"
+        )
+
+    @observe_stage("batch_judgement")
+    async def _judge_match_batch_async(
+        self,
+        input_text: str,
+        details: Dict[str, str],
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, Union[JudgementSchema, Exception]]:
+        """
+        Judge all shops in one structured call, falling back to per-shop calls
+
+        Shops whose entry is missing from the batched response or fails
+        validation are judged individually with _judge_match_async().
+
+        Args:
+            input_text: Original search query
+            details: Shop name -> shop detail search result
+            semaphore: Concurrency cap for fallback calls
+
+        Returns:
+            Dict[str, Union[JudgementSchema, Exception]]: Judgement per shop
+                name, or the exception raised by its fallback call
+        """
+        judgements: Dict[str, Union[JudgementSchema, Exception]] = {}
+        if not details:
+            return judgements
+
+        logger.info(f"[Step 5] Judging {len(details)} shops in one batched call")
+        try:
+            await self._wait_for_rate_limit_async("Step 5-batch")
+            result = await self.gemini_service.structured_response_async(
+                prompt=self._build_batch_judgement_prompt(input_text, details),
+                schema=BatchJudgementSchema,
+                task="judgement"
+            )
+            judgements.update(self._match_batch_judgements(result, list(details)))
+        except Exception as e:
+            logger.error(f"[Batch Judgement] Batched call failed: {e}")
+
+        missing = [shop_name for shop_name in details if shop_name not in judgements]
+        if not missing:
+            return judgements
+
+        logger.warning(f"[Batch Judgement] Falling back to per-shop judgement for {len(missing)} shops")
+
+        async def judge(shop_name: str) -> Union[JudgementSchema, Exception]:
+            async with semaphore:
+                try:
+                    await self._wait_for_rate_limit_async("Step 5-fallback")
+                    return await self._judge_match_async(input_text, shop_name, details[shop_name])
+                except Exception as e:
+                    return e
+
+        fallback_results = await asyncio.gather(*(judge(shop_name) for shop_name in missing))
+        judgements.update(zip(missing, fallback_results))
+
+        return judgements
+
+    def _match_batch_judgements(
+        self,
+        result: BatchJudgementSchema,
+        shop_names: List[str]
+    ) -> Dict[str, JudgementSchema]:
+        """
+        Map batched judgement entries back to requested shop names
+
+        Args:
+            result: Batched judgement response
+            shop_names: Shop names included in the batch
+
+        Returns:
+            Dict[str, JudgementSchema]: Valid judgements keyed by requested shop name
+        """
+        by_name = {normalize_shop_name(shop_name): shop_name for shop_name in shop_names}
+        matched: Dict[str, JudgementSchema] = {}
+
+        for item in result.judgements:
+            shop_name = by_name.get(normalize_shop_name(item.shop_name))
+            if shop_name is None or shop_name in matched:
+                logger.warning(f"[Batch Judgement] Unexpected entry: {item.shop_name}")
+                continue
+            try:
+                matched[shop_name] = JudgementSchema(score=item.score, reason=item.reason)
+            except ValidationError as e:
+                logger.warning(f"[Batch Judgement] Invalid entry for '{shop_name}': {e}")
+
+        logger.info(f"[Batch Judgement] Matched {len(matched)}/{len(shop_names)} shops")
+        return matched
+
+    def _build_batch_judgement_prompt(self, input_text: str, details: Dict[str, str]) -> str:
+        """
+        Build prompt for batched match judgement
+
+        Args:
+            input_text: Original search query
+            details: Shop name -> shop detail search result
+
+        Returns:
+            str: Formatted prompt
+        """
+        shop_sections = "\n\n".join(
+            f"【店舗{i}: {shop_name}】\n"
+            f"{self._compact_for_prompt(shop_detail, 'judgement', self.settings.judgement_prompt_max_tokens)}"
+            for i, (shop_name, shop_detail) in enumerate(details.items(), 1)
+        )
+
+        return f"""以下の検索条件と各店舗の情報を比較して、店舗ごとに合致度を5段階で判定してください。
+
+【検索条件】
+{input_text}
+
+{shop_sections}
+
+【判定基準】
+5: 完全に合致 - 検索条件のすべての要素を満たしている
+4: ほぼ合致も一部相違あり - 主要な条件を満たすが、一部不明または相違がある
+3: 半分程度合致 - 条件の約半分を満たす
+2: 一部合致もほぼ相違 - 一部のみ該当し、多くの条件を満たさない
+1: まったく合致しない - 検索条件とほぼ無関係
+
+すべての店舗について、店舗名(上記の表記のまま)・スコア・理由(100文字以内)で回答してください。"""
+
+    def _build_judgement_prompt(self, input_text: str, shop_name: str, shop_detail: str) -> str:
+        """
+        Build prompt for match judgement
+
+        Args:
+            input_text: Original search query
+            shop_name: Shop name
+            shop_detail: Shop detail search result
+
+        Returns:
+            str: Formatted prompt
+        """
+        shop_detail = self._compact_for_prompt(shop_detail, "judgement", self.settings.judgement_prompt_max_tokens)
+        return f"""以下の検索条件と店舗情報を比較して、合致度を5段階で判定してください。
 
 【検索条件】
 {input_text}
@@ -328,8 +1440,3 @@ class SearchService:
 1: まったく合致しない - 検索条件とほぼ無関係
 
 判定結果をスコアと理由(100文字以内)で回答してください。"""
-
-        return self.gemini_service.structured_response(
-            prompt=prompt,
-            schema=JudgementSchema
-        )
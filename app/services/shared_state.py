@@ -0,0 +1,346 @@
+"""
+Cross-worker shared state for running several server processes
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+from app.config import Settings
+from app.logger import logger
+
+
+class SharedState(ABC):
+    """
+    Base class for state shared by all worker processes
+
+    Provides the three primitives the services need to behave as one
+    process: an atomic token bucket reservation (Gemini rate limit budget),
+    a key/value store with expiry (response cache) and short-lived claims
+    (in-flight deduplication).
+
+    Every backend call blocks (SQLite waits up to its busy timeout under
+    contention, Redis makes a network round trip), so code on the event
+    loop uses the `*_async` forms, which run the call in a worker thread.
+    """
+
+    backend_name = "base"
+
+    def __init__(self):
+        # Identifies this process's claims
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @abstractmethod
+    def reserve_token(self, name: str, rate: float, capacity: int, queue: bool = True) -> float:
+        """
+        Take one token from a shared bucket
+
+        Args:
+            name: Bucket name
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+            queue: Take the token even when none is free (False: leave the
+                bucket untouched unless a token is free)
+
+        Returns:
+            float: Remaining tokens after the reservation (negative when the
+                caller must wait; tokens may go negative so waiters queue up).
+                With queue=False a negative value means nothing was taken
+        """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Look up a value (None when missing or expired)"""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        """Store a value with an expiry"""
+
+    @abstractmethod
+    def claim(self, key: str, ttl_seconds: float) -> bool:
+        """
+        Claim a key for this process
+
+        Args:
+            key: Claim key
+            ttl_seconds: Claim expiry, so a crashed worker's claims lapse
+
+        Returns:
+            bool: True if claimed, False if another process holds it
+        """
+
+    @abstractmethod
+    def claimed(self, key: str) -> bool:
+        """Whether any process currently holds a claim on the key"""
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Release this process's claim on a key"""
+
+    def size(self, prefix: str = "") -> int:
+        """Number of stored values whose key starts with `prefix` (-1 when the backend cannot tell)"""
+        return -1
+
+    async def reserve_token_async(self, name: str, rate: float, capacity: int, queue: bool = True) -> float:
+        """reserve_token() without blocking the event loop"""
+        return await asyncio.to_thread(self.reserve_token, name, rate, capacity, queue)
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """get() without blocking the event loop"""
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, value: str, ttl_seconds: float) -> None:
+        """set() without blocking the event loop"""
+        await asyncio.to_thread(self.set, key, value, ttl_seconds)
+
+    async def claim_async(self, key: str, ttl_seconds: float) -> bool:
+        """claim() without blocking the event loop"""
+        return await asyncio.to_thread(self.claim, key, ttl_seconds)
+
+    async def claimed_async(self, key: str) -> bool:
+        """claimed() without blocking the event loop"""
+        return await asyncio.to_thread(self.claimed, key)
+
+    async def release_async(self, key: str) -> None:
+        """release() without blocking the event loop"""
+        await asyncio.to_thread(self.release, key)
+
+    def close(self) -> None:
+        """Release backend resources"""
+
+
+class SQLiteSharedState(SharedState):
+    """
+    Shared state in a local SQLite database
+
+    All workers on one host open the same file; writes run in IMMEDIATE
+    transactions so reservations and claims are atomic across processes.
+    """
+
+    backend_name = "sqlite"
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the database
+
+        Args:
+            path: SQLite database file path
+        """
+        super().__init__()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS token_buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS kv (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_kv_expires ON kv(expires_at);
+            CREATE TABLE IF NOT EXISTS claims (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+
+    def _transaction(self, statements):
+        """Run statements in one IMMEDIATE transaction and return the callback result"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def reserve_token(self, name: str, rate: float, capacity: int, queue: bool = True) -> float:
+        def reserve(conn: sqlite3.Connection) -> float:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (name,)).fetchone()
+            tokens, updated_at = row if row else (float(capacity), now)
+            tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate) - 1
+            if tokens < 0 and not queue:
+                return tokens
+            conn.execute(
+                "INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (name, tokens, now)
+            )
+            return tokens
+
+        return self._transaction(reserve)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        def store(conn: sqlite3.Connection) -> None:
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl_seconds)
+            )
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+
+        self._transaction(store)
+
+    def claim(self, key: str, ttl_seconds: float) -> bool:
+        def take(conn: sqlite3.Connection) -> bool:
+            now = time.time()
+            conn.execute("DELETE FROM claims WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO claims (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self.owner, now + ttl_seconds)
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(take)
+
+    def claimed(self, key: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM claims WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row is not None
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM claims WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def size(self, prefix: str = "") -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM kv WHERE expires_at > ? AND substr(key, 1, ?) = ?",
+                (time.time(), len(prefix), prefix)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisSharedState(SharedState):
+    """
+    Shared state in Redis (or any server speaking the Redis protocol)
+
+    Needs the optional `redis` package. Token reservation and claim release
+    run as Lua scripts so they stay atomic across hosts.
+    """
+
+    backend_name = "redis"
+
+    # Refill and take one token (with ARGV[4] = 0 only if one is free);
+    # returns the remaining tokens as a string (Lua numbers would be
+    # truncated to integers in the reply)
+    _RESERVE_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate) - 1
+if tokens < 0 and ARGV[4] == '0' then
+    return tostring(tokens)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], 3600)
+return tostring(tokens)
+"""
+
+    # Delete a claim only if this process still holds it
+    _RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+    def __init__(self, url: str, prefix: str = "restaurant_search:"):
+        """
+        Connect to the server
+
+        Args:
+            url: Connection URL (e.g. redis://localhost:6379/0)
+            prefix: Key prefix for everything this app stores
+
+        Raises:
+            ImportError: If the redis package is not installed
+        """
+        super().__init__()
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("SHARED_STATE_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._reserve = self._client.register_script(self._RESERVE_SCRIPT)
+        self._release = self._client.register_script(self._RELEASE_SCRIPT)
+
+    def reserve_token(self, name: str, rate: float, capacity: int, queue: bool = True) -> float:
+        return float(self._reserve(
+            keys=[f"{self.prefix}bucket:{name}"], args=[rate, capacity, time.time(), int(queue)]
+        ))
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(f"{self.prefix}kv:{key}")
+
+    def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self._client.set(f"{self.prefix}kv:{key}", value, px=max(1, int(ttl_seconds * 1000)))
+
+    def claim(self, key: str, ttl_seconds: float) -> bool:
+        return bool(self._client.set(
+            f"{self.prefix}claim:{key}", self.owner, nx=True, px=max(1, int(ttl_seconds * 1000))
+        ))
+
+    def claimed(self, key: str) -> bool:
+        return bool(self._client.exists(f"{self.prefix}claim:{key}"))
+
+    def release(self, key: str) -> None:
+        self._release(keys=[f"{self.prefix}claim:{key}"], args=[self.owner])
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def create_shared_state(settings: Settings) -> Optional[SharedState]:
+    """
+    Create the shared state backend selected in settings
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Optional[SharedState]: Backend instance, or None when disabled
+    """
+    backend = settings.shared_state_backend.lower()
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        state = SQLiteSharedState(settings.shared_state_path)
+        logger.info(f"[Shared State] Backend: sqlite ({settings.shared_state_path})")
+    elif backend == "redis":
+        # The URL may carry credentials, so it is not logged
+        state = RedisSharedState(settings.shared_state_url)
+        logger.info("[Shared State] Backend: redis")
+    else:
+        raise ValueError(f"Unknown shared state backend: {settings.shared_state_backend}")
+    return state
@@ -0,0 +1,170 @@
+"""
+Local shop name extractor for well-formatted Grounding Search responses
+"""
+import re
+import unicodedata
+from collections import Counter
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field
+
+# Expected number of shops (the initial search prompt asks for 10)
+EXPECTED_SHOPS = 10
+MAX_NAME_LENGTH = 40
+
+# Line patterns, in order of precedence; each captures the text that holds the name
+_LINE_PATTERNS: List[Tuple[str, "re.Pattern[str]"]] = [
+    ("table", re.compile(r'^\|(.+)\|\s*$')),
+    ("heading", re.compile(r'^#{1,6}\s+(.+)$')),
+    # 1. / 1) / 1、 / (1) / [1] / 【1】 / ① (digits are NFKC-normalized first)
+    ("numbered", re.compile(r'^(?:\d{1,2}\s*[\.\)、:]|[\(\[【]\d{1,2}[\)\]】]|[①-⑳])\s*(.+)$')),
+    ("bullet", re.compile(r'^(?:[・•]\s*|[\*\-]\s+)(.+)$')),
+    ("bold", re.compile(r'^(\*\*.+?\*\*.*)$')),
+]
+
+_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_BRACKETED = re.compile(r'^【([^】]+)】')
+_NAME_SEPARATORS = re.compile(r'\s+[-–—]\s+|[:：|｜]|\s{2,}')
+_TABLE_SEPARATOR = re.compile(r'^[\s\|:\-]+$')
+_URL = re.compile(r'https?://')
+_LEADING_MARKS = re.compile(r'^[\d\.\)\-\s・•\*#]+')
+
+# Headings and labels that look like list items but are not shop names
+_NON_SHOP_WORDS = (
+    "おすすめ", "まとめ", "注意", "参考", "ポイント", "概要", "特徴", "住所", "営業時間",
+    "定休日", "アクセス", "予算", "評判", "口コミ", "参照", "出典", "店舗名", "店名", "ジャンル",
+)
+_TABLE_NAME_HEADERS = ("店舗名", "店名", "名前", "店舗")
+
+
+class ExtractionResult(BaseModel):
+    """Result of local shop name extraction"""
+    shops: List[str] = Field(default_factory=list, description="Extracted shop names (max 10)")
+    confidence: float = Field(0.0, description="Confidence that the list is complete and clean (0.0-1.0)")
+    pattern: Optional[str] = Field(None, description="Dominant line pattern the names came from")
+
+
+def extract_shop_names(text: str, limit: int = EXPECTED_SHOPS) -> ExtractionResult:
+    """
+    Extract shop names from markdown-like response text
+
+    Handles markdown bold (**店名**), numbered lists (including full-width
+    digits and bracketed numbers), bullets, headings and table rows.
+
+    Args:
+        text: Grounding Search response text
+        limit: Maximum number of names to return
+
+    Returns:
+        ExtractionResult: Names, confidence and dominant pattern
+    """
+    candidates: List[Tuple[str, int, str]] = []
+    table_column = 0
+
+    for raw_line in text.splitlines():
+        normalized = unicodedata.normalize("NFKC", raw_line).expandtabs(4)
+        line = normalized.strip()
+        if not line or _URL.search(line):
+            continue
+        indent = len(normalized) - len(normalized.lstrip())
+
+        for pattern_name, pattern in _LINE_PATTERNS:
+            match = pattern.match(line)
+            if not match:
+                continue
+
+            if pattern_name == "table":
+                if _TABLE_SEPARATOR.match(line):
+                    break
+                cells = [cell.strip() for cell in match.group(1).split("|")]
+                header_index = _find_name_column(cells)
+                if header_index is not None:
+                    # Header row: remember which column holds the name
+                    table_column = header_index
+                    break
+                body = cells[table_column] if table_column < len(cells) else cells[0]
+            else:
+                body = match.group(1)
+
+            name = _clean_name(body)
+            if name:
+                candidates.append((pattern_name, indent, name))
+            break
+
+    return _score(candidates, limit)
+
+
+def _find_name_column(cells: List[str]) -> Optional[int]:
+    """Return the index of the shop name column if this is a table header row"""
+    for index, cell in enumerate(cells):
+        if _BOLD.sub(r'\1', cell) in _TABLE_NAME_HEADERS:
+            return index
+    return None
+
+
+def _clean_name(body: str) -> Optional[str]:
+    """
+    Reduce a matched line body to a plausible shop name
+
+    Args:
+        body: Text captured by a line pattern
+
+    Returns:
+        Optional[str]: Shop name, or None if the body does not look like one
+    """
+    bold = _BOLD.search(body)
+    if bold:
+        name = bold.group(1)
+    else:
+        bracketed = _BRACKETED.match(body)
+        name = bracketed.group(1) if bracketed else body
+
+    name = _NAME_SEPARATORS.split(name, maxsplit=1)[0]
+    name = _LEADING_MARKS.sub("", name).strip(" 「」*")
+
+    if len(name) < 2 or len(name) > MAX_NAME_LENGTH or name.endswith("。"):
+        return None
+    if any(word == name or name.startswith(word) for word in _NON_SHOP_WORDS):
+        return None
+    return name
+
+
+def _score(candidates: List[Tuple[str, int, str]], limit: int) -> ExtractionResult:
+    """
+    Keep names from the dominant pattern and compute a confidence score
+
+    The dominant group is the outermost (least indented) pattern with at
+    least two items, so nested detail bullets under each shop are ignored;
+    ties go to the pattern listed first in _LINE_PATTERNS.
+
+    Args:
+        candidates: (pattern name, indent, shop name) tuples in document order
+        limit: Maximum number of names to return
+
+    Returns:
+        ExtractionResult: De-duplicated names and confidence
+    """
+    if not candidates:
+        return ExtractionResult()
+
+    group_counts = Counter((pattern_name, indent) for pattern_name, indent, _ in candidates)
+    precedence = {pattern_name: rank for rank, (pattern_name, _) in enumerate(_LINE_PATTERNS)}
+    groups = sorted(
+        group_counts,
+        key=lambda group: (group_counts[group] < 2, group[1], precedence[group[0]])
+    )
+    dominant = groups[0]
+    dominant_count = group_counts[dominant]
+
+    shops: List[str] = []
+    for pattern_name, indent, name in candidates:
+        if (pattern_name, indent) == dominant and name not in shops:
+            shops.append(name)
+
+    # Complete lists from one consistent pattern score highest
+    same_level = sum(count for (_, indent), count in group_counts.items() if indent == dominant[1])
+    coverage = min(1.0, len(shops) / limit)
+    consistency = dominant_count / same_level
+    uniqueness = len(shops) / dominant_count
+    confidence = round(coverage * (0.5 + 0.5 * consistency) * uniqueness, 3)
+
+    return ExtractionResult(shops=shops[:limit], confidence=confidence, pattern=dominant[0])
@@ -0,0 +1,169 @@
+"""
+Cross-request index of query-independent shop facts
+"""
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Optional
+from app.config import Settings
+from app.logger import logger
+
+
+def normalize_shop_name(shop_name: str) -> str:
+    """
+    Normalize a shop name for matching (NFKC, no whitespace)
+
+    Args:
+        shop_name: Shop name as written by the user or Gemini
+
+    Returns:
+        str: Normalized shop name
+    """
+    return "".join(unicodedata.normalize("NFKC", shop_name).split())
+
+
+class ShopFactIndex:
+    """
+    SQLite-backed store of grounding results about a shop itself
+
+    Entries younger than `refresh_after_seconds` are fresh; older entries are
+    still served but flagged stale so the caller can refresh them, and entries
+    older than `max_age_seconds` are treated as missing. Use ":memory:" as the
+    path for a non-persistent index.
+    """
+
+    def __init__(self, path: str, refresh_after_seconds: float, max_age_seconds: float):
+        """
+        Open (or create) the index
+
+        Args:
+            path: SQLite database file path, or ":memory:"
+            refresh_after_seconds: Age after which an entry is stale
+            max_age_seconds: Age after which an entry is no longer served
+        """
+        self.refresh_after_seconds = refresh_after_seconds
+        self.max_age_seconds = max(max_age_seconds, refresh_after_seconds)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS shop_facts (
+                name_key TEXT PRIMARY KEY,
+                shop_name TEXT NOT NULL,
+                text TEXT NOT NULL,
+                sources TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, shop_name: str) -> Optional[dict]:
+        """
+        Look up facts for a shop
+
+        Args:
+            shop_name: Shop name
+
+        Returns:
+            Optional[dict]: {"text", "sources", "fetched_at", "stale"}, or
+                None if the shop is not indexed or its entry is too old
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, sources, fetched_at FROM shop_facts WHERE name_key = ?",
+                (normalize_shop_name(shop_name),)
+            ).fetchone()
+
+            age = time.time() - row[2] if row else None
+            if row is None or age > self.max_age_seconds:
+                self.misses += 1
+                return None
+
+            stale = age > self.refresh_after_seconds
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+
+        return {
+            "text": row[0],
+            "sources": json.loads(row[1]),
+            "fetched_at": row[2],
+            "stale": stale
+        }
+
+    def put(self, shop_name: str, data: dict) -> None:
+        """
+        Store facts for a shop
+
+        Args:
+            shop_name: Shop name
+            data: Grounding Search result {"text", "sources"}
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shop_facts (name_key, shop_name, text, sources, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    normalize_shop_name(shop_name),
+                    shop_name,
+                    data["text"],
+                    json.dumps(data["sources"], ensure_ascii=False),
+                    time.time()
+                )
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """
+        Get index counters
+
+        Returns:
+            dict: size, hits, stale_hits and misses
+        """
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM shop_facts").fetchone()[0]
+            return {
+                "size": size,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses
+            }
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
+
+
+def create_shop_index(settings: Settings) -> Optional[ShopFactIndex]:
+    """
+    Create the shop fact index if enabled in settings
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Optional[ShopFactIndex]: Index instance, or None when disabled
+    """
+    if not settings.shop_index_enabled:
+        return None
+
+    logger.info(
+        f"[Shop Index] Path: {settings.shop_index_path} "
+        f"(refresh_after={settings.shop_index_refresh_after_seconds}s, "
+        f"max_age={settings.shop_index_max_age_seconds}s)"
+    )
+    return ShopFactIndex(
+        settings.shop_index_path,
+        settings.shop_index_refresh_after_seconds,
+        settings.shop_index_max_age_seconds
+    )
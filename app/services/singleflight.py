@@ -0,0 +1,85 @@
+"""
+Request coalescing (single-flight) for duplicate in-flight calls
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from app.logger import logger
+from app.metrics import SINGLE_FLIGHT_CALLS
+from app.services.concurrency_limiter import CallPriority, current_call_priority, is_background_call
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    Share one in-flight coroutine among concurrent callers with the same key
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task and receive its result or exception.
+    Cancelling one caller does not cancel the shared work. Work started under
+    background_calls() is promoted to request priority when a request joins
+    it, so the request does not wait behind other requests at prefetch priority.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize single-flight group
+
+        Args:
+            name: Group name for logging and stats
+        """
+        self.name = name
+        self.executed = 0
+        self.shared = 0
+        # key -> (shared task, priority it was started with)
+        self._inflight: Dict[str, Tuple["asyncio.Task", Optional[CallPriority]]] = {}
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run factory() once per key among concurrent callers
+
+        Args:
+            key: Deduplication key
+            factory: Creates the coroutine to run when no call is in flight
+
+        Returns:
+            Result of the shared call
+        """
+        entry = self._inflight.get(key)
+        if entry is not None:
+            task, priority = entry
+            self.shared += 1
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, result="shared")
+            logger.info(f"[Single Flight] {self.name}: joined in-flight call {key[:32]}")
+            if priority is not None and not is_background_call():
+                priority.promote()
+        else:
+            self.executed += 1
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, result="executed")
+            # The task inherits this context, and so the caller's priority
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = (task, current_call_priority())
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: "asyncio.Task") -> None:
+        """Forget a completed call and mark its exception as retrieved"""
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """
+        Get coalescing counters
+
+        Returns:
+            dict: executed, shared and in_flight counts
+        """
+        return {
+            "executed": self.executed,
+            "shared": self.shared,
+            "in_flight": len(self._inflight)
+        }
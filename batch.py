@@ -0,0 +1,101 @@
+"""
+Restaurant Search Batch CLI
+Run the full search pipeline (Steps 1-5) for a list of queries and write JSONL results
+
+Usage:
+    python batch.py queries.txt -o results.jsonl --concurrency 4 --max-shops 5
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import List
+from app.config import get_settings
+from app.logger import logger
+from app.services.batch_service import BatchRunner
+from app.services.registry import ServiceRegistry
+
+
+def read_queries(path: str) -> List[str]:
+    """
+    Read queries from a text file (one per line) or JSONL ({"input_text": ...})
+
+    Args:
+        path: Input file path, or "-" for stdin
+
+    Returns:
+        List[str]: Non-empty queries in file order
+    """
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with stream:
+        lines = [line.strip() for line in stream]
+
+    queries = []
+    for line in lines:
+        if not line:
+            continue
+        if line.startswith("{"):
+            line = json.loads(line)["input_text"]
+        queries.append(line)
+    return queries
+
+
+async def run_batch(args: argparse.Namespace) -> int:
+    """
+    Run the batch and write results
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        int: Number of failed queries
+    """
+    settings = get_settings()
+    queries = read_queries(args.input)
+    registry = ServiceRegistry(settings)
+    runner = BatchRunner(
+        registry.search_service,
+        args.concurrency or settings.batch_concurrency,
+        max_shops=args.max_shops,
+        detail=not args.no_detail
+    )
+
+    start = time.monotonic()
+    completed = failed = 0
+    try:
+        with open(args.output, "w", encoding="utf-8") as output:
+            async for result in runner.run(queries):
+                output.write(result.model_dump_json() + "\n")
+                output.flush()
+                completed += 1
+                failed += bool(result.error)
+                logger.info(f"[Batch CLI] {completed}/{len(queries)} done: {result.input_text}")
+    finally:
+        await registry.aclose()
+
+    elapsed = time.monotonic() - start
+    print(
+        f"{completed} queries ({failed} failed) in {elapsed:.1f}s "
+        f"({completed / elapsed if elapsed else 0:.2f} queries/s) -> {args.output}",
+        file=sys.stderr
+    )
+    return failed
+
+
+def main() -> None:
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description="Run restaurant searches for a list of queries")
+    parser.add_argument("input", help="Query file: one query per line or JSONL with input_text ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="JSONL output path")
+    parser.add_argument("--concurrency", type=int, help="Queries in flight (default: BATCH_CONCURRENCY)")
+    parser.add_argument("--max-shops", type=int, help="Detail-search only the first N shops per query")
+    parser.add_argument("--no-detail", action="store_true", help="Run only the initial search (Steps 1-3)")
+    args = parser.parse_args()
+
+    failed = asyncio.run(run_batch(args))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
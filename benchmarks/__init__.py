@@ -0,0 +1,3 @@
+"""
+Offline benchmark suite with a fake Gemini backend
+"""
@@ -0,0 +1,275 @@
+"""
+Offline stand-in for the Gemini API used by the benchmarks
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+from google.genai import errors, types
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures" / "gemini_responses.json"
+
+
+class LatencyModel:
+    """
+    Random latency distribution parsed from a short spec
+
+    Specs:
+        constant:S            always S seconds
+        uniform:LOW,HIGH      uniform between LOW and HIGH seconds
+        lognormal:MEDIAN,SIGMA long-tailed, median MEDIAN seconds
+    """
+
+    def __init__(self, spec: str):
+        """
+        Initialize model
+
+        Args:
+            spec: Distribution spec (see class docstring)
+
+        Raises:
+            ValueError: If the spec cannot be parsed
+        """
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        try:
+            values = [float(value) for value in params.split(",")] if params else []
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        expected = {"constant": 1, "uniform": 2, "lognormal": 2}
+        if expected.get(kind) != len(values):
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self.kind = kind
+        self.values = values
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds"""
+        if self.kind == "constant":
+            return self.values[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.values)
+        median, sigma = self.values
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+
+class FakeGeminiClient:
+    """
+    Fake genai.Client answering from recorded-style fixtures
+
+    Exposes `models.generate_content` and `aio.models.generate_content` like
+    the real client. Responses are picked deterministically from the prompt
+    so repeated prompts get the same answer (and cache/single-flight hits
+    behave as they would in production):
+
+    - initial grounding search: one of the fixture shop lists, plus the JSON
+      block when the fused prompt asks for one
+    - detail grounding search: a detail fixture with the shop name filled in
+    - structured responses: built from the requested schema (shop list,
+      per-shop judgement or batch judgement)
+
+    Latency is sleep-based, so many calls overlap in the async path exactly
+    like network waits. With `quota_concurrency` set, calls beyond that many
+    in flight are rejected with 429 like an exhausted quota.
+    """
+
+    def __init__(
+        self,
+        grounding_latency: str = "lognormal:1.5,0.4",
+        structured_latency: str = "lognormal:0.6,0.3",
+        failure_rate: float = 0.0,
+        quota_concurrency: int = 0,
+        seed: int = 0,
+        fixtures_path: Path = FIXTURES_PATH
+    ):
+        """
+        Initialize fake client
+
+        Args:
+            grounding_latency: Latency spec for grounding search calls
+            structured_latency: Latency spec for structured response calls
+            failure_rate: Probability of a call failing with a 503
+            quota_concurrency: Calls allowed in flight before 429s (0: unlimited)
+            seed: Random seed for latencies and failures
+            fixtures_path: Fixture corpus path
+        """
+        self.grounding_latency = LatencyModel(grounding_latency)
+        self.structured_latency = LatencyModel(structured_latency)
+        self.failure_rate = failure_rate
+        self.quota_concurrency = quota_concurrency
+        self.fixtures = json.loads(Path(fixtures_path).read_text(encoding="utf-8"))
+        self.calls = 0
+        self.failures = 0
+        self.rejections = 0
+        self.in_flight = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.models = _Models(self)
+        self.aio = _Aio(self)
+
+    def _plan(self, config: Optional[types.GenerateContentConfig]):
+        """
+        Count the call and draw its latency and outcome
+
+        Returns:
+            tuple: (latency in seconds, error to raise after the latency or None)
+        """
+        grounding = bool(config and config.tools)
+        latency_model = self.grounding_latency if grounding else self.structured_latency
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            if self.quota_concurrency and self.in_flight > self.quota_concurrency:
+                self.rejections += 1
+                # Quota rejections come back quickly
+                return latency_model.sample(self._rng) / 10, _quota_exceeded()
+            latency = latency_model.sample(self._rng)
+            if self._rng.random() < self.failure_rate:
+                self.failures += 1
+                return latency, _unavailable()
+        return latency, None
+
+    def _done(self) -> None:
+        """Mark a call as finished"""
+        with self._lock:
+            self.in_flight -= 1
+
+    def respond(self, prompt: str, config: Optional[types.GenerateContentConfig]) -> types.GenerateContentResponse:
+        """
+        Build the response for a prompt
+
+        Args:
+            prompt: Prompt text
+            config: Request config (tools mark grounding calls, response_schema structured ones)
+
+        Returns:
+            types.GenerateContentResponse: Response shaped like the real API's
+        """
+        if config and config.tools:
+            text, sources = self._grounding(prompt)
+        else:
+            text, sources = self._structured(prompt, config.response_schema if config else None), []
+        return _make_response(text, sources, prompt)
+
+    def _grounding(self, prompt: str):
+        """Pick a grounding search answer"""
+        if "10件リストアップ" in prompt:
+            fixture = _pick(self.fixtures["initial"], prompt)
+            text = fixture["text"]
+            if "```json" in prompt:
+                shops = json.dumps({"shops": fixture["shops"]}, ensure_ascii=False)
+                text = f"{text}\n\n```json\n{shops}\n```"
+            return text, fixture["sources"]
+
+        shop_name = _first_quoted(prompt) or "店舗"
+        fixture = _pick(self.fixtures["detail"], shop_name)
+        return fixture["text"].replace("{shop_name}", shop_name), fixture["sources"]
+
+    def _structured(self, prompt: str, schema) -> str:
+        """Build a JSON answer for the requested schema"""
+        properties = (schema or {}).get("properties", {}) if isinstance(schema, dict) else {}
+        if "shops" in properties:
+            shops: List[str] = []
+            for fixture in self.fixtures["initial"]:
+                shops += [shop for shop in fixture["shops"] if shop in prompt and shop not in shops]
+            return json.dumps({"shops": shops[:10]}, ensure_ascii=False)
+        if "judgements" in properties:
+            judgements = [
+                {"shop_name": name, **_pick(self.fixtures["judgements"], name)}
+                for name in re.findall(r"【店舗\d+: (.+?)】", prompt)
+            ]
+            return json.dumps({"judgements": judgements}, ensure_ascii=False)
+        return json.dumps(_pick(self.fixtures["judgements"], prompt), ensure_ascii=False)
+
+
+class _Models:
+    """Blocking `client.models` API"""
+
+    def __init__(self, owner: FakeGeminiClient):
+        self._owner = owner
+
+    def generate_content(self, model: str, contents: str, config: Optional[types.GenerateContentConfig] = None):
+        latency, error = self._owner._plan(config)
+        try:
+            time.sleep(latency)
+        finally:
+            self._owner._done()
+        if error:
+            raise error
+        return self._owner.respond(contents, config)
+
+
+class _AsyncModels:
+    """Async `client.aio.models` API"""
+
+    def __init__(self, owner: FakeGeminiClient):
+        self._owner = owner
+
+    async def generate_content(self, model: str, contents: str, config: Optional[types.GenerateContentConfig] = None):
+        latency, error = self._owner._plan(config)
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            self._owner._done()
+        if error:
+            raise error
+        return self._owner.respond(contents, config)
+
+
+class _Aio:
+    """Namespace mirroring `client.aio`"""
+
+    def __init__(self, owner: FakeGeminiClient):
+        self.models = _AsyncModels(owner)
+
+
+def _pick(items: list, key: str):
+    """Choose a fixture deterministically from a key"""
+    digest = hashlib.md5(key.encode("utf-8")).digest()
+    return items[digest[0] % len(items)]
+
+
+def _first_quoted(prompt: str) -> Optional[str]:
+    """First 「...」 quoted string in a prompt (the shop name in detail prompts)"""
+    match = re.search(r"「(.+?)」", prompt)
+    return match.group(1) if match else None
+
+
+def _unavailable() -> errors.ServerError:
+    """Injected transient failure"""
+    return errors.ServerError(503, {"error": {"code": 503, "message": "Injected failure", "status": "UNAVAILABLE"}})
+
+
+def _quota_exceeded() -> errors.ClientError:
+    """Injected quota rejection"""
+    return errors.ClientError(
+        429, {"error": {"code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED"}}
+    )
+
+
+def _make_response(text: str, sources: List[dict], prompt: str) -> types.GenerateContentResponse:
+    """Wrap text and sources as a GenerateContentResponse"""
+    metadata = types.GroundingMetadata(
+        grounding_chunks=[
+            types.GroundingChunk(web=types.GroundingChunkWeb(uri=source["url"], title=source.get("title")))
+            for source in sources
+        ]
+    ) if sources else None
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                grounding_metadata=metadata
+            )
+        ],
+        # Rough token estimate; real Japanese text is about one token per 1-2 chars
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=len(prompt) // 2,
+            candidates_token_count=len(text) // 2
+        )
+    )
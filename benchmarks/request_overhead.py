@@ -0,0 +1,157 @@
+"""
+Micro-benchmark of per-call request config and validation overhead
+
+Compares building the Gemini request config and validating the response
+on every call (how GeminiService worked before RequestConfigRegistry)
+against the prebuilt configs and cached validators, both in isolation
+and end to end through GeminiService with a zero-latency fake client.
+
+Usage:
+    python -m benchmarks.request_overhead
+    python -m benchmarks.request_overhead --iterations 5000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Callable, List, Optional, Type
+from google.genai import types
+from pydantic import BaseModel
+
+
+class PerCallConfigs:
+    """Builds configs and validates the way GeminiService did before the registry"""
+
+    def __init__(self, attempt_timeout: float):
+        self.attempt_timeout = attempt_timeout
+
+    @property
+    def grounding(self) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            tools=[types.Tool(google_search=types.GoogleSearch())],
+            http_options=types.HttpOptions(timeout=int(self.attempt_timeout * 1000))
+        )
+
+    def structured(self, schema: Type[BaseModel]) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=schema.model_json_schema(),
+            http_options=types.HttpOptions(timeout=int(self.attempt_timeout * 1000)),
+        )
+
+    def register(self, *schemas: Type[BaseModel]) -> None:
+        pass
+
+    def validate_json(self, schema: Type[BaseModel], text: str) -> BaseModel:
+        return schema.model_validate_json(text)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Measure per-call request config and validation overhead")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per measurement")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def per_call_us(func: Callable[[], object], iterations: int) -> float:
+    """Mean microseconds per call (after a short warm-up)"""
+    for _ in range(min(100, iterations)):
+        func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def per_call_us_async(func: Callable[[], object], iterations: int) -> float:
+    """Mean microseconds per awaited call (after a short warm-up)"""
+    for _ in range(min(100, iterations)):
+        await func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def measure(iterations: int) -> List[dict]:
+    """
+    Run every measurement with per-call configs and with the registry
+
+    Args:
+        iterations: Calls per measurement
+
+    Returns:
+        List[dict]: name, before_us, after_us per measurement
+    """
+    from app.config import get_settings
+    from app.schemas.search import BatchJudgementSchema, JudgementSchema
+    from app.services.gemini_service import GeminiService
+    from app.services.request_configs import RequestConfigRegistry
+    from benchmarks.fake_gemini import FakeGeminiClient
+
+    settings = get_settings()
+    before = PerCallConfigs(settings.gemini_call_timeout_seconds)
+    after = RequestConfigRegistry(settings.gemini_call_timeout_seconds)
+    after.register(JudgementSchema, BatchJudgementSchema)
+    judgement_json = json.dumps({"score": 4, "reason": "駅から近く、条件の多くを満たしている" * 3}, ensure_ascii=False)
+
+    rows = []
+
+    def compare(name: str, run: Callable[[object], Callable[[], object]]) -> None:
+        rows.append({
+            "name": name,
+            "before_us": round(per_call_us(run(before), iterations), 2),
+            "after_us": round(per_call_us(run(after), iterations), 2)
+        })
+
+    compare("grounding config", lambda configs: lambda: configs.grounding)
+    compare("structured config (judgement)", lambda configs: lambda: configs.structured(JudgementSchema))
+    compare("structured config (batch)", lambda configs: lambda: configs.structured(BatchJudgementSchema))
+    compare("validate judgement", lambda configs: lambda: configs.validate_json(JudgementSchema, judgement_json))
+
+    # End to end: the same service with each config source, no cache and no latency
+    fake = FakeGeminiClient(grounding_latency="constant:0", structured_latency="constant:0")
+    service = GeminiService(client=fake)
+    prompt = "「テスト店」について、以下の検索条件との合致度を判定してください。"
+
+    async def end_to_end(configs, call) -> float:
+        service.configs = configs
+        return await per_call_us_async(call, iterations)
+
+    for name, call in (
+        ("grounding_search_async", lambda: service.grounding_search_async("「テスト店」の詳細")),
+        ("structured_response_async", lambda: service.structured_response_async(prompt, JudgementSchema, "judgement")),
+    ):
+        rows.append({
+            "name": name,
+            "before_us": round(asyncio.run(end_to_end(before, call)), 2),
+            "after_us": round(asyncio.run(end_to_end(after, call)), 2)
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point"""
+    args = parse_args(argv)
+    # Reuse the load benchmark's offline defaults (fake key, quiet logs, no cache)
+    from benchmarks.run import configure_environment, parse_args as parse_run_args
+    configure_environment(parse_run_args([]))
+
+    rows = measure(args.iterations)
+    header = f"{'measurement':<30}{'before us':>12}{'after us':>12}{'saved':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        saved = 1 - row["after_us"] / row["before_us"] if row["before_us"] else 0.0
+        print(f"{row['name']:<30}{row['before_us']:>12.1f}{row['after_us']:>12.1f}{saved:>9.0%}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"iterations": args.iterations, "results": rows}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""
+Offline load benchmark for the search pipeline
+
+Drives the search service (or the HTTP API in-process) against the fake
+Gemini backend and reports throughput, latency percentiles and memory.
+
+Usage:
+    python -m benchmarks.run --scenario pipeline --requests 200 --concurrency 20
+    python -m benchmarks.run --scenario http --json results.json
+    python -m benchmarks.run --baseline results.json --max-regression 0.1
+    python -m benchmarks.run --scenario pipeline --replay recordings/gemini.jsonl --time-scale 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Awaitable, Callable, List, Optional
+
+SCENARIOS = ("initial", "detail", "pipeline", "sync", "http")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark the search pipeline against a fake Gemini backend")
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append",
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight")
+    parser.add_argument("--max-shops", type=int, default=5, help="Shops per detail search")
+    parser.add_argument("--grounding-latency", default="lognormal:0.2,0.4",
+                        help="Grounding call latency: constant:S, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--structured-latency", default="lognormal:0.05,0.3",
+                        help="Structured call latency (same format)")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Seconds between the initial and detail search in pipeline/http (user selecting shops)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of Gemini calls failing with 503")
+    parser.add_argument("--quota-concurrency", type=int, default=0,
+                        help="Fake quota: calls beyond this many in flight get 429 (0: unlimited)")
+    parser.add_argument("--repeat-queries", action="store_true",
+                        help="Reuse fixture queries verbatim (exercises caches and single-flight)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for latencies and failures")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="Serve a GEMINI_RECORD_MODE=record recording instead of the fake "
+                             "(queries are taken from the recording)")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Multiplier for recorded latencies with --replay (0: no delay)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (lower overhead)")
+    parser.add_argument("--json", dest="json_path", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Previous --json output to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.1,
+                        help="Allowed throughput drop / p95 increase vs the baseline (fraction)")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """
+    Set benchmark defaults before app settings are loaded
+
+    Explicit environment variables still win, so e.g.
+    `RESPONSE_CACHE_BACKEND=memory python -m benchmarks.run` benchmarks
+    with the cache on.
+
+    Args:
+        args: Parsed command line arguments
+    """
+    if args.replay:
+        os.environ["GEMINI_RECORD_MODE"] = "replay"
+        os.environ["GEMINI_RECORD_PATH"] = args.replay
+        os.environ["GEMINI_REPLAY_TIME_SCALE"] = str(args.time_scale)
+    defaults = {
+        "GOOGLE_API_KEY": "benchmark",
+        "LOG_LEVEL": "WARNING",
+        "LOG_FILE": os.devnull,
+        "RESPONSE_CACHE_BACKEND": "none",
+        "SHOP_INDEX_ENABLED": "false",
+        "GEMINI_REQUESTS_PER_SECOND": "0",
+        "GEMINI_MAX_RETRIES": "3",
+        "GEMINI_RETRY_BASE_DELAY": "0.01",
+        "GEMINI_RETRY_MAX_DELAY": "0.1",
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+
+
+def recorded_queries(path: str) -> List[str]:
+    """
+    Search queries found in a recording's initial search prompts
+
+    Args:
+        path: Recording file path
+
+    Returns:
+        List[str]: Unique queries in recording order
+    """
+    from app.services.recording import iter_recording
+
+    queries: List[str] = []
+    for record in iter_recording(path):
+        match = re.match(r"「(.+?)」に合う飲食店を10件リストアップ", record["prompt"])
+        if match and match.group(1) not in queries:
+            queries.append(match.group(1))
+    if not queries:
+        raise SystemExit(f"No initial search prompts found in {path}")
+    return queries
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+async def drive(
+    request: Callable[[int], Awaitable[None]],
+    total: int,
+    concurrency: int,
+    measure_memory: bool
+) -> dict:
+    """
+    Run `total` requests with `concurrency` in flight and collect timings
+
+    Args:
+        request: Coroutine function taking the request index
+        total: Number of requests
+        concurrency: Requests in flight
+        measure_memory: Track peak traced memory
+
+    Returns:
+        dict: Raw latencies, error count, wall time and peak memory
+    """
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                await request(index)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    if measure_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - start
+    peak = 0
+    if measure_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"latencies": latencies, "errors": errors, "wall": wall, "peak": peak}
+
+
+def summarize(name: str, raw: dict, calls: int, concurrency: int, tasks: Optional[dict] = None) -> dict:
+    """Turn raw timings into the reported metrics (plus per-task model usage for --json)"""
+    latencies = raw["latencies"]
+    count = len(latencies)
+    return {
+        "scenario": name,
+        "requests": count,
+        "errors": raw["errors"],
+        "concurrency": concurrency,
+        "wall_seconds": round(raw["wall"], 3),
+        "throughput_rps": round(count / raw["wall"], 2) if raw["wall"] else 0.0,
+        "latency_mean": round(statistics.fmean(latencies), 4) if latencies else 0.0,
+        "latency_p50": round(percentile(latencies, 50), 4),
+        "latency_p95": round(percentile(latencies, 95), 4),
+        "latency_p99": round(percentile(latencies, 99), 4),
+        "gemini_calls": calls,
+        "peak_memory_kb": round(raw["peak"] / 1024, 1),
+        "memory_per_request_kb": round(raw["peak"] / 1024 / max(1, min(concurrency, count)), 1),
+        "tasks": tasks or {},
+    }
+
+
+async def run_scenario(name: str, args: argparse.Namespace) -> dict:
+    """
+    Build fresh services on a fresh fake client and run one scenario
+
+    Args:
+        name: Scenario name
+        args: Parsed command line arguments
+
+    Returns:
+        dict: Scenario metrics
+    """
+    from app.services.registry import ServiceRegistry, init_services, shutdown_services
+    from app.config import get_settings
+    from benchmarks.fake_gemini import FakeGeminiClient
+
+    fake = FakeGeminiClient(
+        grounding_latency=args.grounding_latency,
+        structured_latency=args.structured_latency,
+        failure_rate=args.failure_rate,
+        quota_concurrency=args.quota_concurrency,
+        seed=args.seed
+    )
+    queries = recorded_queries(args.replay) if args.replay else fake.fixtures["queries"]
+    fixture_shops = [fixture["shops"][:args.max_shops] for fixture in fake.fixtures["initial"]]
+
+    def query(index: int) -> str:
+        base = queries[index % len(queries)]
+        # Recorded prompts only match the recorded queries verbatim
+        return base if args.repeat_queries or args.replay else f"{base} #{index}"
+
+    def gemini_calls(registry) -> int:
+        replayer = registry.gemini_service.replayer
+        return fake.calls + (replayer.served if replayer else 0)
+
+    if name == "http":
+        import httpx
+        from main import app
+
+        registry = init_services(client=fake)
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None)
+
+        async def request(index: int) -> None:
+            response = await client.post("/api/search", json={"input_text": query(index)})
+            response.raise_for_status()
+            shops = response.json()["shop_list"]["shops"][:args.max_shops]
+            await asyncio.sleep(args.think_time)
+            if shops:
+                response = await client.post(
+                    "/api/search/detail", json={"input_text": query(index), "shop_names": shops}
+                )
+                response.raise_for_status()
+
+        try:
+            raw = await drive(request, args.requests, args.concurrency, not args.no_memory)
+        finally:
+            await client.aclose()
+            calls = gemini_calls(registry)
+            tasks = registry.gemini_service.router.stats()
+            await shutdown_services()
+        return summarize(name, raw, calls, args.concurrency, tasks)
+
+    registry = ServiceRegistry(get_settings(), client=fake)
+    service = registry.search_service
+
+    async def request(index: int) -> None:
+        if name == "initial":
+            await service.initial_search_async(query(index))
+        elif name == "detail":
+            await service.detail_search_async(query(index), fixture_shops[index % len(fixture_shops)])
+        elif name == "pipeline":
+            initial = await service.initial_search_async(query(index))
+            shops = initial.shop_list.shops[:args.max_shops]
+            await asyncio.sleep(args.think_time)
+            if shops:
+                await service.detail_search_async(query(index), shops)
+        else:
+            await asyncio.to_thread(sync_pipeline, index)
+
+    def sync_pipeline(index: int) -> None:
+        initial = service.initial_search(query(index))
+        shops = initial.shop_list.shops[:args.max_shops]
+        if shops:
+            service.detail_search(query(index), shops)
+
+    try:
+        raw = await drive(request, args.requests, args.concurrency, not args.no_memory)
+    finally:
+        await registry.aclose()
+    return summarize(name, raw, gemini_calls(registry), args.concurrency, registry.gemini_service.router.stats())
+
+
+def compare(results: List[dict], baseline_path: str, max_regression: float) -> List[str]:
+    """
+    Compare results against a baseline run
+
+    Args:
+        results: Current scenario metrics
+        baseline_path: JSON file written by an earlier --json run
+        max_regression: Allowed relative throughput drop / p95 increase
+
+    Returns:
+        List[str]: One message per regression (empty when none)
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {result["scenario"]: result for result in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["scenario"])
+        if previous is None:
+            continue
+        if result["throughput_rps"] < previous["throughput_rps"] * (1 - max_regression):
+            regressions.append(
+                f"{result['scenario']}: throughput {result['throughput_rps']} rps "
+                f"< baseline {previous['throughput_rps']} rps"
+            )
+        if result["latency_p95"] > previous["latency_p95"] * (1 + max_regression):
+            regressions.append(
+                f"{result['scenario']}: p95 {result['latency_p95']}s > baseline {previous['latency_p95']}s"
+            )
+    return regressions
+
+
+def print_table(results: List[dict]) -> None:
+    """Print results as a fixed-width table"""
+    header = f"{'scenario':<10}{'reqs':>6}{'errs':>6}{'rps':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'calls':>7}{'KB/req':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['scenario']:<10}{r['requests']:>6}{r['errors']:>6}{r['throughput_rps']:>9.2f}"
+            f"{r['latency_p50']:>8.3f}{r['latency_p95']:>8.3f}{r['latency_p99']:>8.3f}"
+            f"{r['gemini_calls']:>7}{r['memory_per_request_kb']:>9.1f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point"""
+    args = parse_args(argv)
+    configure_environment(args)
+
+    results = [asyncio.run(run_scenario(name, args)) for name in (args.scenario or SCENARIOS)]
+    print_table(results)
+
+    if args.json_path:
+        config = {key: value for key, value in vars(args).items() if key not in ("json_path", "baseline")}
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "results": results}, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.max_regression)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
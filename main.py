@@ -2,13 +2,23 @@
 Restaurant Search Web Application - Main Entry Point
 FastAPI server with Google AI Grounding Search integration
 """
-from fastapi import FastAPI
+import os
+import secrets
+import sys
+from typing import Optional
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
+from app.compression import add_compression
 from app.config import get_settings, clear_settings_cache
 from app.logger import logger
-from app.routers import search
+from app.metrics import REGISTRY
+from app.routers import batch, search
+from app.services.batch_service import shutdown_batch_jobs
+from app.services.concurrency_limiter import limiter_stats
+from app.services.detail_jobs import get_detail_job_manager, shutdown_detail_jobs
+from app.services.registry import get_registry, init_services, reload_services, shutdown_services
 
 # Clear cache and reload settings from .env on startup
 clear_settings_cache()
@@ -30,8 +40,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses (gzip / brotli)
+add_compression(app, settings)
+
 # Include routers
 app.include_router(search.router)
+app.include_router(batch.router)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -39,18 +53,24 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 
 @app.on_event("startup")
 async def startup_event():
-    """Log application startup"""
+    """Log application startup and create shared services"""
     logger.info("=" * 80)
     logger.info("Restaurant Search Web Application Starting")
     logger.info(f"Gemini Model: {settings.gemini_model}")
     logger.info(f"Log Level: {settings.log_level}")
     logger.info("=" * 80)
+    init_services()
+    if settings.background_jobs_enabled:
+        get_detail_job_manager().start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Log application shutdown"""
+    """Log application shutdown and release shared services"""
     logger.info("Restaurant Search Web Application Shutting Down")
+    await shutdown_batch_jobs()
+    await shutdown_detail_jobs()
+    await shutdown_services()
 
 
 @app.get("/")
@@ -62,22 +82,89 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    registry = get_registry()
+    response_cache = registry.response_cache
     return {
         "status": "healthy",
         "service": "restaurant-search-api",
-        "model": settings.gemini_model
+        "worker_pid": os.getpid(),
+        "model": get_settings().gemini_model,
+        "response_cache": response_cache.stats() if response_cache else None,
+        "extraction_paths": dict(registry.search_service.extraction_paths),
+        "single_flight": {
+            flights.name: flights.stats()
+            for flights in (registry.search_flights, registry.gemini_flights, registry.search_service.fact_flights)
+            if flights is not None
+        },
+        "shop_index": registry.shop_index.stats() if registry.shop_index else None,
+        "detail_prefetch": registry.detail_prefetch.stats() if registry.detail_prefetch else None,
+        "shared_state": registry.shared_state.backend_name if registry.shared_state else None,
+        "circuit_breaker": registry.gemini_service.resilience.breaker.state,
+        "circuit_breakers": {
+            model: resilience.breaker.state
+            for model, resilience in registry.gemini_service.resilience_by_model.items()
+        },
+        "model_tiering": registry.gemini_service.router.stats(),
+        "concurrency": limiter_stats(),
+        "detail_jobs": get_detail_job_manager().stats()
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def require_admin(request: Request, x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency guarding /admin endpoints.
+    With ADMIN_TOKEN set the X-Admin-Token header must match it; without
+    one only requests from localhost are accepted.
+    """
+    token = get_settings().admin_token
+    if token:
+        if not x_admin_token or not secrets.compare_digest(x_admin_token, token):
+            raise HTTPException(status_code=401, detail="Invalid or missing admin token")
+        return
+    client_host = request.client.host if request.client else ""
+    if client_host not in ("127.0.0.1", "::1", "localhost"):
+        raise HTTPException(status_code=403, detail="Admin endpoints are restricted to localhost (set ADMIN_TOKEN)")
+
+
+@app.post("/admin/reload", dependencies=[Depends(require_admin)])
+async def reload_settings():
+    """Reload settings from .env and swap the shared service pool"""
+    registry = await reload_services()
+    return {
+        "status": "reloaded",
+        "model": registry.settings.gemini_model,
+        "client_pool_size": registry.client_pool.size if registry.client_pool else 0
     }
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    logger.info(f"Starting server on {settings.host}:{settings.port}")
+    # Production mode: several worker processes, no auto-reload
+    workers = max(1, settings.server_workers)
+    reload = settings.server_reload and workers == 1
+    if workers > 1 and settings.background_jobs_enabled:
+        # Job state lives in the worker that accepted the job: polling from another worker would 404
+        logger.error("SERVER_WORKERS > 1 requires BACKGROUND_JOBS_ENABLED=false (job state is per process)")
+        sys.exit(1)
+    logger.info(f"Starting server on {settings.host}:{settings.port} (workers={workers}, reload={reload})")
+    if workers > 1 and settings.shared_state_backend.lower() == "none":
+        logger.warning(
+            "SERVER_WORKERS > 1 without SHARED_STATE_BACKEND: rate limits, response cache "
+            "and in-flight deduplication are per worker"
+        )
 
     uvicorn.run(
         "main:app",
         host=settings.host,
         port=settings.port,
-        reload=True,
+        reload=reload,
+        workers=workers,
         log_level=settings.log_level.lower()
     )
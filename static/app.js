@@ -178,17 +178,16 @@ async function handleDetailSearch() {
         return;
     }
 
-    // Reset UI
+    // Reset UI; placeholders keep shops in selection order while results arrive out of order
     hideError();
-    step4Container.innerHTML = '';
-    step4Container.classList.add('hidden');
-    step5Container.classList.add('hidden');
+    prepareDetailResults(selectedShops);
     detailLoading.classList.add('active');
     detailSearchButton.disabled = true;
+    updateDetailProgress(0, selectedShops.length);
 
     try {
-        console.log('[API] Calling POST /api/search/detail');
-        const response = await fetch('/api/search/detail', {
+        console.log('[API] Calling POST /api/search/detail/stream');
+        const response = await fetch('/api/search/detail/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -206,106 +205,182 @@ async function handleDetailSearch() {
             throw new Error(errorData.detail || 'API request failed');
         }
 
-        const data = await response.json();
-        console.log('[API] Response data:', data);
-
-        // Display detail results
-        displayDetailResults(data);
+        await readEventStream(response, (event, data) => {
+            if (event === 'summary') {
+                console.log('[API] Summary received:', data.index, data.summary.shop_name);
+                renderShopDetail(data.summary, data.index);
+                renderSummaryRow(data.summary, data.index);
+                updateDetailProgress(data.completed, data.total);
+            } else if (event === 'done') {
+                console.log('[API] Stream completed:', data);
+            } else if (event === 'error') {
+                throw new Error(data.detail || 'Stream failed');
+            }
+        });
 
     } catch (error) {
         console.error('[Detail Search] Error:', error);
         showError(`個別店舗検索エラー: ${error.message}`);
     } finally {
         detailLoading.classList.remove('active');
+        detailLoadingText.textContent = '個別店舗を検索中...';
         detailSearchButton.disabled = false;
     }
 }
 
 /**
- * Display detail search results (Steps 4-5)
+ * Read a Server-Sent Events response body and dispatch each event
+ */
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    data += line.slice(5).trim();
+                }
+            });
+
+            if (data) {
+                onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+}
+
+/**
+ * Update detail search progress text
+ */
+function updateDetailProgress(completed, total) {
+    detailLoadingText.textContent = `個別店舗を検索中... (${completed}/${total})`;
+}
+
+/**
+ * Create placeholders for detail results (Steps 4-5)
  */
-function displayDetailResults(data) {
-    console.log('[Display] Rendering detail results');
+function prepareDetailResults(shopNames) {
+    console.log('[Display] Preparing detail placeholders for', shopNames.length, 'shops');
 
-    // Step 4: Individual shop details
     step4Container.innerHTML = '';
+    const tableBody = document.getElementById('summaryTableBody');
+    tableBody.innerHTML = '';
 
-    data.summaries.forEach((summary, index) => {
+    shopNames.forEach((shopName, index) => {
         const stepBox = document.createElement('div');
         stepBox.className = 'step-box';
-
-        const stepHeader = document.createElement('div');
-        stepHeader.className = 'step-header';
-        stepHeader.onclick = () => toggleCollapse(`step4-${index}-content`);
-
-        const icon = document.createElement('span');
-        icon.className = 'collapse-icon';
-        icon.id = `step4-${index}-icon`;
-        icon.textContent = '▼';
+        stepBox.id = `step4-${index}-box`;
 
         const heading = document.createElement('h3');
-        heading.textContent = `Step 4-${index + 1}: ${summary.shop_name} の詳細サーチ結果`;
+        heading.textContent = `Step 4-${index + 1}: ${shopName} を検索中...`;
 
-        stepHeader.appendChild(icon);
+        const stepHeader = document.createElement('div');
+        stepHeader.className = 'step-header';
         stepHeader.appendChild(heading);
-
-        const stepContent = document.createElement('div');
-        stepContent.className = 'step-content';
-        stepContent.id = `step4-${index}-content`;
-
-        const infoGrid = document.createElement('div');
-        infoGrid.className = 'info-grid';
-        infoGrid.innerHTML = `
-            <div class="info-label">店舗名:</div>
-            <div class="info-value">${summary.shop_name}</div>
-
-            <div class="info-label">サーチ結果:</div>
-            <div class="info-value">
-                <div class="text-box">${summary.detail_search_result}</div>
-            </div>
-
-            <div class="info-label">合致度スコア:</div>
-            <div class="info-value">
-                <span class="score-badge score-${summary.judgement.score}">${summary.judgement.score}</span>
-            </div>
-
-            <div class="info-label">判定理由:</div>
-            <div class="info-value">${summary.judgement.reason}</div>
-
-            <div class="info-label">参照元URL:</div>
-            <div class="info-value">
-                <div id="sources-${index}" class="source-list"></div>
-            </div>
-        `;
-
-        stepContent.appendChild(infoGrid);
         stepBox.appendChild(stepHeader);
-        stepBox.appendChild(stepContent);
         step4Container.appendChild(stepBox);
 
-        // Render sources (after DOM insertion)
-        renderSources(summary.sources, `sources-${index}`);
-    });
-
-    step4Container.classList.remove('hidden');
-    console.log('[Display] Step 4 rendered with', data.summaries.length, 'shops');
-
-    // Step 5: Summary table
-    const tableBody = document.getElementById('summaryTableBody');
-    tableBody.innerHTML = '';
-
-    data.summaries.forEach(summary => {
         const row = document.createElement('tr');
+        row.id = `summary-row-${index}`;
         row.innerHTML = `
-            <td>${summary.shop_name}</td>
-            <td><span class="score-badge score-${summary.judgement.score}">${summary.judgement.score}</span></td>
-            <td>${summary.judgement.reason}</td>
+            <td></td>
+            <td>...</td>
+            <td>検索中...</td>
         `;
+        row.cells[0].textContent = shopName;
         tableBody.appendChild(row);
     });
 
+    step4Container.classList.remove('hidden');
     step5Container.classList.remove('hidden');
-    console.log('[Display] Step 5 rendered with summary table');
+}
+
+/**
+ * Render one shop's detail result (Step 4)
+ */
+function renderShopDetail(summary, index) {
+    const stepBox = document.getElementById(`step4-${index}-box`);
+    stepBox.innerHTML = '';
+
+    const stepHeader = document.createElement('div');
+    stepHeader.className = 'step-header';
+    stepHeader.onclick = () => toggleCollapse(`step4-${index}-content`);
+
+    const icon = document.createElement('span');
+    icon.className = 'collapse-icon';
+    icon.id = `step4-${index}-icon`;
+    icon.textContent = '▼';
+
+    const heading = document.createElement('h3');
+    heading.textContent = `Step 4-${index + 1}: ${summary.shop_name} の詳細サーチ結果`;
+
+    stepHeader.appendChild(icon);
+    stepHeader.appendChild(heading);
+
+    const stepContent = document.createElement('div');
+    stepContent.className = 'step-content';
+    stepContent.id = `step4-${index}-content`;
+
+    const infoGrid = document.createElement('div');
+    infoGrid.className = 'info-grid';
+    infoGrid.innerHTML = `
+        <div class="info-label">店舗名:</div>
+        <div class="info-value">${summary.shop_name}</div>
+
+        <div class="info-label">サーチ結果:</div>
+        <div class="info-value">
+            <div class="text-box">${summary.detail_search_result}</div>
+        </div>
+
+        <div class="info-label">合致度スコア:</div>
+        <div class="info-value">
+            <span class="score-badge score-${summary.judgement.score}">${summary.judgement.score}</span>
+        </div>
+
+        <div class="info-label">判定理由:</div>
+        <div class="info-value">${summary.judgement.reason}</div>
+
+        <div class="info-label">参照元URL:</div>
+        <div class="info-value">
+            <div id="sources-${index}" class="source-list"></div>
+        </div>
+    `;
+
+    stepContent.appendChild(infoGrid);
+    stepBox.appendChild(stepHeader);
+    stepBox.appendChild(stepContent);
+
+    // Render sources (after DOM insertion)
+    renderSources(summary.sources, `sources-${index}`);
+    console.log('[Display] Step 4 rendered for shop', index + 1);
+}
+
+/**
+ * Render one shop's row in the summary table (Step 5)
+ */
+function renderSummaryRow(summary, index) {
+    const row = document.getElementById(`summary-row-${index}`);
+    row.innerHTML = `
+        <td>${summary.shop_name}</td>
+        <td><span class="score-badge score-${summary.judgement.score}">${summary.judgement.score}</span></td>
+        <td>${summary.judgement.reason}</td>
+    `;
 }
 
 /**
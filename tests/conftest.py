@@ -0,0 +1,15 @@
+"""
+Test defaults: offline settings loaded before any app module
+"""
+import os
+
+# Explicit environment variables still win (same as benchmarks.run)
+for key, value in {
+    "GOOGLE_API_KEY": "test",
+    "LOG_LEVEL": "WARNING",
+    "LOG_FILE": os.devnull,
+    "RESPONSE_CACHE_BACKEND": "none",
+    "SHOP_INDEX_ENABLED": "false",
+    "GEMINI_RECORD_MODE": "off",
+}.items():
+    os.environ.setdefault(key, value)
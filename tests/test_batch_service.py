@@ -0,0 +1,87 @@
+"""
+Tests for batch search jobs
+"""
+import asyncio
+import json
+from typing import List
+
+from app.config import Settings
+from app.schemas.batch import BatchSearchRequest
+from app.schemas.search import InitialSearchResponse, ShopListData
+from app.services.batch_service import BatchJobManager, BatchRunner
+from app.services.gemini_service import GeminiService
+from app.services.search_service import SearchService
+from app.services.singleflight import SingleFlight
+from benchmarks.fake_gemini import FakeGeminiClient
+
+SHOPS = ["一蘭 渋谷店", "AFURI 原宿"]
+
+
+class RecordingClient(FakeGeminiClient):
+    """Fake client that keeps every prompt it answers"""
+
+    def __init__(self):
+        super().__init__(grounding_latency="constant:0.01", structured_latency="constant:0.01")
+        self.prompts: List[str] = []
+
+    def respond(self, prompt, config):
+        self.prompts.append(prompt)
+        return super().respond(prompt, config)
+
+
+def make_service(client: FakeGeminiClient) -> SearchService:
+    # Coalesce identical in-flight calls as the registry does
+    service = SearchService(GeminiService(client=client, single_flight=SingleFlight("gemini")))
+
+    async def initial_search_async(input_text: str) -> InitialSearchResponse:
+        return InitialSearchResponse(
+            input_text=input_text,
+            prompt_used="",
+            model_name="fake",
+            raw_response="",
+            shop_list=ShopListData(shops=SHOPS)
+        )
+
+    service.initial_search_async = initial_search_async
+    return service
+
+
+def test_shops_shared_across_queries_are_fetched_once():
+    client = RecordingClient()
+    service = make_service(client)
+    runner = BatchRunner(service, concurrency=2)
+    queries = ["渋谷でラーメン", "原宿で一人で入れる店"]
+
+    async def main():
+        return [result async for result in runner.run(queries)]
+
+    results = asyncio.run(main())
+
+    assert all(result.error is None for result in results)
+    assert all(len(result.summaries) == len(SHOPS) for result in results)
+    # One query-independent facts call per shop for the whole batch...
+    facts_prompts = [prompt for prompt in client.prompts if prompt.endswith("丁寧かつ簡潔にまとめてください")]
+    assert sorted(facts_prompts) == sorted(service._build_shop_facts_prompt(shop) for shop in SHOPS)
+    # ...while each query is still judged against its own conditions
+    for query in queries:
+        assert any(query in prompt for prompt in client.prompts)
+    # Nothing went through the query-specific detail prompt
+    assert not any(service._build_shop_detail_prompt(shop, query) in client.prompts
+                   for shop in SHOPS for query in queries)
+
+
+def test_job_writes_one_line_per_query(tmp_path):
+    service = make_service(RecordingClient())
+    manager = BatchJobManager(Settings(batch_output_dir=str(tmp_path)))
+    request = BatchSearchRequest(queries=["渋谷でラーメン", "渋谷でラーメン", "原宿で一人で入れる店"])
+
+    async def main():
+        job = manager.submit(request, service)
+        await job.task
+        return job
+
+    job = asyncio.run(main())
+
+    assert job.status == "completed"
+    lines = [json.loads(line) for line in job.output_path.read_text(encoding="utf-8").splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
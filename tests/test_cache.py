@@ -0,0 +1,128 @@
+"""
+Tests for response cache keys and the cache backends
+"""
+import sqlite3
+
+from pydantic import BaseModel
+
+from app.services.cache import (
+    MemoryResponseCache,
+    SharedResponseCache,
+    SQLiteResponseCache,
+    make_cache_key,
+    normalize_prompt,
+)
+from app.services.shared_state import SQLiteSharedState
+
+
+class ShopSchema(BaseModel):
+    name: str
+
+
+class OtherSchema(BaseModel):
+    name: str
+    score: int
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  渋谷　ラーメン\n\tおすすめ  ") == "渋谷 ラーメン おすすめ"
+    # NFKC folds full-width ASCII and digits
+    assert normalize_prompt("ＡＦＵＲＩ　１０店") == "AFURI 10店"
+
+
+def test_key_ignores_whitespace_and_width():
+    key = make_cache_key("grounding", "gemini-2.5-flash", "渋谷 ラーメン １０店")
+
+    assert make_cache_key("grounding", "gemini-2.5-flash", "渋谷　ラーメン\n10店 ") == key
+    assert len(key) == 64
+
+
+def test_key_separates_kind_model_and_prompt():
+    key = make_cache_key("grounding", "gemini-2.5-flash", "渋谷 ラーメン")
+
+    assert make_cache_key("structured", "gemini-2.5-flash", "渋谷 ラーメン") != key
+    assert make_cache_key("grounding", "gemini-2.5-pro", "渋谷 ラーメン") != key
+    assert make_cache_key("grounding", "gemini-2.5-flash", "渋谷 つけ麺") != key
+
+
+def test_key_includes_schema():
+    plain = make_cache_key("structured", "gemini-2.5-flash", "prompt")
+    shop = make_cache_key("structured", "gemini-2.5-flash", "prompt", ShopSchema)
+
+    assert shop != plain
+    assert make_cache_key("structured", "gemini-2.5-flash", "prompt", OtherSchema) != shop
+    assert make_cache_key("structured", "gemini-2.5-flash", "prompt", ShopSchema) == shop
+
+
+def test_memory_cache_lru_eviction():
+    cache = MemoryResponseCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_memory_cache_expiry():
+    cache = MemoryResponseCache(ttl_seconds=0, max_entries=10)
+    cache.set("a", "1")
+
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_sqlite_cache_reads_do_not_commit(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = SQLiteResponseCache(ttl_seconds=60, max_entries=10, path=path)
+    cache.set("a", "1")
+    changes = cache._conn.total_changes
+    for _ in range(10):
+        assert cache.get("a") == "1"
+
+    assert cache._conn.total_changes == changes
+    assert not cache._conn.in_transaction
+    cache.close()
+
+
+def test_sqlite_cache_evicts_least_recently_read(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    cache = SQLiteResponseCache(ttl_seconds=60, max_entries=2, path=path)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    # The read of "a" is recorded with the next store, before eviction
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    cache.close()
+
+    # Pending access times are written on close
+    rows = dict(sqlite3.connect(path).execute("SELECT key, accessed_at FROM responses").fetchall())
+    assert rows["a"] >= rows["c"]
+
+
+def test_sqlite_cache_expiry(tmp_path):
+    cache = SQLiteResponseCache(ttl_seconds=0, max_entries=10, path=str(tmp_path / "responses.sqlite3"))
+    cache.set("a", "1")
+
+    assert cache.get("a") is None
+    cache.close()
+
+
+def test_shared_cache_counts_only_responses(tmp_path):
+    state = SQLiteSharedState(str(tmp_path / "shared.sqlite3"))
+    cache = SharedResponseCache(ttl_seconds=60, max_entries=10, state=state)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    state.set("other:value", "x", 60)
+
+    assert cache.get("a") == "1"
+    assert cache.stats()["size"] == 2
+    assert state.size() == 3
+    state.close()
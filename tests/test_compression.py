@@ -0,0 +1,67 @@
+"""
+Tests for response compression
+"""
+import asyncio
+
+import httpx
+
+from app import compression
+from app.compression import choose_encoding
+from app.routers.search import get_search_service
+from app.services.gemini_service import GeminiService
+from app.services.search_service import SearchService
+from benchmarks.fake_gemini import FakeGeminiClient
+from main import app
+
+REQUEST = {"input_text": "渋谷でラーメン", "shop_names": ["一蘭 渋谷店", "AFURI 恵比寿", "麺屋武蔵 青山"]}
+
+
+def post(path: str, accept_encoding: str) -> httpx.Response:
+    client = FakeGeminiClient(grounding_latency="constant:0.01", structured_latency="constant:0.01")
+    service = SearchService(GeminiService(client=client))
+    app.dependency_overrides[get_search_service] = lambda: service
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.post(path, json=REQUEST, headers={"Accept-Encoding": accept_encoding})
+
+    try:
+        return asyncio.run(main())
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_json_response_is_gzipped():
+    response = post("/api/search/detail", "gzip")
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert [summary["shop_name"] for summary in response.json()["summaries"]] == REQUEST["shop_names"]
+
+
+def test_uncompressed_without_accept_encoding():
+    response = post("/api/search/detail", "identity")
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_event_stream_is_not_compressed():
+    response = post("/api/search/detail/stream", "gzip, br")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in response.headers
+    assert response.text.count("event: summary") == len(REQUEST["shop_names"])
+
+
+def test_choose_encoding(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("gzip, deflate, br") == "gzip"
+    assert choose_encoding("br;q=1.0, gzip;q=0") is None
+    assert choose_encoding("*") == "gzip"
+    assert choose_encoding("") is None
+
+    monkeypatch.setattr(compression, "brotli", object())
+    assert choose_encoding("gzip, br;q=0.5") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
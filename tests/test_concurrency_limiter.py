@@ -0,0 +1,172 @@
+"""
+Tests for the AIMD adaptive concurrency limiter
+"""
+import asyncio
+
+import pytest
+from google.genai import errors as genai_errors
+
+from app.services.concurrency_limiter import AdaptiveConcurrencyLimiter, background_calls
+
+
+def api_error(code: int) -> genai_errors.APIError:
+    error_class = genai_errors.ServerError if code >= 500 else genai_errors.ClientError
+    return error_class(code, {"error": {"code": code, "message": "test", "status": "TEST"}})
+
+
+def make_limiter(initial: int = 4, min_limit: int = 1, max_limit: int = 8) -> AdaptiveConcurrencyLimiter:
+    return AdaptiveConcurrencyLimiter("test", initial, min_limit, max_limit)
+
+
+def fill(limiter: AdaptiveConcurrencyLimiter) -> None:
+    for _ in range(limiter.capacity):
+        limiter.acquire()
+
+
+def test_additive_increase_when_saturated():
+    limiter = make_limiter(initial=2)
+    fill(limiter)
+    limiter.release(0.1)
+
+    assert limiter.limit == pytest.approx(2.5)
+    assert limiter.in_flight == 1
+
+
+def test_no_increase_below_the_limit():
+    limiter = make_limiter(initial=4)
+    limiter.acquire()
+    limiter.release(0.1)
+
+    assert limiter.limit == 4
+
+
+def test_no_increase_for_slow_calls():
+    limiter = make_limiter(initial=2)
+    fill(limiter)
+    limiter.release(0.1)
+    limiter.acquire()
+    # Far beyond latency_tolerance x the 0.1s average
+    limiter.release(1.0)
+
+    assert limiter.limit == pytest.approx(2.5)
+
+
+def test_increase_stops_at_max():
+    limiter = make_limiter(initial=2, max_limit=2)
+    fill(limiter)
+    limiter.release(0.1)
+
+    assert limiter.limit == 2
+
+
+def test_multiplicative_decrease_on_rate_limit():
+    limiter = make_limiter(initial=8)
+    limiter.acquire()
+    limiter.release(0.1, api_error(429))
+
+    assert limiter.limit == 4
+
+
+def test_decrease_once_per_window():
+    limiter = make_limiter(initial=8)
+    for _ in range(3):
+        limiter.acquire()
+    for _ in range(3):
+        limiter.release(0.1, api_error(503))
+
+    assert limiter.limit == 4
+
+
+def test_decrease_stops_at_min():
+    limiter = make_limiter(initial=2, min_limit=2)
+    limiter.acquire()
+    limiter.release(0.1, api_error(429))
+
+    assert limiter.limit == 2
+
+
+def test_other_errors_leave_limit_unchanged():
+    limiter = make_limiter(initial=4)
+    limiter.acquire()
+    limiter.release(0.1, api_error(400))
+    limiter.acquire()
+    limiter.release(0.1, ValueError("bad response"))
+
+    assert limiter.limit == 4
+
+
+def test_waiters_are_admitted_in_order():
+    limiter = make_limiter(initial=1, max_limit=1)
+    order = []
+
+    async def call(name: str):
+        async with limiter.slot_async():
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(call(name) for name in "abc"))
+
+    asyncio.run(main())
+
+    assert order == ["a", "b", "c"]
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    limiter = make_limiter(initial=1, max_limit=1)
+
+    async def main():
+        limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire_async())
+        await asyncio.sleep(0)
+        assert limiter.stats()["waiting"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release(0.1)
+
+    asyncio.run(main())
+
+    assert limiter.stats()["waiting"] == 0
+    assert limiter.in_flight == 0
+
+
+def test_background_calls_wait_behind_requests():
+    limiter = make_limiter(initial=1, max_limit=1)
+    order = []
+
+    async def call(name: str, background: bool = False):
+        if background:
+            with background_calls():
+                await limiter.acquire_async()
+        else:
+            await limiter.acquire_async()
+        order.append(name)
+        limiter.release(0.01)
+
+    async def main():
+        limiter.acquire()
+        tasks = [
+            asyncio.create_task(call("prefetch", background=True)),
+            asyncio.create_task(call("request"))
+        ]
+        await asyncio.sleep(0)
+        assert limiter.stats()["waiting"] == 2
+        limiter.release(0.01)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+
+    assert order == ["request", "prefetch"]
+
+
+def test_background_calls_use_idle_slots():
+    limiter = make_limiter(initial=2)
+
+    async def main():
+        with background_calls():
+            await limiter.acquire_async()
+        return limiter.in_flight
+
+    assert asyncio.run(main()) == 1
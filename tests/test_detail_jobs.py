@@ -0,0 +1,95 @@
+"""
+Tests for background detail search jobs
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import get_settings
+from app.schemas.search import ShopDetailRequest
+from app.services import detail_jobs
+from app.services.detail_jobs import DetailJob, DetailJobManager
+from app.services.gemini_service import GeminiService
+from app.services.search_service import SearchService
+from benchmarks.fake_gemini import FakeGeminiClient
+
+QUERY = "渋谷でラーメン"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeGeminiClient(grounding_latency="constant:0.2", structured_latency="constant:0.01")
+    service = SearchService(GeminiService(client=client))
+    monkeypatch.setattr(detail_jobs, "get_registry", lambda: SimpleNamespace(search_service=service))
+    return client
+
+
+def make_manager(**settings) -> DetailJobManager:
+    return DetailJobManager(get_settings().model_copy(update={"detail_job_queue_backend": "memory", **settings}))
+
+
+def test_job_runs_to_completion(client):
+    manager = make_manager()
+
+    async def main():
+        job = await manager.submit(ShopDetailRequest(input_text=QUERY, shop_names=["一蘭 渋谷店", "AFURI 恵比寿"]))
+        while not job.finished:
+            await asyncio.sleep(0.05)
+        await manager.aclose()
+        return job
+
+    job = asyncio.run(main())
+
+    assert job.status == "completed"
+    status = job.to_status()
+    assert status.completed == status.total == 2
+    assert [summary.shop_name for summary in status.summaries] == ["一蘭 渋谷店", "AFURI 恵比寿"]
+
+
+def test_cancel_running_and_queued_jobs(client):
+    manager = make_manager(detail_job_workers=1)
+
+    async def main():
+        running = await manager.submit(ShopDetailRequest(input_text=QUERY, shop_names=["一蘭 渋谷店"]))
+        queued = await manager.submit(ShopDetailRequest(input_text=QUERY, shop_names=["AFURI 恵比寿"]))
+        await asyncio.sleep(0.05)
+        assert (running.status, queued.status) == ("running", "queued")
+
+        manager.cancel(queued.id)
+        manager.cancel(running.id)
+        # Give the worker time to dequeue the cancelled job
+        await asyncio.sleep(0.3)
+        await manager.aclose()
+        return running, queued
+
+    running, queued = asyncio.run(main())
+
+    assert (running.status, queued.status) == ("cancelled", "cancelled")
+    assert queued.task is None and queued.started_at is None
+    # Only the running job's Grounding Search ever reached Gemini
+    assert client.calls == 1
+
+
+def test_cancel_unknown_or_finished_job():
+    manager = make_manager()
+    job = DetailJob(QUERY, ["一蘭 渋谷店"])
+    job.finish("completed")
+    manager.jobs[job.id] = job
+
+    assert manager.cancel("missing") is None
+    assert manager.cancel(job.id).status == "completed"
+
+
+def test_prune_drops_oldest_finished_jobs():
+    manager = make_manager(detail_job_max_jobs=3)
+    jobs = [DetailJob(QUERY, ["一蘭 渋谷店"]) for _ in range(4)]
+    for job in jobs:
+        manager.jobs[job.id] = job
+    for job in (jobs[0], jobs[2], jobs[3]):
+        job.finish("completed")
+
+    manager._prune()
+
+    # Room is made for one new job; the unfinished job is never dropped
+    assert list(manager.jobs) == [jobs[1].id, jobs[3].id]
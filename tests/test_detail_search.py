@@ -0,0 +1,215 @@
+"""
+Tests for the detail search pipeline
+"""
+import asyncio
+import json
+import time
+from typing import List, Tuple
+
+from app.schemas.search import BatchJudgementSchema, ShopJudgementItem
+from app.services.gemini_service import GeminiService
+from app.services.search_service import SearchService
+from benchmarks.fake_gemini import FakeGeminiClient
+
+QUERY = "渋谷でラーメン"
+SHOPS = ["一蘭 渋谷店", "AFURI 恵比寿", "麺屋武蔵 青山", "天下一品 渋谷店"]
+
+
+class RecordingClient(FakeGeminiClient):
+    """Fake client that keeps every grounding and structured prompt it answers"""
+
+    def __init__(self, **latencies):
+        super().__init__(**latencies)
+        self.grounding_prompts: List[str] = []
+        self.structured_prompts: List[str] = []
+
+    def respond(self, prompt, config):
+        (self.grounding_prompts if config and config.tools else self.structured_prompts).append(prompt)
+        return super().respond(prompt, config)
+
+
+def make_service(
+    grounding: str = "constant:0.05",
+    structured: str = "constant:0.01",
+    **settings
+) -> Tuple[SearchService, RecordingClient]:
+    client = RecordingClient(grounding_latency=grounding, structured_latency=structured)
+    service = SearchService(GeminiService(client=client))
+    service.settings = service.settings.model_copy(update=settings)
+    return service, client
+
+
+def test_sync_shops_run_concurrently_in_request_order():
+    service, client = make_service(grounding="constant:0.1")
+
+    start = time.monotonic()
+    response = service.detail_search(QUERY, SHOPS)
+    elapsed = time.monotonic() - start
+
+    assert [summary.shop_name for summary in response.summaries] == SHOPS
+    assert all(summary.status == "completed" for summary in response.summaries)
+    assert len(client.grounding_prompts) == len(client.structured_prompts) == len(SHOPS)
+    # One shop chain takes ~0.11s; run one after another they would take ~0.44s
+    assert elapsed < 0.3
+
+
+def test_sync_deadline_abandons_running_and_queued_shops():
+    service, client = make_service(grounding="constant:0.2", detail_search_concurrency=1)
+
+    start = time.monotonic()
+    response = service.detail_search(QUERY, SHOPS, deadline=0.05)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.15
+    assert response.timed_out == SHOPS
+    assert all(summary.status == "timed_out" for summary in response.summaries)
+    # The running shop finishes in its worker thread; the queued ones never start
+    time.sleep(0.5)
+    assert len(client.grounding_prompts) == 1
+
+
+def test_async_path_matches_sync_path():
+    service, _ = make_service()
+
+    async def main():
+        initial = await service.initial_search_async(QUERY)
+        detail = await service.detail_search_async(QUERY, initial.shop_list.shops[:3])
+        return initial, detail
+
+    initial, detail = asyncio.run(main())
+
+    assert initial.shop_list == service.initial_search(QUERY).shop_list
+    assert detail.summaries == service.detail_search(QUERY, initial.shop_list.shops[:3]).summaries
+    assert len(detail.summaries) == 3
+
+
+def test_batch_entries_are_matched_by_normalized_name():
+    service, _ = make_service()
+    result = BatchJudgementSchema(judgements=[
+        ShopJudgementItem(shop_name="一蘭　渋谷店", score=5, reason="合致"),
+        ShopJudgementItem(shop_name="ＡＦＵＲＩ 恵比寿", score=9, reason="範囲外のスコア"),
+        ShopJudgementItem(shop_name="リストにない店", score=3, reason="対象外"),
+        ShopJudgementItem(shop_name="一蘭 渋谷店", score=1, reason="重複"),
+    ])
+
+    matched = service._match_batch_judgements(result, SHOPS[:2])
+
+    assert list(matched) == ["一蘭 渋谷店"]
+    assert (matched["一蘭 渋谷店"].score, matched["一蘭 渋谷店"].reason) == (5, "合致")
+
+
+class DroppingClient(RecordingClient):
+    """Leaves one shop out of every batched judgement response"""
+
+    def __init__(self, dropped: str, **latencies):
+        super().__init__(**latencies)
+        self.dropped = dropped
+
+    def _structured(self, prompt, schema):
+        text = super()._structured(prompt, schema)
+        data = json.loads(text)
+        if "judgements" in data:
+            data["judgements"] = [item for item in data["judgements"] if item["shop_name"] != self.dropped]
+        return json.dumps(data, ensure_ascii=False)
+
+
+def test_batch_judgement_falls_back_per_shop():
+    client = DroppingClient(SHOPS[1], grounding_latency="constant:0.01", structured_latency="constant:0.01")
+    service = SearchService(GeminiService(client=client))
+    service.settings = service.settings.model_copy(update={"batch_judgement": True})
+
+    response = asyncio.run(service.detail_search_async(QUERY, SHOPS))
+
+    assert [summary.shop_name for summary in response.summaries] == SHOPS
+    assert all(summary.status == "completed" for summary in response.summaries)
+    batched = [prompt for prompt in client.structured_prompts if "【店舗1: " in prompt]
+    single = [prompt for prompt in client.structured_prompts if prompt not in batched]
+    assert len(batched) == 1
+    # Only the shop missing from the batched response is judged on its own
+    assert len(single) == 1 and SHOPS[1] in single[0]
+
+
+def slow_down(service: SearchService, shop_name: str, delay: float) -> None:
+    """Make the Grounding Search for one shop take `delay` seconds"""
+    search = service._shop_detail_search
+    search_async = service._shop_detail_search_async
+
+    def slow_search(name, input_text):
+        if name == shop_name:
+            time.sleep(delay)
+        return search(name, input_text)
+
+    async def slow_search_async(name, input_text):
+        if name == shop_name:
+            await asyncio.sleep(delay)
+        return await search_async(name, input_text)
+
+    service._shop_detail_search = slow_search
+    service._shop_detail_search_async = slow_search_async
+
+
+def test_sync_deadline_keeps_finished_shops():
+    service, _ = make_service()
+    slow_down(service, SHOPS[2], 1.0)
+
+    response = service.detail_search(QUERY, SHOPS, deadline=0.3)
+
+    assert response.timed_out == [SHOPS[2]]
+    assert [summary.status for summary in response.summaries] == ["completed", "completed", "timed_out", "completed"]
+
+
+def test_async_deadline_keeps_finished_shops():
+    service, _ = make_service()
+    slow_down(service, SHOPS[2], 5.0)
+
+    start = time.monotonic()
+    response = asyncio.run(service.detail_search_async(QUERY, SHOPS, deadline=0.3))
+
+    assert time.monotonic() - start < 1.0
+    assert response.timed_out == [SHOPS[2]]
+    assert [summary.shop_name for summary in response.summaries] == SHOPS
+    assert [summary.status for summary in response.summaries] == ["completed", "completed", "timed_out", "completed"]
+
+
+def test_batched_deadline_keeps_judged_shops():
+    service, client = make_service(batch_judgement=True)
+    slow_down(service, SHOPS[0], 5.0)
+
+    start = time.monotonic()
+    response = asyncio.run(service.detail_search_async(QUERY, SHOPS, deadline=0.45))
+
+    assert time.monotonic() - start < 1.0
+    assert response.timed_out == [SHOPS[0]]
+    assert [summary.status for summary in response.summaries] == ["timed_out", "completed", "completed", "completed"]
+    # The timed-out shop is left out of the single judgement call
+    assert len(client.structured_prompts) == 1
+    assert SHOPS[0] not in client.structured_prompts[0]
+
+
+def test_wait_until_cancels_pending_tasks():
+    service, _ = make_service()
+
+    async def main():
+        fast = asyncio.create_task(asyncio.sleep(0.01))
+        slow = asyncio.create_task(asyncio.sleep(5))
+        done = await service._wait_until([fast, slow], time.monotonic() + 0.1)
+        await asyncio.sleep(0)
+        return fast, slow, done
+
+    fast, slow, done = asyncio.run(main())
+
+    assert done == {fast}
+    assert slow.cancelled()
+
+
+def test_wait_until_without_deadline_waits_for_all():
+    service, _ = make_service()
+
+    async def main():
+        tasks = [asyncio.create_task(asyncio.sleep(delay)) for delay in (0.01, 0.05)]
+        return tasks, await service._wait_until(tasks, None)
+
+    tasks, done = asyncio.run(main())
+
+    assert done == set(tasks)
+    assert asyncio.run(service._wait_until([], None)) == set()
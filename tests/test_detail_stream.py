@@ -0,0 +1,90 @@
+"""
+Tests for the streaming detail search
+"""
+import asyncio
+import json
+
+import httpx
+
+from app.routers.search import get_search_service
+from app.services.gemini_service import GeminiService
+from app.services.search_service import SearchService
+from benchmarks.fake_gemini import FakeGeminiClient
+from main import app
+
+QUERY = "渋谷でラーメン"
+SHOPS = ["一蘭 渋谷店", "AFURI 恵比寿", "麺屋武蔵 青山"]
+
+
+def make_service(slow_shop: str, delay: float) -> SearchService:
+    """Search service whose detail search for `slow_shop` takes `delay` seconds longer"""
+    client = FakeGeminiClient(grounding_latency="constant:0.01", structured_latency="constant:0.01")
+    service = SearchService(GeminiService(client=client))
+    search = service._shop_detail_search_async
+
+    async def shop_detail_search_async(shop_name: str, input_text: str) -> dict:
+        if shop_name == slow_shop:
+            await asyncio.sleep(delay)
+        return await search(shop_name, input_text)
+
+    service._shop_detail_search_async = shop_detail_search_async
+    return service
+
+
+def test_summaries_are_yielded_in_completion_order_with_request_index():
+    service = make_service(SHOPS[0], 0.1)
+
+    async def main():
+        return [item async for item in service.detail_search_stream(QUERY, SHOPS)]
+
+    results = asyncio.run(main())
+
+    assert results[-1][0] == 0
+    assert sorted(index for index, _ in results) == [0, 1, 2]
+    assert all(summary.shop_name == SHOPS[index] for index, summary in results)
+    assert all(summary.status == "completed" for _, summary in results)
+
+
+def test_shops_running_at_the_deadline_are_sent_last_as_timed_out():
+    service = make_service(SHOPS[1], 1.0)
+
+    async def main():
+        return [item async for item in service.detail_search_stream(QUERY, SHOPS, deadline=0.2)]
+
+    results = asyncio.run(main())
+
+    assert results[-1][0] == 1
+    assert results[-1][1].status == "timed_out"
+    assert [summary.status for _, summary in results[:-1]] == ["completed", "completed"]
+
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_endpoint_streams_summary_events_then_done():
+    service = make_service(SHOPS[0], 0.1)
+    app.dependency_overrides[get_search_service] = lambda: service
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/search/detail/stream", json={"input_text": QUERY, "shop_names": SHOPS})
+
+    try:
+        response = asyncio.run(main())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["summary"] * 3 + ["done"]
+    summaries = [data for event, data in events if event == "summary"]
+    assert [data["completed"] for data in summaries] == [1, 2, 3]
+    assert summaries[-1]["index"] == 0
+    assert all(data["summary"]["shop_name"] == SHOPS[data["index"]] for data in summaries)
+    assert events[-1][1]["completed"] == 3 and events[-1][1]["timed_out"] == []
@@ -0,0 +1,64 @@
+"""
+Tests for the initial search extraction modes
+"""
+import asyncio
+import re
+from typing import Tuple
+
+import pytest
+
+from app.services.gemini_service import GeminiService
+from app.services.search_service import SearchService
+from benchmarks.fake_gemini import FakeGeminiClient
+
+QUERY = "渋谷駅周辺でラーメンが美味しい店"
+
+
+class NoJsonBlockClient(FakeGeminiClient):
+    """Ignores the fused prompt's request for a trailing JSON block"""
+
+    def _grounding(self, prompt):
+        return super()._grounding(prompt.replace("```json", ""))
+
+
+def make_service(mode: str, client: FakeGeminiClient = None) -> Tuple[SearchService, FakeGeminiClient]:
+    client = client or FakeGeminiClient(grounding_latency="constant:0.01", structured_latency="constant:0.01")
+    service = SearchService(GeminiService(client=client))
+    service.settings = service.settings.model_copy(update={"initial_search_mode": mode})
+    return service, client
+
+
+@pytest.mark.parametrize("mode, path, calls", [("fused", "fused", 1), ("local_first", "local", 1), ("two_pass", "llm", 2)])
+def test_extraction_path_per_mode(mode, path, calls):
+    service, client = make_service(mode)
+
+    response = asyncio.run(service.initial_search_async(QUERY))
+
+    assert response.shop_list.shops
+    assert dict(service.extraction_paths) == {path: 1}
+    assert client.calls == calls
+    assert ("```json" in response.prompt_used) is (mode == "fused")
+
+
+def test_fused_without_json_block_falls_back_to_local_extraction():
+    client = NoJsonBlockClient(grounding_latency="constant:0.01", structured_latency="constant:0.01")
+    service, _ = make_service("fused", client)
+
+    response = asyncio.run(service.initial_search_async(QUERY))
+
+    assert response.shop_list.shops
+    assert dict(service.extraction_paths) == {"local": 1}
+    assert client.calls == 1
+
+
+def test_fused_shop_list_uses_the_last_valid_block():
+    service, _ = make_service("fused")
+    text = (
+        "1. 一蘭 渋谷店\n"
+        '```json\n{"shops": ["例"]}\n```\n'
+        '```json\n{"shops": ["一蘭 渋谷店", "AFURI 恵比寿"]}\n```'
+    )
+
+    assert service._parse_fused_shop_list(text) == ["一蘭 渋谷店", "AFURI 恵比寿"]
+    assert service._parse_fused_shop_list(re.sub(r"\]\}", "]", text)) == []
+    assert service._parse_fused_shop_list("1. 一蘭 渋谷店") == []
@@ -0,0 +1,99 @@
+"""
+Tests for per-task model routing and escalation
+"""
+import pytest
+from pydantic import ValidationError
+
+from app.config import get_settings
+from app.schemas.search import ShopListSchema
+from app.services import gemini_service
+from app.services.gemini_service import GeminiService
+from app.services.model_router import ModelRouter
+from benchmarks.fake_gemini import FakeGeminiClient
+
+LITE = "gemini-lite-test"
+
+
+def tiered_settings(**overrides):
+    return get_settings().model_copy(update={
+        "gemini_model": "gemini-full-test",
+        "gemini_grounding_model": "",
+        "gemini_extraction_model": LITE,
+        "gemini_judgement_model": LITE,
+        "gemini_model_prices": {LITE: {"input": 0.1, "output": 0.4}},
+        **overrides
+    })
+
+
+class TieredClient(FakeGeminiClient):
+    """Fake client that records the model of each call and answers garbage on one of them"""
+
+    def __init__(self, broken_model: str):
+        super().__init__(grounding_latency="constant:0.001", structured_latency="constant:0.001")
+        self.broken_model = broken_model
+        self.models_used = []
+        generate_content = self.models.generate_content
+
+        def recording_generate_content(model, contents, config=None):
+            self.models_used.append(model)
+            response = generate_content(model, contents, config)
+            if model == self.broken_model:
+                response.candidates[0].content.parts[0].text = '{"shops": '
+            return response
+
+        self.models.generate_content = recording_generate_content
+
+
+def make_gemini(monkeypatch, **overrides):
+    settings = tiered_settings(**overrides)
+    monkeypatch.setattr(gemini_service, "get_settings", lambda: settings)
+    client = TieredClient(LITE)
+    return GeminiService(client=client), client
+
+
+def test_tasks_fall_back_to_default_model():
+    router = ModelRouter(tiered_settings())
+
+    assert router.model_for("grounding") == "gemini-full-test"
+    assert router.model_for("extraction") == router.model_for("judgement") == LITE
+    assert router.model_for("structured") == "gemini-full-test"
+
+
+def test_escalation_only_from_lighter_models():
+    assert ModelRouter(tiered_settings()).escalation_for(LITE) == "gemini-full-test"
+    assert ModelRouter(tiered_settings()).escalation_for("gemini-full-test") is None
+    assert ModelRouter(tiered_settings(gemini_escalation_enabled=False)).escalation_for(LITE) is None
+
+
+def test_usage_and_cost_per_task_and_model():
+    router = ModelRouter(tiered_settings())
+    response = FakeGeminiClient().respond("x" * 2000, None)
+
+    router.record("extraction", LITE, 0.2, response)
+    router.record("extraction", LITE, 0.4)
+
+    usage = router.stats()["extraction"]["usage"][LITE]
+    assert (usage["calls"], usage["errors"], usage["latency_mean"]) == (2, 1, 0.3)
+    assert usage["prompt_tokens"] == 1000
+    assert usage["cost_usd"] == round(router.cost(LITE, 1000, usage["response_tokens"]), 6)
+    assert router.cost("gemini-full-test", 1000, 1000) == 0.0
+
+
+def test_failed_validation_escalates_to_default_model(monkeypatch):
+    gemini, client = make_gemini(monkeypatch)
+
+    result = gemini.structured_response("一蘭 渋谷店の店舗名を抽出", ShopListSchema, task="extraction")
+
+    assert isinstance(result, ShopListSchema)
+    assert client.models_used == [LITE, "gemini-full-test"]
+    stats = gemini.router.stats()["extraction"]["usage"]
+    assert stats[LITE]["escalations"] == 1
+    assert stats["gemini-full-test"]["calls"] == 1
+
+
+def test_failed_validation_raises_without_escalation(monkeypatch):
+    gemini, client = make_gemini(monkeypatch, gemini_escalation_enabled=False)
+
+    with pytest.raises(ValidationError):
+        gemini.structured_response("一蘭 渋谷店の店舗名を抽出", ShopListSchema, task="extraction")
+    assert client.models_used == [LITE]
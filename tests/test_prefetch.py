@@ -0,0 +1,55 @@
+"""
+Tests for the detail prefetch store
+"""
+import asyncio
+
+from app.services.concurrency_limiter import CallPriority
+from app.services.prefetch import DetailPrefetchStore
+
+
+def test_in_flight_cap_and_queued_take():
+    store = DetailPrefetchStore(ttl_seconds=60, max_entries=10, max_in_flight=2)
+    peak = 0
+
+    async def prefetch(shop_name: str):
+        nonlocal peak
+        async with store.slot():
+            peak = max(peak, store.stats()["in_flight"])
+            await asyncio.sleep(0.02)
+            return shop_name
+
+    async def main():
+        for shop_name in ("a", "b", "c"):
+            store.put("query", shop_name, asyncio.create_task(prefetch(shop_name)))
+        await asyncio.sleep(0.005)
+        # "c" is still waiting for a slot: it is cancelled and reported as a miss
+        queued = store.take("query", "c")
+        running = store.take("query", "a")
+        return queued, await running
+
+    queued, result = asyncio.run(main())
+
+    assert queued is None
+    assert result == "a"
+    assert peak == 2
+    assert store.stats()["hits"] == 1
+    assert store.stats()["misses"] == 1
+
+
+def test_taking_running_prefetch_promotes_its_priority():
+    store = DetailPrefetchStore(ttl_seconds=60, max_entries=10, max_in_flight=1)
+    priority = CallPriority()
+
+    async def prefetch():
+        async with store.slot():
+            await asyncio.sleep(0.01)
+            return "detail"
+
+    async def main():
+        store.put("query", "shop", asyncio.create_task(prefetch()), priority)
+        await asyncio.sleep(0)
+        assert priority.background
+        return await store.take("query", "shop")
+
+    assert asyncio.run(main()) == "detail"
+    assert not priority.background
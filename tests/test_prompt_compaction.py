@@ -0,0 +1,86 @@
+"""
+Tests for prompt compaction
+"""
+from app.services.prompt_compaction import (
+    TRUNCATION_MARKER,
+    collapse_whitespace,
+    compact_text,
+    dedupe_passages,
+    estimate_tokens,
+    strip_citations,
+)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("渋谷ラーメン") == 6
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("一蘭 ichiran") == 2 + 2
+
+
+def test_strip_citations():
+    assert strip_citations("一蘭 渋谷店（参照: https://example.com/a）") == "一蘭 渋谷店"
+    assert strip_citations("[AFURI](https://afuri.com/) 柚子塩 [2, 3]") == "AFURI 柚子塩 "
+    assert strip_citations("詳細は https://example.com/a を参照") == "詳細は  を参照"
+    assert strip_citations("出典: https://example.com/list") == ""
+
+
+def test_collapse_whitespace():
+    lines = ["  a　　b  ", "", "", "      nested", "", ""]
+
+    assert collapse_whitespace(lines) == ["  a b", "", "  nested"]
+
+
+def test_dedupe_paragraphs_and_lines():
+    lines = [
+        "一蘭 渋谷店は天然とんこつラーメン専門店",
+        "",
+        "・一蘭　渋谷店は天然とんこつラーメン専門店",
+        "営業時間は24時間",
+        "",
+        "一蘭 渋谷店は天然とんこつラーメン専門店",
+    ]
+
+    assert dedupe_passages(lines) == [
+        "一蘭 渋谷店は天然とんこつラーメン専門店", "", "営業時間は24時間", ""
+    ]
+
+
+def test_short_lines_are_not_deduplicated():
+    lines = ["| 駐車場 | 有 |", "| 喫煙 | 無 |", "---", "| 駐車場 | 有 |", "---"]
+
+    assert dedupe_passages(lines) == lines + [""]
+
+
+def test_compact_text():
+    text = (
+        "1. 一蘭 渋谷店（参照: https://example.com/ichiran）\n"
+        "   天然とんこつラーメン専門店です。[1]\n"
+        "\n\n"
+        "出典: https://example.com/list\n"
+        "\n"
+        "天然とんこつラーメン専門店です。\n"
+    )
+    result = compact_text(text)
+
+    assert result.text == "1. 一蘭 渋谷店\n  天然とんこつラーメン専門店です。"
+    assert not result.truncated
+    assert result.tokens == estimate_tokens(result.text)
+    assert result.tokens_saved == result.original_tokens - result.tokens > 0
+
+
+def test_truncation_to_budget():
+    text = "\n".join(f"{i}. テスト食堂{i}号店の紹介文です" for i in range(1, 50))
+    result = compact_text(text, max_tokens=100)
+
+    assert result.truncated
+    assert result.tokens <= 100
+    assert result.text.endswith(TRUNCATION_MARKER)
+    assert result.text.startswith("1. テスト食堂1号店")
+
+
+def test_no_truncation_without_budget():
+    text = "あ" * 5000
+
+    assert compact_text(text, max_tokens=0).text == text
+    assert not compact_text(text, max_tokens=5000).truncated
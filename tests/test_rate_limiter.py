@@ -0,0 +1,46 @@
+"""
+Tests for the token bucket rate limiter
+"""
+import asyncio
+
+from app.services.rate_limiter import TokenBucket
+
+
+def test_burst_then_spaced():
+    bucket = TokenBucket(rate=100, capacity=2)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert 0 < bucket.acquire() <= 0.01
+
+
+def test_disabled():
+    bucket = TokenBucket(rate=0, capacity=1)
+
+    assert all(bucket.acquire() == 0 for _ in range(5))
+
+
+def test_background_does_not_reserve_ahead():
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    async def main():
+        await bucket.acquire_async()
+        # The prefetch asks first but does not take the next token from the request
+        prefetch = asyncio.create_task(bucket.acquire_async(background=True))
+        await asyncio.sleep(0)
+        request = asyncio.create_task(bucket.acquire_async())
+        request_wait = await request
+        prefetch_wait = await prefetch
+        return request_wait, prefetch_wait
+
+    request_wait, prefetch_wait = asyncio.run(main())
+
+    assert 0 < request_wait <= 0.02
+    assert prefetch_wait > request_wait
+
+
+def test_background_takes_free_token():
+    bucket = TokenBucket(rate=1, capacity=1)
+
+    assert asyncio.run(bucket.acquire_async(background=True)) == 0
+    assert bucket._tokens < 1
@@ -0,0 +1,146 @@
+"""
+Tests for Gemini call recording and replay
+"""
+import asyncio
+import json
+
+import pytest
+from google.genai import errors as genai_errors
+from google.genai import types
+
+from app.services.cache import MemoryResponseCache
+from app.services.recording import GeminiRecorder, GeminiReplayer, RecordedError, ReplayMissError, warm_cache
+from app.services.resilience import is_retryable
+
+CONFIG = types.GenerateContentConfig(temperature=0.2)
+SCHEMA_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema={"title": "ShopList", "type": "object", "properties": {"shops": {"type": "array"}}}
+)
+
+
+def grounded_response(text: str) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                grounding_metadata=types.GroundingMetadata(
+                    grounding_chunks=[
+                        types.GroundingChunk(web=types.GroundingChunkWeb(uri="https://example.com/a", title="A"))
+                    ]
+                )
+            )
+        ],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(prompt_token_count=12, candidates_token_count=34)
+    )
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "recordings" / "gemini.jsonl")
+
+
+def record(recorder: GeminiRecorder, key: str, **outcome) -> None:
+    recorder.record(key, "gemini-2.5-flash", "grounding", "prompt", CONFIG, 0.01, **outcome)
+
+
+def test_round_trip(path):
+    recorder = GeminiRecorder(path)
+    record(recorder, "k1", response=grounded_response("一蘭 渋谷店"))
+    recorder.close()
+
+    response = GeminiReplayer(path, time_scale=0).respond("k1")
+
+    assert response.text == "一蘭 渋谷店"
+    chunk = response.candidates[0].grounding_metadata.grounding_chunks[0]
+    assert (chunk.web.uri, chunk.web.title) == ("https://example.com/a", "A")
+    assert response.usage_metadata.prompt_token_count == 12
+    assert response.usage_metadata.candidates_token_count == 34
+
+
+def test_schema_written_once(path):
+    recorder = GeminiRecorder(path)
+    for key in ("k1", "k2"):
+        recorder.record(key, "gemini-2.5-flash", "structured", "prompt", SCHEMA_CONFIG, 0.01,
+                        response=grounded_response('{"shops": []}'))
+    recorder.close()
+
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+
+    assert len([line for line in lines if "schema" in line]) == 1
+    assert lines[1]["schema_id"] == lines[2]["schema_id"] == lines[0]["schema_id"]
+    assert "response_schema" not in lines[1]["config"]
+
+
+def test_attempts_replay_in_order(path):
+    recorder = GeminiRecorder(path)
+    error = genai_errors.ServerError(503, {"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}})
+    record(recorder, "k1", error=error)
+    record(recorder, "k1", error=TimeoutError("Attempt exceeded 60.0s"))
+    record(recorder, "k1", response=grounded_response("ok"))
+    recorder.close()
+    replayer = GeminiReplayer(path, time_scale=0)
+
+    with pytest.raises(genai_errors.ServerError) as raised:
+        replayer.respond("k1")
+    assert raised.value.code == 503
+    with pytest.raises(TimeoutError):
+        replayer.respond("k1")
+    assert replayer.respond("k1").text == "ok"
+    # The last success repeats once the attempts run out
+    assert replayer.respond("k1").text == "ok"
+
+
+def test_other_errors_keep_their_retryability(path):
+    recorder = GeminiRecorder(path)
+    record(recorder, "k1", error=ConnectionError("reset by peer"))
+    record(recorder, "k2", error=ValueError("response did not match the schema"))
+    recorder.close()
+    replayer = GeminiReplayer(path, time_scale=0)
+
+    with pytest.raises(ConnectionError) as transient:
+        replayer.respond("k1")
+    with pytest.raises(RecordedError) as permanent:
+        replayer.respond("k2")
+
+    assert is_retryable(transient.value)
+    assert not is_retryable(permanent.value)
+    assert "ValueError" in str(permanent.value)
+
+
+def test_cancelled_calls_are_not_replayed(path):
+    recorder = GeminiRecorder(path)
+    record(recorder, "k1", cancelled=True)
+    record(recorder, "k1", response=grounded_response("ok"))
+    record(recorder, "k2", cancelled=True)
+    recorder.close()
+    replayer = GeminiReplayer(path, time_scale=0)
+
+    assert asyncio.run(replayer.respond_async("k1")).text == "ok"
+    with pytest.raises(ReplayMissError):
+        replayer.respond("k2")
+    assert replayer.misses == 1
+
+
+def test_unreadable_lines_are_skipped(path):
+    recorder = GeminiRecorder(path)
+    record(recorder, "k1", response=grounded_response("ok"))
+    recorder.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "k2", "trunc')
+
+    assert GeminiReplayer(path, time_scale=0).respond("k1").text == "ok"
+
+
+def test_warm_cache(path):
+    recorder = GeminiRecorder(path)
+    record(recorder, "k1", response=grounded_response("一蘭"))
+    record(recorder, "k2", error=TimeoutError("slow"))
+    record(recorder, "k3", cancelled=True)
+    recorder.close()
+    cache = MemoryResponseCache(ttl_seconds=60, max_entries=10)
+
+    assert warm_cache(cache, path) == 1
+    assert json.loads(cache.get("k1")) == {"text": "一蘭", "sources": [{"url": "https://example.com/a", "title": "A"}]}
+    assert cache.get("k2") is None
@@ -0,0 +1,28 @@
+"""
+Tests for the service registry
+"""
+import asyncio
+import threading
+
+from app.services import registry
+
+
+def test_reload_builds_registry_off_the_event_loop(monkeypatch):
+    built_in = []
+
+    class FakeRegistry:
+        def __init__(self, settings):
+            built_in.append(threading.current_thread())
+            self.settings = settings
+
+    monkeypatch.setattr(registry, "ServiceRegistry", FakeRegistry)
+    monkeypatch.setattr(registry, "_registry", None)
+
+    async def main():
+        new_registry = await registry.reload_services()
+        return new_registry, registry.get_registry()
+
+    new_registry, active = asyncio.run(main())
+
+    assert active is new_registry
+    assert built_in and built_in[0] is not threading.main_thread()
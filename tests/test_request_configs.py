@@ -0,0 +1,58 @@
+"""
+Tests for the prebuilt request configs
+"""
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.search import ShopListSchema
+from app.services.request_configs import RequestConfigRegistry
+
+
+def test_grounding_config_is_shared():
+    configs = RequestConfigRegistry(attempt_timeout=2.5)
+
+    assert configs.grounding.tools[0].google_search is not None
+    assert configs.grounding.http_options.timeout == 2500
+
+
+def test_structured_schema_is_built_once(monkeypatch):
+    configs = RequestConfigRegistry(attempt_timeout=1.0)
+    builds = []
+    model_json_schema = ShopListSchema.model_json_schema
+
+    def counting_model_json_schema(*args, **kwargs):
+        builds.append(1)
+        return model_json_schema(*args, **kwargs)
+
+    monkeypatch.setattr(ShopListSchema, "model_json_schema", counting_model_json_schema)
+    first = configs.structured(ShopListSchema)
+    second = configs.structured(ShopListSchema)
+
+    assert len(builds) == 1
+    assert first.response_mime_type == "application/json"
+    assert first.response_schema == second.response_schema == model_json_schema()
+
+
+def test_structured_configs_own_their_schema():
+    configs = RequestConfigRegistry(attempt_timeout=1.0)
+    first = configs.structured(ShopListSchema)
+
+    # The SDK rewrites the schema dict in place; later calls must not see it
+    first.response_schema["properties"].clear()
+    second = configs.structured(ShopListSchema)
+
+    assert first is not second
+    assert second.response_schema["properties"]
+    assert second.http_options is configs.http_options
+
+
+def test_validate_json():
+    configs = RequestConfigRegistry(attempt_timeout=1.0)
+
+    result = configs.validate_json(ShopListSchema, '{"shops": ["一蘭 渋谷店"]}')
+
+    assert result == ShopListSchema(shops=["一蘭 渋谷店"])
+    with pytest.raises(ValidationError):
+        configs.validate_json(ShopListSchema, '{"shops": "一蘭 渋谷店"}')
+    with pytest.raises(ValidationError):
+        configs.validate_json(ShopListSchema, '{"shops": ')
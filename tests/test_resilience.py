@@ -0,0 +1,221 @@
+"""
+Tests for retries, hedging and the circuit breaker
+"""
+import asyncio
+import time
+
+import pytest
+from google.genai import errors as genai_errors
+
+from app.config import get_settings
+from app.services.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, is_retryable
+
+
+def server_error(code: int = 503) -> genai_errors.APIError:
+    error_class = genai_errors.ServerError if code >= 500 else genai_errors.ClientError
+    return error_class(code, {"error": {"code": code, "message": "test", "status": "TEST"}})
+
+
+def make_caller(**overrides) -> ResilientCaller:
+    settings = get_settings().model_copy(update={
+        "gemini_max_retries": 2,
+        "gemini_retry_base_delay": 0.001,
+        "gemini_retry_max_delay": 0.001,
+        "gemini_call_timeout_seconds": 1.0,
+        "gemini_total_timeout_seconds": 5.0,
+        "gemini_hedge_enabled": False,
+        "gemini_circuit_failure_threshold": 0,
+        **overrides
+    })
+    return ResilientCaller(settings, "test-model", breaker_name="test")
+
+
+class Flaky:
+    """Fails with the given errors, then returns "ok" """
+
+    def __init__(self, *errors: BaseException):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+    async def call_async(self) -> str:
+        return self()
+
+
+def test_is_retryable():
+    assert is_retryable(server_error(503))
+    assert is_retryable(server_error(429))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(server_error(400))
+    assert not is_retryable(ValueError())
+
+
+def test_breaker_opens_and_probes():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.allow()
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_reopens_on_failed_probe():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_client_error_probe_does_not_close_breaker():
+    caller = make_caller(
+        gemini_max_retries=0,
+        gemini_circuit_failure_threshold=2,
+        gemini_circuit_reset_seconds=0.01
+    )
+    for _ in range(2):
+        with pytest.raises(genai_errors.ServerError):
+            caller.call("grounding", Flaky(server_error(503)))
+    assert caller.breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.02)
+
+    # The half-open probe fails with an auth error: no verdict on the API
+    with pytest.raises(genai_errors.ClientError):
+        caller.call("grounding", Flaky(server_error(401)))
+    assert caller.breaker.state == CircuitBreaker.HALF_OPEN
+    assert caller.breaker.failures == 2
+
+    # The probe slot was freed, so the next call can probe
+    assert caller.call("grounding", Flaky()) == "ok"
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_errors_keep_failure_count():
+    caller = make_caller(gemini_max_retries=0, gemini_circuit_failure_threshold=2)
+    with pytest.raises(genai_errors.ServerError):
+        caller.call("grounding", Flaky(server_error(503)))
+    with pytest.raises(genai_errors.ClientError):
+        caller.call("grounding", Flaky(server_error(403)))
+    with pytest.raises(genai_errors.ServerError):
+        caller.call("grounding", Flaky(server_error(503)))
+
+    assert caller.breaker.state == CircuitBreaker.OPEN
+
+
+def test_breaker_disabled():
+    breaker = CircuitBreaker("test", failure_threshold=0, reset_seconds=1)
+    for _ in range(10):
+        breaker.record_failure()
+        breaker.allow()
+
+
+def test_retries_transient_errors():
+    func = Flaky(server_error(503), server_error(429))
+
+    assert make_caller().call("grounding", func) == "ok"
+    assert func.calls == 3
+
+
+def test_gives_up_after_max_retries():
+    func = Flaky(*(server_error(503) for _ in range(5)))
+
+    with pytest.raises(genai_errors.ServerError):
+        make_caller().call("grounding", func)
+    assert func.calls == 3
+
+
+def test_does_not_retry_client_errors():
+    func = Flaky(server_error(400))
+
+    with pytest.raises(genai_errors.ClientError):
+        make_caller().call("grounding", func)
+    assert func.calls == 1
+
+
+def test_open_circuit_rejects_without_calling():
+    caller = make_caller(gemini_max_retries=0, gemini_circuit_failure_threshold=1)
+    func = Flaky(server_error(503))
+    with pytest.raises(genai_errors.ServerError):
+        caller.call("grounding", func)
+
+    with pytest.raises(CircuitOpenError):
+        caller.call("grounding", func)
+    assert func.calls == 1
+
+
+def test_async_retries_transient_errors():
+    func = Flaky(server_error(503))
+
+    assert asyncio.run(make_caller().call_async("grounding", func.call_async)) == "ok"
+    assert func.calls == 2
+
+
+def test_async_attempt_timeout_is_retried():
+    attempts = 0
+
+    async def slow_then_fast():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(1.0 if attempts == 1 else 0)
+        return "ok"
+
+    caller = make_caller(gemini_call_timeout_seconds=0.05)
+
+    assert asyncio.run(caller.call_async("grounding", slow_then_fast)) == "ok"
+    assert attempts == 2
+
+
+def test_hedge_wins_over_slow_primary():
+    caller = make_caller(gemini_hedge_enabled=True, gemini_hedge_percentile=50.0, gemini_hedge_min_samples=1)
+    for _ in range(5):
+        caller._tracker("grounding").observe(0.01)
+    started = []
+
+    async def request():
+        started.append(time.monotonic())
+        # The primary stalls; the hedge answers at once
+        await asyncio.sleep(0.5 if len(started) == 1 else 0)
+        return len(started)
+
+    async def main():
+        start = time.monotonic()
+        result = await caller.call_async("grounding", request)
+        return result, time.monotonic() - start
+
+    result, elapsed = asyncio.run(main())
+
+    assert result == 2
+    assert len(started) == 2
+    assert elapsed < 0.3
+
+
+def test_no_hedge_without_enough_samples():
+    caller = make_caller(gemini_hedge_enabled=True, gemini_hedge_min_samples=5)
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    assert asyncio.run(caller.call_async("grounding", request)) == "ok"
+    assert calls == 1
@@ -0,0 +1,116 @@
+"""
+Tests for response field selection and compact mode
+"""
+import pytest
+
+from app.schemas.search import (
+    DetailJobStatus,
+    InitialSearchResponse,
+    JudgementData,
+    ShopDetailSearchResponse,
+    ShopListData,
+    SourceCitation,
+    SummaryData,
+)
+from app.services.response_fields import parse_fields, shape_response
+
+
+def summary(shop_name: str) -> SummaryData:
+    return SummaryData(
+        shop_name=shop_name,
+        detail_search_result="詳細",
+        judgement=JudgementData(shop_name=shop_name, score=4, reason="条件に合致", search_result="詳細"),
+        sources=[SourceCitation(url="https://example.com/a")]
+    )
+
+
+DETAIL = ShopDetailSearchResponse(
+    input_text="渋谷 ラーメン",
+    shop_names=["一蘭 渋谷店", "AFURI 恵比寿"],
+    summaries=[summary("一蘭 渋谷店"), summary("AFURI 恵比寿")]
+)
+
+
+def test_no_selection():
+    assert parse_fields(ShopDetailSearchResponse, None) is None
+    assert parse_fields(ShopDetailSearchResponse, "") is None
+    assert parse_fields(ShopDetailSearchResponse, " , ") is None
+
+
+def test_nested_list_fields():
+    include = parse_fields(
+        ShopDetailSearchResponse,
+        "shop_names, summaries.shop_name,summaries.judgement.score"
+    )
+
+    assert include == {
+        "shop_names": True,
+        "summaries": {"__all__": {"shop_name": True, "judgement": {"score": True}}}
+    }
+
+
+def test_whole_field_wins_over_nested():
+    assert parse_fields(ShopDetailSearchResponse, "summaries,summaries.shop_name") == {"summaries": True}
+    assert parse_fields(ShopDetailSearchResponse, "summaries.shop_name,summaries") == {"summaries": True}
+
+
+def test_optional_list_items():
+    include = parse_fields(DetailJobStatus, "status,summaries.judgement.score")
+
+    assert include == {"status": True, "summaries": {"__all__": {"judgement": {"score": True}}}}
+
+
+@pytest.mark.parametrize("fields", ["unknown", "summaries.unknown", "shop_names.length", "input_text.x"])
+def test_unknown_fields(fields):
+    with pytest.raises(ValueError, match="Unknown field"):
+        parse_fields(ShopDetailSearchResponse, fields)
+
+
+def test_shape_with_selection():
+    include = parse_fields(ShopDetailSearchResponse, "summaries.shop_name,summaries.judgement.score")
+
+    assert shape_response(DETAIL, include) == {
+        "summaries": [
+            {"shop_name": "一蘭 渋谷店", "judgement": {"score": 4}},
+            {"shop_name": "AFURI 恵比寿", "judgement": {"score": 4}}
+        ]
+    }
+
+
+def test_compact_detail_response():
+    body = shape_response(DETAIL, compact=True)
+    full = shape_response(DETAIL)
+
+    assert "search_result" in full["summaries"][0]["judgement"]
+    assert "search_result" not in body["summaries"][0]["judgement"]
+    assert body["summaries"][0]["detail_search_result"] == "詳細"
+    # Null values are dropped (the source title)
+    assert body["summaries"][0]["sources"] == [{"url": "https://example.com/a"}]
+
+
+def test_compact_initial_response():
+    response = InitialSearchResponse(
+        input_text="渋谷 ラーメン",
+        prompt_used="prompt",
+        model_name="gemini-2.5-flash",
+        raw_response="raw",
+        shop_list=ShopListData(shops=["一蘭 渋谷店"])
+    )
+    body = shape_response(response, compact=True)
+
+    assert body == {
+        "input_text": "渋谷 ラーメン",
+        "model_name": "gemini-2.5-flash",
+        "shop_list": {"shops": ["一蘭 渋谷店"]}
+    }
+
+
+def test_compact_with_selection():
+    include = parse_fields(ShopDetailSearchResponse, "summaries.judgement")
+
+    assert shape_response(DETAIL, include, compact=True) == {
+        "summaries": [
+            {"judgement": {"shop_name": "一蘭 渋谷店", "score": 4, "reason": "条件に合致"}},
+            {"judgement": {"shop_name": "AFURI 恵比寿", "score": 4, "reason": "条件に合致"}}
+        ]
+    }
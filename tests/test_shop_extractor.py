@@ -0,0 +1,171 @@
+"""
+Tests for the local shop name extractor
+"""
+import asyncio
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+from app.config import Settings
+from app.services.gemini_service import GeminiService
+from app.services.recording import GeminiReplayer, iter_recording
+from app.services.search_service import SearchService
+from app.services.shop_extractor import EXPECTED_SHOPS, extract_shop_names
+from benchmarks.fake_gemini import FakeGeminiClient
+
+FIXTURES = json.loads(
+    (Path(__file__).parent.parent / "benchmarks" / "fixtures" / "gemini_responses.json").read_text(encoding="utf-8")
+)
+MIN_CONFIDENCE = Settings.model_fields["local_extraction_min_confidence"].default
+SHOPS = ["一蘭 渋谷店", "AFURI 恵比寿", "麺屋武蔵 青山"]
+
+# Initial searches in the GeminiRecorder format (replayable with GEMINI_RECORD_MODE=replay)
+RECORDING = Path(__file__).parent / "fixtures" / "grounding_recording.jsonl"
+# Shops named in each recorded response, and whether local extraction should be trusted
+RECORDED = {
+    "渋谷駅周辺で深夜まで営業しているラーメン屋": ([
+        "一蘭 渋谷店", "天下一品 渋谷店", "博多天神 渋谷センター街店", "魁力屋 渋谷店", "山頭火 渋谷店",
+        "麺屋武蔵 武骨相傳", "すごい煮干ラーメン凪 渋谷東口店", "龍の家 渋谷店", "長浜ナンバーワン 渋谷店", "喜楽"
+    ], True),
+    "恵比寿で記念日に使えるフレンチ": ([
+        "ジョエル・ロブション", "ガストロノミー ジョエル・ロブション", "ア・ニュ ルトゥルヴェ・ヴー",
+        "レストラン マノワ", "ル・ジュー・ドゥ・ラシエット", "恵比寿 えんどう", "ビストロ アンバロン",
+        "レストラン タテル ヨシノ 芝", "シェ・トモ", "ラ・ターブル・ドゥ・ジョエル・ロブション"
+    ], True),
+    "新宿で個室のある焼肉店": ([
+        "叙々苑 新宿三丁目店", "焼肉トラジ 新宿店", "焼肉ライク 新宿西口店", "うしごろ 新宿三丁目店",
+        "炭火焼肉 なかはら", "新宿 焼肉 牛の蔵", "焼肉 平城苑 新宿東口店", "韓国焼肉 ソウル家 新大久保本店",
+        "黒毛和牛 焼肉 白李 新宿店", "焼肉 すどう 新宿御苑"
+    ], True),
+    "池袋でランチが安いカレー屋": ([
+        "夢屋", "元祖エチオピア 池袋店", "火の鳥 池袋本店", "ナマステ 池袋西口店", "カレーは飲み物。 池袋店",
+        "もうやんカレー 池袋", "南インド料理 ダクシン 池袋店", "日乃屋カレー 池袋東口店",
+        "CoCo壱番屋 豊島区池袋駅北口店", "池袋 カレー屋 パク森"
+    ], True),
+    # Shops named inside prose: nothing to extract locally, so the LLM must extract them
+    "吉祥寺で朝7時から開いているヴィーガンカフェ": ([
+        "ドトールコーヒーショップ 吉祥寺北口店", "ナチュラルスタイル 吉祥寺", "カフェ ハンモック", "グリーン ボウル 吉祥寺"
+    ], False),
+}
+
+# Formats seen in real responses that the fixtures do not cover (three shops each)
+MALFORMED = {
+    "bold": (
+        "おすすめのお店です。\n\n"
+        "**一蘭 渋谷店** - 天然とんこつラーメン専門店\n"
+        "**AFURI 恵比寿** - 柚子塩らーめん\n"
+        "**麺屋武蔵 青山** - つけ麺が人気\n",
+        "bold"
+    ),
+    "full_width": (
+        "１．一蘭 渋谷店：とんこつ\n"
+        "２．AFURI 恵比寿：柚子塩\n"
+        "３．麺屋武蔵 青山：つけ麺\n",
+        "numbered"
+    ),
+    "bracketed": (
+        "【1】一蘭 渋谷店 - 24時間営業\n"
+        "【2】AFURI 恵比寿 - 柚子塩\n"
+        "【3】麺屋武蔵 青山 - つけ麺\n",
+        "numbered"
+    ),
+    "table": (
+        "| No | 店舗名 | 特徴 |\n"
+        "|---|---|---|\n"
+        "| 1 | 一蘭 渋谷店 | とんこつ |\n"
+        "| 2 | AFURI 恵比寿 | 柚子塩 |\n"
+        "| 3 | 麺屋武蔵 青山 | つけ麺 |\n",
+        "table"
+    ),
+    "nested_list": (
+        "1. 一蘭 渋谷店\n"
+        "    - 住所: 渋谷区神南1-22-7\n"
+        "    - 特徴: とんこつ\n"
+        "2. AFURI 恵比寿\n"
+        "    - 住所: 渋谷区恵比寿1-1-7\n"
+        "3. 麺屋武蔵 青山\n"
+        "    - 特徴: つけ麺\n",
+        "numbered"
+    ),
+}
+
+
+@pytest.mark.parametrize("fixture", FIXTURES["initial"], ids=lambda fixture: fixture["format"])
+def test_fixture_responses(fixture):
+    result = extract_shop_names(fixture["text"])
+
+    assert result.shops == fixture["shops"]
+    assert result.confidence == 1.0
+    assert result.confidence >= MIN_CONFIDENCE
+
+
+def recorded_responses():
+    """(query, response text) of the recorded initial searches"""
+    return [
+        (re.search(r"「(.+?)」", record["prompt"]).group(1), record["text"])
+        for record in iter_recording(str(RECORDING))
+        if record["kind"] == "grounding"
+    ]
+
+
+@pytest.mark.parametrize("query, text", recorded_responses(), ids=lambda value: value[:12])
+def test_recorded_responses(query, text):
+    shops, local = RECORDED[query]
+    result = extract_shop_names(text)
+
+    assert (result.confidence >= MIN_CONFIDENCE) is local
+    if local:
+        assert result.shops == shops
+
+
+@pytest.mark.parametrize("query", RECORDED)
+def test_local_first_falls_back_to_llm(query):
+    gemini = GeminiService(client=FakeGeminiClient())
+    gemini.replayer = GeminiReplayer(str(RECORDING), time_scale=0)
+    service = SearchService(gemini)
+    shops, local = RECORDED[query]
+
+    response = asyncio.run(service.initial_search_async(query))
+
+    assert response.shop_list.shops == shops
+    assert dict(service.extraction_paths) == {"local" if local else "llm": 1}
+    assert gemini.replayer.misses == 0
+
+
+@pytest.mark.parametrize("text, pattern", MALFORMED.values(), ids=MALFORMED.keys())
+def test_malformed_responses(text, pattern):
+    result = extract_shop_names(text)
+
+    assert result.shops == SHOPS
+    assert result.pattern == pattern
+    # Names are right, but three of the expected ten is too few to skip the LLM
+    assert result.confidence == 0.3
+    assert result.confidence < MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("count, local", [(5, False), (6, True), (EXPECTED_SHOPS, True)])
+def test_min_confidence_threshold(count, local):
+    # A clean list scores count / EXPECTED_SHOPS, so the default threshold
+    # (0.6) sends responses with fewer than six shops to the LLM
+    text = "\n".join(f"{i}. テスト食堂{i}号店" for i in range(1, count + 1))
+    result = extract_shop_names(text)
+
+    assert len(result.shops) == count
+    assert (result.confidence >= MIN_CONFIDENCE) is local
+
+
+def test_duplicates_and_labels():
+    text = "1. 一蘭 渋谷店\n2. 一蘭 渋谷店\n3. 住所: 渋谷区\n4. AFURI 恵比寿\n"
+    result = extract_shop_names(text)
+
+    assert result.shops == ["一蘭 渋谷店", "AFURI 恵比寿"]
+    assert result.confidence < 0.2
+
+
+def test_empty_text():
+    result = extract_shop_names("該当する店舗は見つかりませんでした。")
+
+    assert result.shops == []
+    assert result.confidence == 0.0
@@ -0,0 +1,36 @@
+"""
+Tests for the shop fact index
+"""
+import asyncio
+import math
+
+from app.services.gemini_service import GeminiService
+from app.services.search_service import SearchService
+from app.services.shop_index import ShopFactIndex, normalize_shop_name
+from benchmarks.fake_gemini import FakeGeminiClient
+
+
+def test_normalize_shop_name():
+    assert normalize_shop_name("ＡＦＵＲＩ　原宿") == normalize_shop_name("AFURI 原宿")
+
+
+def test_stale_entry_is_refreshed_once():
+    client = FakeGeminiClient(grounding_latency="constant:0.01")
+    index = ShopFactIndex(":memory:", refresh_after_seconds=0, max_age_seconds=math.inf)
+    index.put("一蘭 渋谷店", {"text": "old facts", "sources": []})
+    service = SearchService(GeminiService(client=client), shop_index=index)
+
+    async def main():
+        # Two requests hit the same stale entry at once
+        results = await asyncio.gather(
+            service._indexed_shop_facts_async(index, "一蘭 渋谷店"),
+            service._indexed_shop_facts_async(index, "一蘭　渋谷店")
+        )
+        await asyncio.gather(*service._background_tasks)
+        return results
+
+    results = asyncio.run(main())
+
+    assert [facts["text"] for facts in results] == ["old facts", "old facts"]
+    assert client.calls == 1
+    assert index.get("一蘭 渋谷店")["text"] != "old facts"
@@ -0,0 +1,118 @@
+"""
+Tests for single-flight request coalescing
+"""
+import asyncio
+
+import pytest
+
+from app.services.concurrency_limiter import AdaptiveConcurrencyLimiter, background_calls
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        group = SingleFlight("test")
+        results = await asyncio.gather(*(group.do("key", work) for _ in range(5)))
+        return group, results
+
+    group, results = asyncio.run(main())
+
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert group.stats() == {"executed": 1, "shared": 4, "in_flight": 0}
+
+
+def test_different_keys_run_separately():
+    async def main():
+        group = SingleFlight("test")
+        results = await asyncio.gather(
+            group.do("a", lambda: asyncio.sleep(0.01, result="a")),
+            group.do("b", lambda: asyncio.sleep(0.01, result="b"))
+        )
+        return group, results
+
+    group, results = asyncio.run(main())
+
+    assert results == ["a", "b"]
+    assert group.stats()["executed"] == 2
+
+
+def test_sequential_calls_are_not_coalesced():
+    async def main():
+        group = SingleFlight("test")
+        await group.do("key", lambda: asyncio.sleep(0, result=1))
+        await group.do("key", lambda: asyncio.sleep(0, result=2))
+        return group
+
+    assert asyncio.run(main()).stats()["executed"] == 2
+
+
+def test_exception_reaches_every_caller():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        group = SingleFlight("test")
+        results = await asyncio.gather(*(group.do("key", fail) for _ in range(3)), return_exceptions=True)
+        return group, results
+
+    group, results = asyncio.run(main())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert group.stats() == {"executed": 1, "shared": 2, "in_flight": 0}
+
+
+def test_cancelling_one_caller_keeps_shared_work():
+    async def main():
+        group = SingleFlight("test")
+        first = asyncio.create_task(group.do("key", lambda: asyncio.sleep(0.05, result="done")))
+        second = asyncio.create_task(group.do("key", lambda: asyncio.sleep(0.05, result="other")))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_request_joining_background_call_promotes_it():
+    limiter = AdaptiveConcurrencyLimiter("test", initial=1, min_limit=1, max_limit=1)
+    group = SingleFlight("test")
+    order = []
+
+    async def call(name: str):
+        await limiter.acquire_async()
+        order.append(name)
+        limiter.release(0.01)
+        return name
+
+    async def prefetch(name: str):
+        with background_calls():
+            return await group.do(name, lambda: call(name))
+
+    async def main():
+        limiter.acquire()
+        other = asyncio.create_task(prefetch("other prefetch"))
+        joined = asyncio.create_task(prefetch("joined prefetch"))
+        await asyncio.sleep(0)
+        # A request coalesces onto the second prefetch's in-flight call
+        request = asyncio.create_task(group.do("joined prefetch", lambda: call("duplicate")))
+        await asyncio.sleep(0)
+        limiter.release(0.01)
+        return await asyncio.gather(other, joined, request)
+
+    results = asyncio.run(main())
+
+    assert results == ["other prefetch", "joined prefetch", "joined prefetch"]
+    # The joined call left the background queue and ran first
+    assert order == ["joined prefetch", "other prefetch"]